@@ -59,6 +59,82 @@ class ModeleUtilisateur {
     }
     
 
+    public function obtenirUtilisateursPage($curseur, $limite) {
+        try {
+            $query = "SELECT id, pseudo, email FROM Utilisateur WHERE id > :curseur ORDER BY id LIMIT :limite";
+            $stmt = $this->db->prepare($query);
+            $stmt->bindParam(':curseur', $curseur, PDO::PARAM_INT);
+            $stmt->bindParam(':limite', $limite, PDO::PARAM_INT);
+            $stmt->execute();
+            return $stmt->fetchAll(PDO::FETCH_ASSOC);
+        } catch (PDOException $e) {
+            throw new Exception("Erreur lors de la récupération des utilisateurs : " . $e->getMessage());
+        }
+    }
+
+    public function obtenirRolesUtilisateurs(array $utilisateurIds) {
+        if (empty($utilisateurIds)) {
+            return [];
+        }
+        try {
+            $marqueurs = implode(',', array_fill(0, count($utilisateurIds), '?'));
+            $query = "SELECT ur.utilisateurId, r.nom FROM Role r 
+                      JOIN UtilisateurRole ur ON r.id = ur.roleId 
+                      WHERE ur.utilisateurId IN ($marqueurs)";
+            $stmt = $this->db->prepare($query);
+            $stmt->execute(array_values(array_map('intval', $utilisateurIds)));
+
+            $roles = [];
+            foreach ($stmt->fetchAll(PDO::FETCH_ASSOC) as $ligne) {
+                $roles[$ligne['utilisateurId']][] = $ligne['nom'];
+            }
+            return $roles;
+        } catch (PDOException $e) {
+            throw new Exception("Erreur lors de la récupération des rôles : " . $e->getMessage());
+        }
+    }
+
+    // Empreinte d'un utilisateur : CRC32 UTF-8 de "id␟pseudo␟email␟rôles triés séparés par des virgules",
+    // combinées par OU exclusif dans chaque seau (id modulo nbSeaux). Le client calcule la même.
+    public function obtenirEmpreintesSeaux($nbSeaux) {
+        try {
+            $query = "SELECT MOD(u.id, :nbSeaux) AS seau, COUNT(*) AS nombre,
+                             BIT_XOR(CRC32(CONCAT_WS(CHAR(31 USING utf8mb4), u.id,
+                                                     CONVERT(u.pseudo USING utf8mb4),
+                                                     CONVERT(u.email USING utf8mb4),
+                                                     COALESCE(r.roles, '')))) AS empreinte
+                      FROM Utilisateur u
+                      LEFT JOIN (SELECT ur.utilisateurId,
+                                        GROUP_CONCAT(CONVERT(ro.nom USING utf8mb4)
+                                                     ORDER BY CONVERT(ro.nom USING utf8mb4) COLLATE utf8mb4_bin
+                                                     SEPARATOR ',') AS roles
+                                 FROM UtilisateurRole ur JOIN Role ro ON ro.id = ur.roleId
+                                 GROUP BY ur.utilisateurId) r ON r.utilisateurId = u.id
+                      GROUP BY seau";
+            $stmt = $this->db->prepare($query);
+            $stmt->bindParam(':nbSeaux', $nbSeaux, PDO::PARAM_INT);
+            $stmt->execute();
+            return $stmt->fetchAll(PDO::FETCH_ASSOC);
+        } catch (PDOException $e) {
+            throw new Exception("Erreur lors du calcul des empreintes : " . $e->getMessage());
+        }
+    }
+
+    public function obtenirUtilisateursSeaux($nbSeaux, array $seaux) {
+        if (empty($seaux)) {
+            return [];
+        }
+        try {
+            $marqueurs = implode(',', array_fill(0, count($seaux), '?'));
+            $query = "SELECT id, pseudo, email FROM Utilisateur WHERE MOD(id, ?) IN ($marqueurs) ORDER BY id";
+            $stmt = $this->db->prepare($query);
+            $stmt->execute(array_merge([(int)$nbSeaux], array_values(array_map('intval', $seaux))));
+            return $stmt->fetchAll(PDO::FETCH_ASSOC);
+        } catch (PDOException $e) {
+            throw new Exception("Erreur lors de la récupération des utilisateurs : " . $e->getMessage());
+        }
+    }
+
     public function obtenirRolesUtilisateur($utilisateurId) {
         try {
             $query = "SELECT r.nom FROM Role r 
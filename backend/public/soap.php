@@ -3,6 +3,8 @@
 ini_set('display_errors', 1);
 ini_set('display_startup_errors', 1);
 ini_set('soap.wsdl_cache_enabled', 0);
+// Compression gzip/deflate des réponses lorsque le client l'annonce (Accept-Encoding)
+ini_set('zlib.output_compression', 'On');
 error_reporting(E_ALL);
 
 error_log("SOAP Debug: Lancement du serveur");
@@ -47,4 +47,18 @@ class UtilisateursListResponse {
         $this->utilisateurs = new UtilisateursArray();
     }
 }
+
+class UtilisateursPageResponse {
+    public UtilisateursArray $utilisateurs;
+    public int $curseurSuivant = 0;
+    
+    public function __construct() {
+        $this->utilisateurs = new UtilisateursArray();
+    }
+}
+
+class EtatUtilisateursResponse {
+    public string $version = '';
+    public string $empreintes = '';
+}
 ?>
\ No newline at end of file
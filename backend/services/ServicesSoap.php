@@ -70,6 +70,9 @@ class ServicesSoap {
                 $reponse->roles->item[] = $role;
             }
             return $reponse;
+        } catch (SoapFault $f) {
+            // Jeton expiré ou droits insuffisants : le message est transmis tel quel au client
+            throw $f;
         } catch (Exception $e) {
             throw new SoapFault('Server', 'Erreur lors de la récupération des rôles : ' . $e->getMessage());
         }
@@ -110,12 +113,122 @@ class ServicesSoap {
 
             return $reponse;
 
+        } catch (SoapFault $f) {
+            throw $f;
         } catch (Exception $e) {
             // Au lieu de retourner une réponse vide, lever une exception
             throw new SoapFault('Server', 'Erreur lors de la récupération des utilisateurs : ' . $e->getMessage());
         }
     }
 
+    public function listerUtilisateursPage($params) {
+        try {
+            $jeton = $params->jeton ?? '';
+            $curseur = max(0, (int)($params->curseur ?? 0));
+            $limite = min(1000, max(1, (int)($params->limite ?? 500)));
+            $this->verifierAdmin($jeton);
+
+            $utilisateursBruts = $this->modeleUtilisateur->obtenirUtilisateursPage($curseur, $limite);
+            $rolesParUtilisateur = $this->modeleUtilisateur->obtenirRolesUtilisateurs(array_column($utilisateursBruts, 'id'));
+
+            $reponse = new UtilisateursPageResponse();
+            $reponse->utilisateurs->item = [];
+
+            foreach ($utilisateursBruts as $u) {
+                $utilisateurObj = new Utilisateur();
+                $utilisateurObj->id = $u['id'];
+                $utilisateurObj->pseudo = $u['pseudo'];
+                $utilisateurObj->email = $u['email'];
+                $utilisateurObj->roles->item = $rolesParUtilisateur[$u['id']] ?? [];
+                $reponse->utilisateurs->item[] = $utilisateurObj;
+            }
+
+            // Page pleine : il peut rester des utilisateurs après le dernier identifiant renvoyé
+            if (count($utilisateursBruts) === $limite) {
+                $reponse->curseurSuivant = (int)end($utilisateursBruts)['id'];
+            }
+
+            return $reponse;
+
+        } catch (SoapFault $f) {
+            // Jeton expiré ou droits insuffisants : le message est transmis tel quel au client
+            throw $f;
+        } catch (Exception $e) {
+            throw new SoapFault('Server', 'Erreur lors de la récupération des utilisateurs : ' . $e->getMessage());
+        }
+    }
+
+    // Indicateur de changement : "nombre-empreinte" de tous les utilisateurs, et l'empreinte de chaque
+    // seau (8 chiffres hexadécimaux par seau) seulement si la version du client est différente
+    public function etatUtilisateurs($params) {
+        try {
+            $jeton = $params->jeton ?? '';
+            $versionClient = $params->version ?? '';
+            $nbSeaux = min(4096, max(1, (int)($params->nbSeaux ?? 256)));
+            $this->verifierAdmin($jeton);
+
+            $empreintes = array_fill(0, $nbSeaux, 0);
+            $nombre = 0;
+            $globale = 0;
+            foreach ($this->modeleUtilisateur->obtenirEmpreintesSeaux($nbSeaux) as $ligne) {
+                $empreintes[(int)$ligne['seau']] = (int)$ligne['empreinte'];
+                $nombre += (int)$ligne['nombre'];
+                $globale ^= (int)$ligne['empreinte'];
+            }
+
+            $reponse = new EtatUtilisateursResponse();
+            $reponse->version = sprintf('%d-%08x', $nombre, $globale);
+            if ($reponse->version !== $versionClient) {
+                $reponse->empreintes = implode('', array_map(fn($e) => sprintf('%08x', $e), $empreintes));
+            }
+            return $reponse;
+
+        } catch (SoapFault $f) {
+            // Jeton expiré ou droits insuffisants : le message est transmis tel quel au client
+            throw $f;
+        } catch (Exception $e) {
+            throw new SoapFault('Server', 'Erreur lors du calcul de l\'état des utilisateurs : ' . $e->getMessage());
+        }
+    }
+
+    // Utilisateurs des seaux demandés ("3,17,42"), avec le même nbSeaux que etatUtilisateurs
+    public function listerUtilisateursSeaux($params) {
+        try {
+            $jeton = $params->jeton ?? '';
+            $nbSeaux = min(4096, max(1, (int)($params->nbSeaux ?? 256)));
+            $this->verifierAdmin($jeton);
+
+            $seaux = [];
+            foreach (explode(',', $params->seaux ?? '') as $seau) {
+                if (trim($seau) !== '' && (int)$seau >= 0 && (int)$seau < $nbSeaux) {
+                    $seaux[(int)$seau] = true;
+                }
+            }
+
+            $utilisateursBruts = $this->modeleUtilisateur->obtenirUtilisateursSeaux($nbSeaux, array_keys($seaux));
+            $rolesParUtilisateur = $this->modeleUtilisateur->obtenirRolesUtilisateurs(array_column($utilisateursBruts, 'id'));
+
+            $reponse = new UtilisateursListResponse();
+            $reponse->utilisateurs->item = [];
+
+            foreach ($utilisateursBruts as $u) {
+                $utilisateurObj = new Utilisateur();
+                $utilisateurObj->id = $u['id'];
+                $utilisateurObj->pseudo = $u['pseudo'];
+                $utilisateurObj->email = $u['email'];
+                $utilisateurObj->roles->item = $rolesParUtilisateur[$u['id']] ?? [];
+                $reponse->utilisateurs->item[] = $utilisateurObj;
+            }
+
+            return $reponse;
+
+        } catch (SoapFault $f) {
+            throw $f;
+        } catch (Exception $e) {
+            throw new SoapFault('Server', 'Erreur lors de la récupération des utilisateurs : ' . $e->getMessage());
+        }
+    }
+
     public function ajouterUtilisateur($params) {
         $reponse = new StandardResponse();
 
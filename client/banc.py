@@ -0,0 +1,55 @@
+"""Banc d'essai hors ligne du client (serveur SOAP simulé, sans PHP ni MySQL).
+
+Exemples :
+    python banc.py --sortie banc.json
+    python banc.py --tailles 1000,10000 --latence 5 --reference banc.json
+"""
+import argparse
+import json
+import sys
+
+from simulation.bancEssai import executer, comparer
+
+
+def analyserArguments(arguments=None):
+    parseur = argparse.ArgumentParser(description="Banc d'essai du client luXew contre un serveur SOAP simulé")
+    parseur.add_argument("--tailles", default="1000,10000,100000",
+                         help="nombres d'utilisateurs synthétiques, séparés par des virgules")
+    parseur.add_argument("--latence", type=float, default=0.0, help="latence serveur par requête, en millisecondes")
+    parseur.add_argument("--repetitions", type=int, default=5, help="répétitions par scénario")
+    parseur.add_argument("--mutations", type=int, default=50, help="appels par opération d'écriture")
+    parseur.add_argument("--tk", action="store_true", help="mesurer un vrai Treeview Tk (affichage requis)")
+    parseur.add_argument("--sortie", help="fichier JSON du résultat (sinon sortie standard)")
+    parseur.add_argument("--reference", help="résultat JSON précédent à comparer")
+    parseur.add_argument("--seuil", type=float, default=1.25,
+                         help="rapport de médianes au-delà duquel un scénario est une régression")
+    return parseur.parse_args(arguments)
+
+
+def main(arguments=None):
+    args = analyserArguments(arguments)
+    tailles = [int(t) for t in args.tailles.split(",") if t.strip()]
+
+    resultat = executer(tailles, args.latence / 1000, args.repetitions, args.mutations, args.tk,
+                        progression=lambda etape: print(etape, file=sys.stderr))
+
+    texte = json.dumps(resultat, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as fichier:
+            fichier.write(texte)
+    else:
+        sys.stdout.write(texte)
+
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as fichier:
+            reference = json.load(fichier)
+        regressions = comparer(resultat, reference, args.seuil)
+        for taille, nom, avant, apres in regressions:
+            print(f"Régression {taille} utilisateurs / {nom} : {avant} ms -> {apres} ms", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Test de charge du backend SOAP : sessions d'administrateurs virtuels réparties sur plusieurs processus.
+
+Exemples :
+    python charge.py --simule 10000 --processus 4 --threads 16 --duree 60
+    python charge.py --url http://serveur/luXew/backend/public/soap.php?wsdl --pseudo admin --sortie charge.json
+    python charge.py --simule 1000 --melange listerRoles=1 --reflexion 0 --brut
+"""
+import argparse
+import json
+import os
+import sys
+
+from simulation.generateurCharge import executerCharge, analyserMelange, MELANGE_DEFAUT, OPERATIONS
+
+
+def analyserArguments(arguments=None):
+    parseur = argparse.ArgumentParser(description="Générateur de charge pour le backend SOAP luXew")
+    cible = parseur.add_mutually_exclusive_group()
+    cible.add_argument("--url", action="append",
+                       help="URL du WSDL, répétable pour plusieurs répliques (sinon LUXEW_POINTS_ACCES "
+                            "ou ~/.config/luxew/points_acces)")
+    cible.add_argument("--simule", type=int, metavar="UTILISATEURS",
+                       help="démarrer un serveur simulé avec ce nombre d'utilisateurs synthétiques")
+    parseur.add_argument("--latence", type=float, default=0.0,
+                         help="latence du serveur simulé par requête, en millisecondes")
+    parseur.add_argument("--pseudo", help="pseudo de l'administrateur (admin avec --simule)")
+    parseur.add_argument("--mot-de-passe", default=os.environ.get("LUXEW_MOT_DE_PASSE"),
+                         help="mot de passe (sinon LUXEW_MOT_DE_PASSE ; celui de l'administrateur simulé avec --simule)")
+    parseur.add_argument("--processus", type=int, default=2, help="processus de charge")
+    parseur.add_argument("--threads", type=int, default=8, help="sessions virtuelles par processus")
+    parseur.add_argument("--duree", type=float, default=30.0, help="durée de la charge, en secondes")
+    parseur.add_argument("--montee", type=float, default=5.0,
+                         help="durée de la montée en charge (démarrage progressif des sessions), en secondes")
+    parseur.add_argument("--reflexion", type=float, default=500.0,
+                         help="temps de réflexion moyen entre deux opérations d'une session, en millisecondes")
+    parseur.add_argument("--melange", default=",".join(f"{op}={poids}" for op, poids in MELANGE_DEFAUT.items()),
+                         help=f"poids des opérations, op=poids séparés par des virgules ({', '.join(OPERATIONS)})")
+    parseur.add_argument("--intervalle", type=float, default=1.0, help="période des relevés, en secondes")
+    parseur.add_argument("--brut", action="store_true",
+                         help="sans reprise, relance ni disjoncteur : chaque appel envoyé est compté")
+    parseur.add_argument("--graine", type=int, default=0, help="graine des tirages (opérations, réflexion)")
+    parseur.add_argument("--sortie", help="fichier JSON du rapport")
+    return parseur.parse_args(arguments)
+
+
+def main(arguments=None):
+    args = analyserArguments(arguments)
+    try:
+        melange = analyserMelange(args.melange)
+    except ValueError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    serveur = None
+    if args.simule is not None:
+        from simulation.serveurSimule import ServeurSimule, PSEUDO_ADMIN, MOT_DE_PASSE_ADMIN
+
+        serveur = ServeurSimule(args.simule, args.latence / 1000).demarrer()
+        urls = [serveur.url]
+        pseudo = args.pseudo or PSEUDO_ADMIN
+        motDePasse = args.mot_de_passe or MOT_DE_PASSE_ADMIN
+    else:
+        from services.repartiteurSoap import lirePointsAcces
+
+        if not args.pseudo or not args.mot_de_passe:
+            print("Erreur : --pseudo et --mot-de-passe (ou LUXEW_MOT_DE_PASSE) sont requis", file=sys.stderr)
+            return 2
+        urls = args.url or lirePointsAcces()
+        pseudo, motDePasse = args.pseudo, args.mot_de_passe
+
+    print(f"{args.processus} processus x {args.threads} sessions sur {', '.join(urls)} pendant {args.duree:g} s",
+          file=sys.stderr)
+    try:
+        rapport = executerCharge(urls, pseudo, motDePasse, args.processus, args.threads, args.duree, args.montee,
+                                 melange, args.reflexion / 1000, args.intervalle, args.brut, args.graine,
+                                 afficher=lambda ligne: print(ligne, file=sys.stderr))
+    except KeyboardInterrupt:
+        print("\nCharge interrompue", file=sys.stderr)
+        return 130
+    finally:
+        if serveur is not None:
+            serveur.arreter()
+
+    print("\nopération               appels   appels/s   p50 ms   p95 ms   p99 ms  erreurs", file=sys.stderr)
+    for operation, resume in rapport["total"].items():
+        latences = "".join(" " * 9 if resume[f"{p}_ms"] is None else f"{resume[f'{p}_ms']:9.1f}"
+                           for p in ("p50", "p95", "p99"))
+        print(f"{operation:22} {resume['appels']:7d} {resume['debit_s']:10.1f}{latences} "
+              f"{resume['taux_erreurs'] * 100:7.1f} %", file=sys.stderr)
+        for erreur, nombre in resume.get("erreurs", {}).items():
+            print(f"    {erreur} : {nombre}", file=sys.stderr)
+
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as fichier:
+            json.dump(rapport, fichier, indent=2, ensure_ascii=False)
+            fichier.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Export des utilisateurs et de leurs rôles sans interface graphique.
+
+Exemples :
+    python exporter.py utilisateurs.csv.gz --pseudo admin
+    python exporter.py utilisateurs.parquet --pseudo admin --compression zstd
+"""
+import argparse
+import getpass
+import os
+import sys
+import time
+
+from services.serviceSoap import ServiceSoap
+from services.repartiteurSoap import lirePointsAcces
+from services.exportUtilisateurs import exporterUtilisateurs, FORMATS
+from utilitaires.exceptions import ErreurConnexion, ErreurAuthentification, TokenExpireException
+
+
+def analyserArguments(arguments=None):
+    parseur = argparse.ArgumentParser(description="Export des utilisateurs luXew en CSV, JSONL ou Parquet")
+    parseur.add_argument("fichier", help="fichier de sortie (.csv, .jsonl, .parquet ; .gz, .bz2 ou .xz pour compresser)")
+    parseur.add_argument("--url", action="append",
+                         help="URL du WSDL, répétable pour plusieurs répliques (sinon LUXEW_POINTS_ACCES "
+                              "ou ~/.config/luxew/points_acces)")
+    parseur.add_argument("--pseudo", required=True, help="pseudo de l'administrateur")
+    parseur.add_argument("--mot-de-passe", default=os.environ.get("LUXEW_MOT_DE_PASSE"),
+                         help="mot de passe (sinon LUXEW_MOT_DE_PASSE ou saisie interactive)")
+    parseur.add_argument("--format", choices=FORMATS, help="format de sortie (sinon déduit de l'extension)")
+    parseur.add_argument("--compression",
+                         help="gzip, bz2, xz ou aucune (CSV/JSONL) ; zstd, snappy, gzip, brotli, lz4 ou aucune (Parquet)")
+    parseur.add_argument("--taille-page", type=int, default=0,
+                         help="lire par pages de cette taille (listerUtilisateursPage) au lieu d'une seule réponse en flux")
+    return parseur.parse_args(arguments)
+
+
+def afficherProgression(nombre):
+    sys.stderr.write(f"\r{nombre} utilisateur(s) exporté(s)")
+    sys.stderr.flush()
+
+
+def main(arguments=None):
+    args = analyserArguments(arguments)
+    motDePasse = args.mot_de_passe or getpass.getpass("Mot de passe : ")
+
+    serviceSoap = ServiceSoap(args.url or lirePointsAcces())
+    debut = time.monotonic()
+    try:
+        jeton = serviceSoap.authentifier(args.pseudo, motDePasse)
+        if args.taille_page > 0:
+            utilisateurs = serviceSoap.iterUtilisateurs(jeton, taillePage=args.taille_page)
+        else:
+            utilisateurs = serviceSoap.iterUtilisateursFlux(jeton)
+        nombre = exporterUtilisateurs(utilisateurs, args.fichier, args.format, args.compression,
+                                      progression=afficherProgression)
+    except (ErreurConnexion, ErreurAuthentification, TokenExpireException, ImportError, ValueError, OSError) as e:
+        print(f"\nErreur : {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        print("\nExport interrompu", file=sys.stderr)
+        return 130
+    finally:
+        serviceSoap.deconnecter()
+
+    duree = time.monotonic() - debut
+    print(f"\r{nombre} utilisateur(s) exporté(s) dans {args.fichier} en {duree:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
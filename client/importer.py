@@ -0,0 +1,82 @@
+"""Import en masse d'utilisateurs sans interface graphique.
+
+Exemple :
+    python importer.py utilisateurs.csv --pseudo admin --rapport rapport.csv
+"""
+import argparse
+import getpass
+import os
+import sys
+import time
+
+from services.serviceSoap import ServiceSoap
+from services.repartiteurSoap import lirePointsAcces
+from services.importUtilisateurs import ImportUtilisateurs, lireFichier, ecrireRapport
+from utilitaires.exceptions import ErreurConnexion, ErreurAuthentification, TokenExpireException
+
+
+def analyserArguments(arguments=None):
+    parseur = argparse.ArgumentParser(description="Import d'utilisateurs luXew depuis un fichier CSV ou JSONL")
+    parseur.add_argument("fichier", help="fichier .csv (pseudo,email,motDePasse,role) ou .jsonl")
+    parseur.add_argument("--url", action="append",
+                         help="URL du WSDL, répétable pour plusieurs répliques (sinon LUXEW_POINTS_ACCES "
+                              "ou ~/.config/luxew/points_acces)")
+    parseur.add_argument("--pseudo", required=True, help="pseudo de l'administrateur")
+    parseur.add_argument("--mot-de-passe", default=os.environ.get("LUXEW_MOT_DE_PASSE"),
+                         help="mot de passe (sinon LUXEW_MOT_DE_PASSE ou saisie interactive)")
+    parseur.add_argument("--travailleurs", type=int, default=8, help="appels SOAP simultanés")
+    parseur.add_argument("--debit", type=float, default=20, help="appels par seconde au maximum (0 = illimité)")
+    parseur.add_argument("--tentatives", type=int, default=3, help="tentatives par ligne tant que le serveur est signalé indisponible")
+    parseur.add_argument("--rapport", help="fichier CSV du résultat ligne par ligne")
+    parseur.add_argument("--valider-seulement", action="store_true", help="vérifier le fichier sans rien envoyer")
+    return parseur.parse_args(arguments)
+
+
+def afficherProgression(importation):
+    sys.stderr.write(f"\r{importation.traites}/{importation.total} traitées "
+                     f"({importation.reussis} ajoutées, {importation.echecs} en échec)")
+    sys.stderr.flush()
+
+
+def main(arguments=None):
+    args = analyserArguments(arguments)
+    motDePasse = args.mot_de_passe or getpass.getpass("Mot de passe : ")
+
+    serviceSoap = ServiceSoap(args.url or lirePointsAcces(), taillePool=args.travailleurs)
+    try:
+        jeton = serviceSoap.authentifier(args.pseudo, motDePasse)
+        roles = serviceSoap.listerRoles(jeton)
+    except (ErreurConnexion, ErreurAuthentification, TokenExpireException) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    importation = ImportUtilisateurs(serviceSoap.ajouterUtilisateur, jeton, nbTravailleurs=args.travailleurs,
+                                     debit=args.debit, tentatives=args.tentatives)
+    debut = time.monotonic()
+    try:
+        if args.valider_seulement:
+            valides, resultats = importation.valider(lireFichier(args.fichier), roles)
+            print(f"{len(valides)} ligne(s) valide(s), {len(resultats)} rejetée(s)")
+        else:
+            resultats = importation.executer(lireFichier(args.fichier), roles, progression=afficherProgression)
+            sys.stderr.write("\n")
+    except KeyboardInterrupt:
+        importation.annuler()
+        print("\nImport interrompu", file=sys.stderr)
+        return 130
+
+    for resultat in resultats:
+        if resultat.statut != "ajoute":
+            print(f"ligne {resultat.ligne} ({resultat.pseudo}) : {resultat.statut} - {resultat.message}")
+
+    if args.rapport:
+        ecrireRapport(resultats, args.rapport)
+
+    if not args.valider_seulement:
+        print(f"{importation.reussis} ajouté(s), {importation.echecs} en échec sur {importation.total} "
+              f"en {time.monotonic() - debut:.1f} s")
+    return 0 if all(r.statut == "ajoute" for r in resultats) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
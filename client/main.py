@@ -1,8 +1,14 @@
+import time
+DEBUT = time.perf_counter()
+
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk
-from services.serviceSoap import ServiceSoap
+# Modules légers seulement : zeep, requests et l'écran de gestion sont importés par le préchauffage
+from services.executeurSoap import ExecuteurSoap
+from services.mesuresSoap import MesuresSoap
 from vues.ecranConnexion import EcranConnexion
-from vues.ecranGestionUtilisateurs import EcranGestionUtilisateurs
 
 def appliquer_style(root):
     style = ttk.Style(root)
@@ -25,14 +31,64 @@ class Application(tk.Tk):
         self.geometry("800x600")
         appliquer_style(self)
         
-        self.serviceSoap = ServiceSoap("http://localhost/luXew/backend/public/soap.php?wsdl")
+        # LUXEW_MESURES=1 active la mesure des appels dès le démarrage ; F12 ouvre le panneau
+        self.mesures = MesuresSoap(actif=os.environ.get("LUXEW_MESURES") == "1")
+        # ServiceSoap et le dépôt sont créés par le préchauffage, l'exécuteur y est lié à ce moment
+        self.serviceSoap = None
+        self.depot = None
+        self.executeur = ExecuteurSoap(None)
         self.token = None
+        self.premiere_connexion = None  # (début, phases) de la première authentification réussie
+        self.premiere_connexion_notee = False
         
         self.container = tk.Frame(self)
         self.container.pack(fill='both', expand=True)
         
         self.frame_actuel = None
+        self.panneauMesures = None
+        self.bind_all("<F12>", lambda e: self.afficher_mesures())
         self.afficher_ecran(EcranConnexion)
+        
+        # Pendant la saisie des identifiants : imports lourds, WSDL et connexion au serveur
+        self.prechauffage = self.executeur.soumettre(self.prechauffer)
+        self.after_idle(lambda: self.noter_duree("demarrage", {"total": time.perf_counter() - DEBUT}))
+    
+    def prechauffer(self):
+        """Exécuté hors du thread Tk ; retourne le ServiceSoap, connecté si le serveur répond"""
+        from services.serviceSoap import ServiceSoap
+        from services.repartiteurSoap import lirePointsAcces
+        from services.depotUtilisateurs import DepotUtilisateurs
+        import vues.ecranGestionUtilisateurs
+        
+        # Répliques du backend : LUXEW_POINTS_ACCES ou ~/.config/luxew/points_acces
+        serviceSoap = ServiceSoap(lirePointsAcces(), mesures=self.mesures)
+        self.depot = DepotUtilisateurs(serviceSoap)
+        self.executeur.serviceSoap = serviceSoap
+        self.serviceSoap = serviceSoap
+        try:
+            serviceSoap.prechauffer()
+        except Exception:
+            # L'authentification refera la connexion et affichera l'erreur
+            pass
+        return serviceSoap
+    
+    def authentifier(self, pseudo, motDePasse):
+        """Exécuté hors du thread Tk : attend le préchauffage puis s'authentifie"""
+        debut = time.perf_counter()
+        serviceSoap = self.prechauffage.result()
+        attente = time.perf_counter() - debut
+        jeton = serviceSoap.authentifier(pseudo, motDePasse)
+        if self.premiere_connexion is None:
+            self.premiere_connexion = (debut, {"prechauffage": attente,
+                                               "authentification": time.perf_counter() - debut - attente})
+        return jeton
+    
+    def noter_duree(self, operation, phases):
+        """Durées de démarrage et de première connexion : panneau des mesures, et stderr si LUXEW_MESURES=1"""
+        self.mesures.enregistrer(operation, phases)
+        if self.mesures.actif:
+            details = ", ".join(f"{phase} {duree * 1000:.0f} ms" for phase, duree in phases.items())
+            print(f"{operation} : {details}", file=sys.stderr)
     
     def afficher_ecran(self, classeEcran, *args):
         if self.frame_actuel:
@@ -45,10 +101,27 @@ class Application(tk.Tk):
         
         self.frame_actuel.pack(fill='both', expand=True)
     
+    def afficher_mesures(self):
+        from vues.panneauMesures import PanneauMesures
+        
+        if self.panneauMesures is not None and self.panneauMesures.winfo_exists():
+            self.panneauMesures.lift()
+        else:
+            self.panneauMesures = PanneauMesures(self, self.mesures)
+    
     def naviguer_vers_gestion_utilisateur(self, token):
+        from vues.ecranGestionUtilisateurs import EcranGestionUtilisateurs
+        
         self.token = token
-        self.afficher_ecran(EcranGestionUtilisateurs, token, self.serviceSoap)
+        self.afficher_ecran(EcranGestionUtilisateurs, token, self.serviceSoap, self.executeur, self.depot)
+        if self.premiere_connexion is not None and not self.premiere_connexion_notee:
+            # Jusqu'à l'affichage de l'écran de gestion
+            self.premiere_connexion_notee = True
+            debut, phases = self.premiere_connexion
+            self.after_idle(lambda: self.noter_duree("premiereConnexion",
+                                                     {**phases, "total": time.perf_counter() - debut}))
 
 if __name__ == "__main__":
     app = Application()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    app.executeur.arreter()
\ No newline at end of file
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from zeep.cache import Base
+from zeep.exceptions import TransportError
+
+REPERTOIRE_DEFAUT = os.path.join(os.path.expanduser("~"), ".cache", "luxew", "wsdl")
+
+
+class CacheWsdl(Base):
+    """Cache disque des documents WSDL/XSD avec revalidation conditionnelle (ETag / Last-Modified)"""
+
+    def __init__(self, repertoire=None, fraicheur=3600, age_max=7 * 86400, taille_max=20 * 1024 * 1024):
+        self.repertoire = repertoire or os.environ.get("LUXEW_CACHE_WSDL", REPERTOIRE_DEFAUT)
+        self.fraicheur = fraicheur
+        self.age_max = age_max
+        self.taille_max = taille_max
+        self._verrou = threading.Lock()
+
+    # --- Interface zeep.cache.Base (utilisée pour les imports XSD) ---
+
+    def get(self, url):
+        entree = self._lireMeta(url)
+        if entree and time.time() - entree["dateValidation"] < self.fraicheur:
+            return self._lireContenu(url)
+        return None
+
+    def add(self, url, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self._ecrire(url, content, {})
+
+    # --- Chargement du document principal ---
+
+    def charger(self, url, session, timeout=10):
+        """Retourne (contenu, empreinte) du WSDL, sans requête si le cache est frais.
+
+        Les erreurs réseau (requests) et les statuts HTTP (TransportError) sont levés tels quels :
+        l'appelant choisit la réplique suivante et la politique de reprise les classe.
+        """
+        entree = self._lireMeta(url)
+        contenu = self._lireContenu(url) if entree else None
+
+        if contenu is not None and time.time() - entree["dateValidation"] < self.fraicheur:
+            return contenu, entree["empreinte"]
+
+        entetes = {}
+        if contenu is not None:
+            if entree.get("etag"):
+                entetes["If-None-Match"] = entree["etag"]
+            if entree.get("lastModified"):
+                entetes["If-Modified-Since"] = entree["lastModified"]
+
+        reponse = session.get(url, headers=entetes, timeout=timeout)
+
+        if reponse.status_code == 304 and contenu is not None:
+            entree["dateValidation"] = time.time()
+            self._ecrireMeta(url, entree)
+            return contenu, entree["empreinte"]
+
+        if reponse.status_code != 200:
+            raise TransportError(f"Le service SOAP n'est pas accessible à l'adresse {url}",
+                                 status_code=reponse.status_code)
+
+        meta = {
+            "etag": reponse.headers.get("ETag"),
+            "lastModified": reponse.headers.get("Last-Modified"),
+        }
+        empreinte = self._ecrire(url, reponse.content, meta)
+        return reponse.content, empreinte
+
+    # --- Stockage ---
+
+    def _chemin(self, url, extension):
+        nom = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.repertoire, nom + extension)
+
+    def _lireMeta(self, url):
+        try:
+            with open(self._chemin(url, ".json"), "r", encoding="utf-8") as fichier:
+                return json.load(fichier)
+        except (OSError, ValueError):
+            return None
+
+    def _lireContenu(self, url):
+        try:
+            with open(self._chemin(url, ".xml"), "rb") as fichier:
+                return fichier.read()
+        except OSError:
+            return None
+
+    def _ecrireMeta(self, url, meta):
+        try:
+            self._remplacer(self._chemin(url, ".json"), json.dumps(meta).encode("utf-8"))
+        except OSError:
+            pass
+
+    def _ecrire(self, url, contenu, meta):
+        empreinte = hashlib.sha256(contenu).hexdigest()
+        meta = dict(meta, url=url, empreinte=empreinte, dateValidation=time.time())
+        with self._verrou:
+            try:
+                os.makedirs(self.repertoire, exist_ok=True)
+                self._remplacer(self._chemin(url, ".xml"), contenu)
+                self._remplacer(self._chemin(url, ".json"), json.dumps(meta).encode("utf-8"))
+                self._evincer()
+            except OSError:
+                # Le cache disque est facultatif : un répertoire non inscriptible ne bloque pas la connexion
+                pass
+        return empreinte
+
+    def _remplacer(self, chemin, donnees):
+        temporaire = f"{chemin}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporaire, "wb") as fichier:
+            fichier.write(donnees)
+        os.replace(temporaire, chemin)
+
+    def _evincer(self):
+        """Supprime les entrées trop anciennes puis les moins récemment validées au-delà de taille_max"""
+        maintenant = time.time()
+        entrees = []
+        for nom in os.listdir(self.repertoire):
+            if not nom.endswith(".json"):
+                continue
+            base = os.path.join(self.repertoire, nom[:-5])
+            try:
+                with open(base + ".json", "r", encoding="utf-8") as fichier:
+                    validation = json.load(fichier).get("dateValidation", 0)
+                taille = os.path.getsize(base + ".xml")
+            except (OSError, ValueError):
+                validation, taille = 0, 0
+            entrees.append((validation, taille, base))
+
+        entrees.sort()
+        total = sum(taille for _, taille, _ in entrees)
+        for validation, taille, base in entrees:
+            if maintenant - validation <= self.age_max and total <= self.taille_max:
+                continue
+            for extension in (".xml", ".json"):
+                try:
+                    os.remove(base + extension)
+                except OSError:
+                    pass
+            total -= taille
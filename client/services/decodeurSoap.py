@@ -0,0 +1,111 @@
+"""Décodage des réponses zeep vers les enregistrements compacts de services.enregistrements.
+
+Chaque type de réponse du WSDL (RolesArray, Utilisateur, UtilisateursArray, réponses d'écriture)
+a un décodeur unique ; les vues ne manipulent plus d'objets zeep.
+
+zeep déplie les réponses à un seul élément : listerRoles et listerUtilisateurs renvoient
+directement la liste des item, tandis que listerUtilisateursPage renvoie l'objet réponse complet.
+
+decoderUtilisateursFlux lit la réponse brute de listerUtilisateurs sans passer par zeep :
+chaque utilisateurs/item est décodé dès sa balise fermante puis retiré de l'arbre.
+decoderPageFlux fait de même pour une page de listerUtilisateursPage.
+"""
+from lxml import etree
+from zeep.exceptions import Fault
+from services.enregistrements import Utilisateur, ReponseOperation, interner
+
+NS_ENVELOPPE_SOAP = "http://schemas.xmlsoap.org/soap/envelope/"
+
+
+def items(tableau):
+    """Contenu d'un tableau SOAP (RolesArray, UtilisateursArray) : élément item, maxOccurs=unbounded"""
+    if tableau is None:
+        return []
+    if isinstance(tableau, list):
+        return tableau
+    return getattr(tableau, "item", None) or []
+
+
+def decoderUtilisateur(valeur):
+    return Utilisateur(
+        valeur.id,
+        valeur.pseudo or "",
+        valeur.email or "",
+        items(valeur.roles),
+    )
+
+
+def decoderRoles(reponse):
+    """listerRolesResponse -> liste de noms de rôle"""
+    return [interner(role) for role in items(getattr(reponse, "roles", reponse))]
+
+
+def decoderUtilisateurs(reponse):
+    """listerUtilisateursResponse -> liste d'Utilisateur"""
+    return [decoderUtilisateur(valeur) for valeur in items(getattr(reponse, "utilisateurs", reponse))]
+
+
+def decoderPage(reponse):
+    """listerUtilisateursPageResponse -> (liste d'Utilisateur, curseur suivant ou 0)"""
+    return decoderUtilisateurs(reponse), reponse.curseurSuivant or 0
+
+
+def decoderEtat(reponse):
+    """etatUtilisateursResponse -> (version, empreintes des seaux ou "" si la version envoyée est à jour)"""
+    return reponse.version or "", reponse.empreintes or ""
+
+
+def decoderReponseOperation(reponse):
+    """ajouter/modifier/supprimerUtilisateurResponse -> ReponseOperation"""
+    return ReponseOperation(
+        bool(reponse.succes),
+        getattr(reponse, "message", None),
+        getattr(reponse, "utilisateurId", None),
+    )
+
+
+def _nomLocal(balise):
+    return balise.rpartition("}")[2]
+
+
+def _decoderElementUtilisateur(element):
+    champs = {}
+    roles = ()
+    for enfant in element:
+        nom = _nomLocal(enfant.tag)
+        if nom == "roles":
+            roles = [role.text or "" for role in enfant]
+        else:
+            champs[nom] = enfant.text
+    return Utilisateur(int(champs["id"]), champs.get("pseudo") or "", champs.get("email") or "", roles)
+
+
+def decoderUtilisateursFlux(flux, suite=None):
+    """Flux XML de listerUtilisateursResponse -> Utilisateur au fil de la lecture.
+
+    suite : dictionnaire qui reçoit le texte des autres champs de la réponse qu'il nomme
+    (curseurSuivant). Un Fault SOAP lève zeep.exceptions.Fault, comme pour un appel zeep.
+    """
+    balises = ("{*}item", "{%s}Fault" % NS_ENVELOPPE_SOAP) + tuple("{*}" + nom for nom in suite or ())
+    for _, element in etree.iterparse(flux, events=("end",), tag=balises, huge_tree=True):
+        nom = _nomLocal(element.tag)
+        if nom == "Fault":
+            raise Fault(message=element.findtext("faultstring"), code=element.findtext("faultcode"))
+        if nom != "item":
+            suite[nom] = element.text
+            continue
+        parent = element.getparent()
+        # Les item de roles sont décodés avec leur utilisateur
+        if parent is None or _nomLocal(parent.tag) != "utilisateurs":
+            continue
+        yield _decoderElementUtilisateur(element)
+        element.clear()
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def decoderPageFlux(flux):
+    """Flux XML de listerUtilisateursPageResponse -> (liste d'Utilisateur, curseur suivant ou 0)"""
+    suite = {"curseurSuivant": None}
+    utilisateurs = list(decoderUtilisateursFlux(flux, suite))
+    return utilisateurs, int(suite["curseurSuivant"] or 0)
@@ -0,0 +1,240 @@
+import threading
+import time
+from services.enregistrements import Utilisateur
+from services.empreintesUtilisateurs import EmpreintesSeaux, nbSeauxPour
+
+
+class MutationLocale:
+    """Modification appliquée au dépôt en attente de la confirmation du serveur"""
+
+    def __init__(self, operation, identifiant, nouveau, precedent, role=""):
+        self.operation = operation
+        self.identifiant = identifiant
+        self.nouveau = nouveau
+        self.precedent = precedent
+        self.role = role
+
+
+class Changements:
+    """Résultat d'une synchronisation : utilisateurs ajoutés ou modifiés, identifiants supprimés.
+
+    complet : la liste a été relue entièrement (trop de seaux modifiés), à réafficher en entier.
+    """
+
+    def __init__(self, modifies=(), supprimes=(), complet=False):
+        self.modifies = list(modifies)
+        self.supprimes = list(supprimes)
+        self.complet = complet
+
+    def __bool__(self):
+        return bool(self.modifies or self.supprimes or self.complet)
+
+
+class DepotUtilisateurs:
+    """Cache client des utilisateurs et des rôles entre ServiceSoap et les vues.
+
+    Les listes sont conservées avec une durée de vie ; les modifications et suppressions sont
+    appliquées localement avant l'appel SOAP et annulées en cas d'échec, sans relire toute la liste.
+    synchroniser() rapatrie les changements faits par ailleurs en comparant les empreintes par seau
+    (voir services.empreintesUtilisateurs) avec celles du serveur.
+    """
+
+    def __init__(self, serviceSoap, dureeVie=300, dureeVieRoles=3600):
+        self.serviceSoap = serviceSoap
+        self.dureeVie = dureeVie
+        self.dureeVieRoles = dureeVieRoles
+        self._verrou = threading.RLock()
+        self._utilisateurs = {}
+        self._dateUtilisateurs = None
+        self._empreintes = None
+        # Identifiants dont une mutation attend la réponse du serveur : la synchronisation n'y touche pas
+        self._enAttente = {}
+        # Révision de la dernière écriture locale par identifiant, pour ne pas l'écraser par une lecture plus ancienne
+        self._revision = 0
+        self._revisions = {}
+        self._roles = None
+        self._dateRoles = None
+
+    # --- Lectures ---
+
+    def estPerime(self):
+        return self._dateUtilisateurs is None or time.monotonic() - self._dateUtilisateurs > self.dureeVie
+
+    def roles(self, jeton, forcer=False):
+        with self._verrou:
+            if not forcer and self._roles is not None and time.monotonic() - self._dateRoles <= self.dureeVieRoles:
+                return list(self._roles)
+        roles = list(self.serviceSoap.listerRoles(jeton))
+        with self._verrou:
+            self._roles = roles
+            self._dateRoles = time.monotonic()
+        return list(roles)
+
+    def utilisateurs(self, jeton, forcer=False):
+        """Liste complète : resynchronisée seulement si demandé ou si le cache est périmé"""
+        with self._verrou:
+            if not forcer and not self.estPerime():
+                return list(self._utilisateurs.values())
+        # Lecture par pages : seule la page en cours de décodage est en mémoire en plus du cache
+        utilisateurs = {u.id: u for u in self.serviceSoap.iterUtilisateurs(jeton)}
+        empreintes = EmpreintesSeaux(nbSeauxPour(len(utilisateurs)), utilisateurs.values())
+        with self._verrou:
+            self._utilisateurs = utilisateurs
+            self._empreintes = empreintes
+            self._revisions = {}
+            self._dateUtilisateurs = time.monotonic()
+            return list(self._utilisateurs.values())
+
+    def obtenir(self, identifiant):
+        with self._verrou:
+            return self._utilisateurs.get(identifiant)
+
+    def invalider(self):
+        with self._verrou:
+            self._dateUtilisateurs = None
+
+    def vider(self):
+        with self._verrou:
+            self._utilisateurs = {}
+            self._empreintes = None
+            self._revisions = {}
+            self._dateUtilisateurs = None
+
+    def _placer(self, identifiant, utilisateur, locale=True):
+        """Remplace (ou retire si None) un utilisateur du cache en tenant les empreintes à jour ; verrou tenu"""
+        if locale:
+            self._revision += 1
+            self._revisions[identifiant] = self._revision
+        precedent = self._utilisateurs.pop(identifiant, None)
+        if utilisateur is not None:
+            self._utilisateurs[identifiant] = utilisateur
+        if self._empreintes is not None:
+            if precedent is not None:
+                self._empreintes.retirer(precedent)
+            if utilisateur is not None:
+                self._empreintes.ajouter(utilisateur)
+
+    def _suspendre(self, identifiant):
+        self._enAttente[identifiant] = self._enAttente.get(identifiant, 0) + 1
+
+    def _reprendre(self, identifiant):
+        with self._verrou:
+            restant = self._enAttente.get(identifiant, 0) - 1
+            if restant > 0:
+                self._enAttente[identifiant] = restant
+            else:
+                self._enAttente.pop(identifiant, None)
+
+    # --- Synchronisation ---
+
+    def synchroniser(self, jeton):
+        """Rapatrie les changements faits par d'autres sessions depuis le dernier chargement.
+
+        Retourne None si la liste n'est pas chargée ou si le backend ne propose pas etatUtilisateurs,
+        sinon un Changements (vide si rien n'a changé). Une liste à jour ne coûte qu'un échange de
+        quelques centaines d'octets ; sinon seuls les seaux dont l'empreinte diffère sont relus.
+        """
+        with self._verrou:
+            empreintes = self._empreintes
+            if empreintes is None:
+                return None
+            version = empreintes.version()
+            revision = self._revision
+        if not self.serviceSoap.prendEnCharge("etatUtilisateurs"):
+            return None
+
+        _, distantes = self.serviceSoap.etatUtilisateurs(jeton, version, empreintes.nbSeaux)
+        with self._verrou:
+            if empreintes is not self._empreintes:
+                # Liste rechargée ou vidée pendant l'appel
+                return Changements()
+            seaux = empreintes.differences(distantes) if distantes else []
+            if not seaux:
+                self._dateUtilisateurs = time.monotonic()
+                return Changements()
+
+        if len(seaux) > empreintes.nbSeaux // 2:
+            # Changement massif (import, autre session) : une relecture complète est moins chère
+            self.utilisateurs(jeton, forcer=True)
+            return Changements(complet=True)
+
+        recus = {u.id: u for u in self.serviceSoap.listerUtilisateursSeaux(jeton, empreintes.nbSeaux, seaux)}
+        modifies = []
+        supprimes = []
+        with self._verrou:
+            if empreintes is not self._empreintes:
+                return Changements()
+            cibles = set(seaux)
+            # Une écriture locale en attente ou postérieure à la lecture l'emporte : ses seaux seront
+            # comparés de nouveau au passage suivant
+            proteges = {i for i, r in self._revisions.items() if r > revision}
+            proteges.update(self._enAttente)
+            for identifiant in [i for i in self._utilisateurs if i % empreintes.nbSeaux in cibles]:
+                if identifiant not in recus and identifiant not in proteges:
+                    self._placer(identifiant, None, locale=False)
+                    supprimes.append(identifiant)
+            for identifiant, utilisateur in recus.items():
+                if identifiant not in proteges and self._utilisateurs.get(identifiant) != utilisateur:
+                    self._placer(identifiant, utilisateur, locale=False)
+                    modifies.append(utilisateur)
+            self._dateUtilisateurs = time.monotonic()
+        return Changements(modifies, supprimes)
+
+    # --- Mutations ---
+
+    def ajouterUtilisateur(self, jeton, pseudo, email, motDePasse, role):
+        """L'identifiant n'est connu qu'après la réponse : l'ajout local suit la confirmation"""
+        reponse = self.serviceSoap.ajouterUtilisateur(jeton, pseudo, email, motDePasse, role)
+        identifiant = reponse.utilisateurId
+        if reponse.succes and identifiant is not None:
+            with self._verrou:
+                self._placer(identifiant, Utilisateur(identifiant, pseudo, email, [role] if role else []))
+        return reponse
+
+    def preparerModification(self, identifiant, pseudo, email, role=""):
+        """Applique localement la modification ; les champs vides conservent la valeur connue"""
+        with self._verrou:
+            precedent = self._utilisateurs.get(identifiant)
+            self._suspendre(identifiant)
+            if precedent is None:
+                return MutationLocale("modifier", identifiant, Utilisateur(identifiant, pseudo, email, [role] if role else []), None, role)
+            nouveau = Utilisateur(
+                identifiant,
+                pseudo or precedent.pseudo,
+                email or precedent.email,
+                [role] if role else precedent.roles,
+            )
+            self._placer(identifiant, nouveau)
+            return MutationLocale("modifier", identifiant, nouveau, precedent, role)
+
+    def preparerSuppression(self, identifiant):
+        with self._verrou:
+            precedent = self._utilisateurs.get(identifiant)
+            self._placer(identifiant, None)
+            self._suspendre(identifiant)
+            return MutationLocale("supprimer", identifiant, None, precedent)
+
+    def envoyer(self, jeton, mutation):
+        """Transmet une mutation préparée ; elle est annulée localement si le serveur la refuse"""
+        try:
+            if mutation.operation == "supprimer":
+                reponse = self.serviceSoap.supprimerUtilisateur(jeton, mutation.identifiant)
+            else:
+                reponse = self.serviceSoap.modifierUtilisateur(jeton, mutation.identifiant, mutation.nouveau.pseudo,
+                                                               mutation.nouveau.email, mutation.role)
+        except Exception:
+            self.annuler(mutation)
+            raise
+        if not reponse.succes:
+            self.annuler(mutation)
+        else:
+            self._reprendre(mutation.identifiant)
+        return reponse
+
+    def annuler(self, mutation):
+        with self._verrou:
+            self._reprendre(mutation.identifiant)
+            # Ne pas écraser une valeur plus récente arrivée entre-temps
+            if self._utilisateurs.get(mutation.identifiant) is not mutation.nouveau:
+                return
+            self._placer(mutation.identifiant, mutation.precedent)
@@ -0,0 +1,67 @@
+"""Empreintes de la liste des utilisateurs pour la synchronisation par différence.
+
+Les utilisateurs sont répartis en seaux (identifiant modulo nbSeaux). L'empreinte d'un utilisateur
+est le CRC32 de "id␟pseudo␟email␟rôles triés séparés par des virgules" encodé en UTF-8, celle d'un
+seau le OU exclusif des empreintes de ses utilisateurs : ajouter ou retirer un utilisateur ne touche
+que son seau. La version de la liste est "nombre-empreinte globale" en hexadécimal.
+
+Le calcul est le même que celui de etatUtilisateurs côté serveur (ModeleUtilisateur::obtenirEmpreintesSeaux).
+"""
+import zlib
+
+SEPARATEUR = "\x1f"
+NB_SEAUX_MIN = 16
+NB_SEAUX_MAX = 4096
+# Environ 32 utilisateurs par seau : un changement isolé rapatrie quelques kilo-octets
+UTILISATEURS_PAR_SEAU = 32
+
+
+def empreinteUtilisateur(u):
+    texte = SEPARATEUR.join((str(u.id), u.pseudo, u.email, ",".join(sorted(u.roles))))
+    return zlib.crc32(texte.encode("utf-8"))
+
+
+def nbSeauxPour(nombre):
+    """Puissance de deux entre NB_SEAUX_MIN et NB_SEAUX_MAX adaptée au nombre d'utilisateurs"""
+    nbSeaux = NB_SEAUX_MIN
+    while nbSeaux < NB_SEAUX_MAX and nbSeaux * UTILISATEURS_PAR_SEAU < nombre:
+        nbSeaux *= 2
+    return nbSeaux
+
+
+class EmpreintesSeaux:
+    """Empreintes par seau tenues à jour à chaque ajout ou retrait d'un utilisateur"""
+
+    def __init__(self, nbSeaux, utilisateurs=()):
+        self.nbSeaux = nbSeaux
+        self._seaux = [0] * nbSeaux
+        self.nombre = 0
+        self.globale = 0
+        for utilisateur in utilisateurs:
+            self.ajouter(utilisateur)
+
+    def seau(self, identifiant):
+        return identifiant % self.nbSeaux
+
+    def ajouter(self, utilisateur):
+        empreinte = empreinteUtilisateur(utilisateur)
+        self._seaux[utilisateur.id % self.nbSeaux] ^= empreinte
+        self.globale ^= empreinte
+        self.nombre += 1
+
+    def retirer(self, utilisateur):
+        # Le OU exclusif est son propre inverse
+        empreinte = empreinteUtilisateur(utilisateur)
+        self._seaux[utilisateur.id % self.nbSeaux] ^= empreinte
+        self.globale ^= empreinte
+        self.nombre -= 1
+
+    def version(self):
+        return f"{self.nombre}-{self.globale:08x}"
+
+    def differences(self, empreintes):
+        """Numéros des seaux dont l'empreinte diffère de celles du serveur (8 chiffres hexadécimaux par seau)"""
+        if len(empreintes) != 8 * self.nbSeaux:
+            raise ValueError(f"{len(empreintes)} caractères d'empreintes pour {self.nbSeaux} seaux")
+        return [seau for seau, locale in enumerate(self._seaux)
+                if int(empreintes[8 * seau:8 * seau + 8], 16) != locale]
@@ -0,0 +1,43 @@
+import sys
+
+
+def interner(role):
+    """Les noms de rôle se répètent pour chaque utilisateur : une seule chaîne par nom en mémoire"""
+    return sys.intern(str(role))
+
+
+class Utilisateur:
+    """Utilisateur décodé d'une réponse SOAP (type WSDL tns:Utilisateur)"""
+
+    __slots__ = ("id", "pseudo", "email", "roles")
+
+    def __init__(self, id, pseudo, email, roles=()):
+        self.id = id
+        self.pseudo = pseudo
+        self.email = email
+        self.roles = tuple(interner(role) for role in roles)
+
+    def __eq__(self, autre):
+        if not isinstance(autre, Utilisateur):
+            return NotImplemented
+        return (self.id, self.pseudo, self.email, self.roles) == (autre.id, autre.pseudo, autre.email, autre.roles)
+
+    def __hash__(self):
+        return hash((self.id, self.pseudo, self.email, self.roles))
+
+    def __repr__(self):
+        return f"Utilisateur(id={self.id!r}, pseudo={self.pseudo!r}, email={self.email!r}, roles={self.roles!r})"
+
+
+class ReponseOperation:
+    """Réponse des opérations d'écriture (ajouter/modifier/supprimerUtilisateurResponse)"""
+
+    __slots__ = ("succes", "message", "utilisateurId")
+
+    def __init__(self, succes, message=None, utilisateurId=None):
+        self.succes = succes
+        self.message = message
+        self.utilisateurId = utilisateurId
+
+    def __repr__(self):
+        return f"ReponseOperation(succes={self.succes!r}, message={self.message!r}, utilisateurId={self.utilisateurId!r})"
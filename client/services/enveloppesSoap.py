@@ -0,0 +1,68 @@
+"""Enveloppes de requête précompilées.
+
+Les requêtes de ServicesSoap.wsdl ont une forme fixe : l'enveloppe de chaque opération est
+sérialisée une seule fois par zeep avec des marqueurs à la place des paramètres, puis découpée
+en fragments d'octets. Un appel se réduit alors à l'échappement des valeurs et à une concaténation.
+"""
+import re
+from xml.sax.saxutils import escape
+from zeep.exceptions import ValidationError
+from zeep.wsdl.utils import etree_to_string
+
+# Caractères de la zone à usage privé : valides en XML et laissés tels quels par la sérialisation
+_DEBUT_MARQUEUR = "\ue000"
+_FIN_MARQUEUR = "\ue001"
+_MARQUEUR = re.compile(re.escape(_DEBUT_MARQUEUR.encode("utf-8")) + rb"(\d+)" + re.escape(_FIN_MARQUEUR.encode("utf-8")))
+# Caractères interdits en XML 1.0, refusés aussi par lxml lors d'une sérialisation zeep
+_INTERDITS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def echapper(valeur):
+    """Valeur d'un paramètre -> contenu texte d'élément XML encodé en UTF-8"""
+    if valeur is None:
+        return b""
+    if isinstance(valeur, bool):
+        return b"true" if valeur else b"false"
+    texte = str(valeur)
+    if _INTERDITS.search(texte):
+        raise ValueError("La valeur contient un caractère interdit en XML")
+    # \r serait normalisé en \n par l'analyseur XML du serveur : il est transmis comme référence
+    return escape(texte, {"\r": "&#13;"}).encode("utf-8")
+
+
+class ModeleEnveloppe:
+    """Enveloppe d'une opération sérialisée une fois ; seuls les paramètres sont insérés à chaque appel"""
+
+    def __init__(self, client, operation):
+        binding = client.service._binding
+        self.operation = binding.get(operation)
+        elements = self.operation.input.body.type.elements
+        self.parametres = [nom for nom, _ in elements]
+        self._obligatoires = {nom for nom, element in elements if not element.is_optional and not element.nillable}
+
+        marqueurs = {nom: f"{_DEBUT_MARQUEUR}{index}{_FIN_MARQUEUR}" for index, nom in enumerate(self.parametres)}
+        enveloppe, self.entetes = binding._create(operation, (), marqueurs, client=client)
+        morceaux = _MARQUEUR.split(etree_to_string(enveloppe))
+        self._fragments = morceaux[0::2]
+        self._emplacements = [int(index) for index in morceaux[1::2]]
+
+    def remplir(self, *args, **kwargs):
+        """Corps de la requête pour ces paramètres (mêmes conventions d'appel que le proxy zeep)"""
+        if len(args) > len(self.parametres):
+            raise TypeError(f"{self.operation.name}() attend au plus {len(self.parametres)} paramètres")
+        valeurs = dict(zip(self.parametres, args))
+        for nom, valeur in kwargs.items():
+            if nom not in self.parametres:
+                raise TypeError(f"{self.operation.name}() : paramètre inattendu {nom!r}")
+            valeurs[nom] = valeur
+
+        morceaux = [self._fragments[0]]
+        for index, fragment in zip(self._emplacements, self._fragments[1:]):
+            nom = self.parametres[index]
+            valeur = valeurs.get(nom)
+            if valeur is None and nom in self._obligatoires:
+                # Même contrôle que la sérialisation zeep
+                raise ValidationError(f"Missing element {nom} ({self.operation.name}.{nom})")
+            morceaux.append(echapper(valeur))
+            morceaux.append(fragment)
+        return b"".join(morceaux)
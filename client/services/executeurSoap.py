@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+
+class ResultatLot:
+    """Issue d'un élément d'un lot : arguments transmis, résultat ou erreur"""
+
+    def __init__(self, arguments, resultat=None, erreur=None):
+        self.arguments = arguments
+        self.resultat = resultat
+        self.erreur = erreur
+
+
+class ExecuteurSoap:
+    """Exécute les appels ServiceSoap sur un pool de threads et renvoie des futures"""
+
+    def __init__(self, serviceSoap, nbTravailleurs=4, nbTravailleursLot=None):
+        self.serviceSoap = serviceSoap
+        self._pool = ThreadPoolExecutor(max_workers=nbTravailleurs, thread_name_prefix="soap")
+        # Les lots utilisent autant de threads que le transport a de connexions
+        taillePool = getattr(getattr(serviceSoap, "transport", None), "taillePool", 10)
+        self._poolLot = ThreadPoolExecutor(max_workers=nbTravailleursLot or taillePool, thread_name_prefix="lot")
+
+    def soumettre(self, methode, *args, **kwargs):
+        """methode : nom d'une méthode de ServiceSoap ou fonction quelconque"""
+        if isinstance(methode, str):
+            methode = getattr(self.serviceSoap, methode)
+        return self._pool.submit(methode, *args, **kwargs)
+
+    def soumettreLot(self, methode, listeArguments, surAnnulation=None):
+        """Appelle methode(*arguments) pour chaque élément en parallèle.
+
+        Renvoie un future unique dont le résultat est la liste des ResultatLot, dans l'ordre des arguments.
+        Annuler ce future annule les éléments qui n'ont pas encore démarré ; surAnnulation(*arguments)
+        est alors appelé pour chacun d'eux. Son attribut termine est un second future qui reçoit la même
+        liste une fois tous les éléments finis, y compris ceux déjà partis au moment de l'annulation.
+        """
+        if isinstance(methode, str):
+            methode = getattr(self.serviceSoap, methode)
+        listeArguments = [tuple(arguments) for arguments in listeArguments]
+        agregat = Future()
+        agregat.termine = Future()
+        resultats = [None] * len(listeArguments)
+        restants = [len(listeArguments)]
+        verrou = threading.Lock()
+        elements = []
+
+        if not listeArguments:
+            agregat.set_result([])
+            agregat.termine.set_result([])
+            return agregat
+
+        def terminer(index, future):
+            if future.cancelled():
+                if surAnnulation:
+                    surAnnulation(*listeArguments[index])
+                resultats[index] = ResultatLot(listeArguments[index], erreur=InterruptedError("Annulé"))
+            elif future.exception() is not None:
+                resultats[index] = ResultatLot(listeArguments[index], erreur=future.exception())
+            else:
+                resultats[index] = ResultatLot(listeArguments[index], resultat=future.result())
+            with verrou:
+                restants[0] -= 1
+                dernier = restants[0] == 0
+            if not dernier:
+                return
+            agregat.termine.set_result(resultats)
+            if not agregat.cancelled():
+                try:
+                    agregat.set_result(resultats)
+                except InvalidStateError:
+                    # Annulé entre-temps
+                    pass
+
+        for index, arguments in enumerate(listeArguments):
+            element = self._poolLot.submit(methode, *arguments)
+            elements.append(element)
+            element.add_done_callback(lambda f, i=index: terminer(i, f))
+
+        def annulerElements(future):
+            if future.cancelled():
+                for element in elements:
+                    element.cancel()
+
+        agregat.add_done_callback(annulerElements)
+        return agregat
+
+    def arreter(self, attendre=False):
+        self._pool.shutdown(wait=attendre, cancel_futures=True)
+        self._poolLot.shutdown(wait=attendre, cancel_futures=True)
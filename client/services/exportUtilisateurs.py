@@ -0,0 +1,195 @@
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import os
+import tempfile
+
+COLONNES_EXPORT = ("id", "pseudo", "email", "roles")
+FORMATS = ("csv", "jsonl", "parquet")
+EXTENSIONS_FORMAT = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+# Compression du fichier entier (CSV, JSONL) ; Parquet compresse ses colonnes lui-même
+COMPRESSIONS_FICHIER = {
+    "gzip": lambda brut: gzip.GzipFile(fileobj=brut, mode="wb", compresslevel=6),
+    "bz2": lambda brut: bz2.BZ2File(brut, mode="wb"),
+    "xz": lambda brut: lzma.LZMAFile(brut, mode="wb"),
+}
+EXTENSIONS_COMPRESSION = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+COMPRESSIONS_PARQUET = ("zstd", "snappy", "gzip", "brotli", "lz4", "aucune")
+TAILLE_TAMPON = 1 << 20
+
+
+def deduireFormat(chemin):
+    """Format d'après l'extension, extension de compression éventuelle ignorée (export.csv.gz -> csv)"""
+    base, extension = os.path.splitext(chemin.lower())
+    if extension in EXTENSIONS_COMPRESSION:
+        extension = os.path.splitext(base)[1]
+    return EXTENSIONS_FORMAT.get(extension)
+
+
+def deduireCompression(chemin):
+    return EXTENSIONS_COMPRESSION.get(os.path.splitext(chemin.lower())[1])
+
+
+class FichierAtomique:
+    """Fichier temporaire dans le dossier de la destination, renommé sur celle-ci en fin d'écriture.
+
+    Le fichier existant n'est remplacé qu'une fois l'export complet et écrit sur disque ; en cas
+    d'erreur ou d'interruption, le fichier temporaire est supprimé et la destination reste intacte.
+    """
+
+    def __init__(self, chemin):
+        self.chemin = os.path.abspath(chemin)
+        self.temporaire = None
+        self.flux = None
+
+    def __enter__(self):
+        dossier, nom = os.path.split(self.chemin)
+        descripteur, self.temporaire = tempfile.mkstemp(prefix=f".{nom}.", suffix=".tmp", dir=dossier)
+        self.flux = os.fdopen(descripteur, "wb", buffering=TAILLE_TAMPON)
+        return self.flux
+
+    def __exit__(self, typeErreur, erreur, trace):
+        try:
+            if typeErreur is None:
+                self.flux.flush()
+                os.fsync(self.flux.fileno())
+            self.flux.close()
+            if typeErreur is None:
+                # mkstemp crée le fichier en 0600 : on garde les droits d'un export précédent s'il existe
+                if os.path.exists(self.chemin):
+                    os.chmod(self.temporaire, os.stat(self.chemin).st_mode & 0o777)
+                os.replace(self.temporaire, self.chemin)
+                self._synchroniserDossier()
+                self.temporaire = None
+        finally:
+            if self.temporaire is not None:
+                try:
+                    os.unlink(self.temporaire)
+                except OSError:
+                    pass
+        return False
+
+    def _synchroniserDossier(self):
+        if os.name != "posix":
+            return
+        descripteur = os.open(os.path.dirname(self.chemin), os.O_RDONLY)
+        try:
+            os.fsync(descripteur)
+        finally:
+            os.close(descripteur)
+
+
+class EcrivainCsv:
+    def __init__(self, flux):
+        self.texte = io.TextIOWrapper(flux, encoding="utf-8", newline="")
+        self.ecrivain = csv.writer(self.texte)
+        self.ecrivain.writerow(COLONNES_EXPORT)
+
+    def ecrire(self, u):
+        self.ecrivain.writerow((u.id, u.pseudo, u.email, ", ".join(u.roles)))
+
+    def fermer(self):
+        self.texte.flush()
+        self.texte.detach()
+
+
+class EcrivainJsonl:
+    def __init__(self, flux):
+        self.texte = io.TextIOWrapper(flux, encoding="utf-8", newline="\n")
+        self.encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    def ecrire(self, u):
+        self.texte.write(self.encoder({"id": u.id, "pseudo": u.pseudo, "email": u.email, "roles": list(u.roles)}))
+        self.texte.write("\n")
+
+    def fermer(self):
+        self.texte.flush()
+        self.texte.detach()
+
+
+class EcrivainParquet:
+    """Parquet par groupes de lignes : seul le lot en cours est gardé en mémoire (pyarrow requis)"""
+
+    def __init__(self, flux, compression="zstd", tailleLot=50000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Le format parquet nécessite pyarrow (pip install pyarrow)") from None
+        self.pa = pyarrow
+        self.schema = pyarrow.schema([
+            ("id", pyarrow.int64()),
+            ("pseudo", pyarrow.string()),
+            ("email", pyarrow.string()),
+            ("roles", pyarrow.list_(pyarrow.string())),
+        ])
+        self.ecrivain = pyarrow.parquet.ParquetWriter(flux, self.schema,
+                                                      compression="none" if compression == "aucune" else compression)
+        self.tailleLot = tailleLot
+        self._vider()
+
+    def _vider(self):
+        self.colonnes = {colonne: [] for colonne in COLONNES_EXPORT}
+
+    def _ecrireLot(self):
+        if self.colonnes["id"]:
+            self.ecrivain.write_table(self.pa.Table.from_pydict(self.colonnes, schema=self.schema))
+            self._vider()
+
+    def ecrire(self, u):
+        colonnes = self.colonnes
+        colonnes["id"].append(u.id)
+        colonnes["pseudo"].append(u.pseudo)
+        colonnes["email"].append(u.email)
+        colonnes["roles"].append(list(u.roles))
+        if len(colonnes["id"]) >= self.tailleLot:
+            self._ecrireLot()
+
+    def fermer(self):
+        self._ecrireLot()
+        self.ecrivain.close()
+
+
+def exporterUtilisateurs(utilisateurs, chemin, format=None, compression=None, progression=None, intervalle=10000):
+    """Écrit les utilisateurs au fil de l'itération dans chemin, remplacé de façon atomique.
+
+    format et compression sont déduits de l'extension s'ils ne sont pas donnés ; progression(n)
+    est appelée toutes les `intervalle` lignes. Retourne le nombre d'utilisateurs écrits.
+    """
+    format = format or deduireFormat(chemin)
+    if format not in FORMATS:
+        raise ValueError(f"Format inconnu pour {chemin} : utilisez --format ({', '.join(FORMATS)})")
+    if format == "parquet":
+        compression = compression or "zstd"
+        if compression not in COMPRESSIONS_PARQUET:
+            raise ValueError(f"Compression {compression} non disponible en parquet ({', '.join(COMPRESSIONS_PARQUET)})")
+    else:
+        compression = compression or deduireCompression(chemin) or "aucune"
+        if compression != "aucune" and compression not in COMPRESSIONS_FICHIER:
+            raise ValueError(f"Compression inconnue : {compression} ({', '.join(COMPRESSIONS_FICHIER)}, aucune)")
+
+    nombre = 0
+    with FichierAtomique(chemin) as brut:
+        flux = brut
+        if format != "parquet" and compression != "aucune":
+            flux = COMPRESSIONS_FICHIER[compression](brut)
+        if format == "csv":
+            ecrivain = EcrivainCsv(flux)
+        elif format == "jsonl":
+            ecrivain = EcrivainJsonl(flux)
+        else:
+            ecrivain = EcrivainParquet(flux, compression)
+
+        ecrire = ecrivain.ecrire
+        for utilisateur in utilisateurs:
+            ecrire(utilisateur)
+            nombre += 1
+            if progression and nombre % intervalle == 0:
+                progression(nombre)
+        ecrivain.fermer()
+        if flux is not brut:
+            flux.close()
+    return nombre
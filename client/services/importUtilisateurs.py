@@ -0,0 +1,215 @@
+import csv
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utilitaires.exceptions import ServeurIndisponible, TokenExpireException, ErreurAuthentification
+from utilitaires.validation import validerUtilisateur
+
+COLONNES_RAPPORT = ("ligne", "pseudo", "email", "role", "statut", "utilisateurId", "message")
+
+
+class LigneInvalide:
+    """Ligne illisible du fichier : rapportée comme invalide sans interrompre l'import"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def lireFichier(chemin):
+    """Lit un fichier CSV (séparateur , ou ;) ou JSONL ; produit des couples (numéro de ligne, dict ou LigneInvalide)"""
+    if chemin.lower().endswith((".jsonl", ".ndjson")):
+        with open(chemin, "r", encoding="utf-8") as fichier:
+            for numero, ligne in enumerate(fichier, start=1):
+                if not ligne.strip():
+                    continue
+                try:
+                    donnees = json.loads(ligne)
+                except ValueError as e:
+                    yield numero, LigneInvalide(f"JSON invalide : {e}")
+                    continue
+                if not isinstance(donnees, dict):
+                    yield numero, LigneInvalide("La ligne n'est pas un objet JSON")
+                    continue
+                yield numero, donnees
+        return
+
+    with open(chemin, "r", encoding="utf-8-sig", newline="") as fichier:
+        echantillon = fichier.read(4096)
+        fichier.seek(0)
+        try:
+            dialecte = csv.Sniffer().sniff(echantillon, delimiters=",;")
+        except csv.Error:
+            dialecte = csv.excel
+        # La ligne 1 est l'en-tête
+        for numero, ligne in enumerate(csv.DictReader(fichier, dialect=dialecte), start=2):
+            yield numero, ligne
+
+
+class LimiteurDebit:
+    """Seau à jetons partagé entre les threads : au plus `debit` appels par seconde"""
+
+    def __init__(self, debit, rafale=None):
+        self.debit = debit
+        self.capacite = rafale or max(1, int(debit))
+        self._jetons = self.capacite
+        self._dernier = time.monotonic()
+        self._verrou = threading.Lock()
+
+    def attendre(self):
+        if not self.debit:
+            return
+        while True:
+            with self._verrou:
+                maintenant = time.monotonic()
+                self._jetons = min(self.capacite, self._jetons + (maintenant - self._dernier) * self.debit)
+                self._dernier = maintenant
+                if self._jetons >= 1:
+                    self._jetons -= 1
+                    return
+                attente = (1 - self._jetons) / self.debit
+            time.sleep(attente)
+
+
+class ResultatImport:
+    def __init__(self, ligne, donnees, statut, utilisateurId=None, message=""):
+        self.ligne = ligne
+        self.pseudo = donnees.get("pseudo", "")
+        self.email = donnees.get("email", "")
+        self.role = donnees.get("role", "")
+        self.statut = statut
+        self.utilisateurId = utilisateurId
+        self.message = message
+
+    def enDict(self):
+        return {colonne: getattr(self, colonne) for colonne in COLONNES_RAPPORT}
+
+
+class ImportUtilisateurs:
+    """Import concurrent d'utilisateurs : validation locale, pool borné, limitation de débit et reprises.
+
+    `ajouter` a la signature de ServiceSoap.ajouterUtilisateur (ou DepotUtilisateurs.ajouterUtilisateur).
+    Les compteurs total/traites/reussis/echecs peuvent être lus depuis un autre thread pour suivre la progression.
+    """
+
+    def __init__(self, ajouter, jeton, nbTravailleurs=8, debit=20, tentatives=3, delaiReprise=0.5):
+        self.ajouter = ajouter
+        self.jeton = jeton
+        self.nbTravailleurs = nbTravailleurs
+        self.limiteur = LimiteurDebit(debit)
+        self.tentatives = tentatives
+        self.delaiReprise = delaiReprise
+        self._annulation = threading.Event()
+        self._verrou = threading.Lock()
+        self.total = 0
+        self.traites = 0
+        self.reussis = 0
+        self.echecs = 0
+
+    @staticmethod
+    def normaliser(donnees):
+        return {
+            "pseudo": (donnees.get("pseudo") or "").strip(),
+            "email": (donnees.get("email") or "").strip(),
+            "motDePasse": donnees.get("motDePasse") or donnees.get("mot_de_passe") or "",
+            "role": (donnees.get("role") or "").strip() or "visiteur",
+        }
+
+    def valider(self, lignes, rolesDisponibles=None):
+        """Sépare les lignes valides des lignes rejetées (règles du backend et doublons dans le fichier)"""
+        valides, rejets = [], []
+        pseudosVus, emailsVus = set(), set()
+        for numero, brute in lignes:
+            if isinstance(brute, LigneInvalide):
+                rejets.append(ResultatImport(numero, {}, "invalide", message=brute.message))
+                continue
+            donnees = self.normaliser(brute)
+            erreurs = validerUtilisateur(donnees["pseudo"], donnees["email"], donnees["motDePasse"],
+                                         donnees["role"], rolesDisponibles)
+            if donnees["pseudo"] in pseudosVus or donnees["email"].lower() in emailsVus:
+                erreurs.append("Doublon dans le fichier")
+            if erreurs:
+                rejets.append(ResultatImport(numero, donnees, "invalide", message=", ".join(erreurs)))
+                continue
+            pseudosVus.add(donnees["pseudo"])
+            emailsVus.add(donnees["email"].lower())
+            valides.append((numero, donnees))
+        return valides, rejets
+
+    def executer(self, lignes, rolesDisponibles=None, progression=None):
+        """Valide puis soumet les lignes ; retourne un résultat par ligne, dans l'ordre du fichier"""
+        valides, resultats = self.valider(lignes, rolesDisponibles)
+        self.total = len(valides) + len(resultats)
+        self.traites = self.echecs = len(resultats)
+        if progression:
+            progression(self)
+
+        with ThreadPoolExecutor(max_workers=self.nbTravailleurs, thread_name_prefix="import") as pool:
+            futures = {pool.submit(self._soumettre, numero, donnees): (numero, donnees) for numero, donnees in valides}
+            try:
+                self._collecter(futures, resultats, progression)
+            except BaseException:
+                # Interruption (Ctrl+C) : ne pas attendre les lignes encore en file
+                self.annuler()
+                for future in futures:
+                    future.cancel()
+                raise
+
+        resultats.sort(key=lambda r: r.ligne)
+        return resultats
+
+    def _collecter(self, futures, resultats, progression):
+        for future in as_completed(futures):
+            if future.cancelled():
+                resultat = ResultatImport(*futures[future], "annule")
+            else:
+                resultat = future.result()
+            resultats.append(resultat)
+            with self._verrou:
+                self.traites += 1
+                if resultat.statut == "ajoute":
+                    self.reussis += 1
+                elif resultat.statut != "annule":
+                    self.echecs += 1
+            if progression:
+                progression(self)
+            if self._annulation.is_set():
+                for restant in futures:
+                    restant.cancel()
+
+    def annuler(self):
+        self._annulation.set()
+
+    def _soumettre(self, numero, donnees):
+        if self._annulation.is_set():
+            return ResultatImport(numero, donnees, "annule")
+        for tentative in range(1, self.tentatives + 1):
+            self.limiteur.attendre()
+            try:
+                reponse = self.ajouter(self.jeton, donnees["pseudo"], donnees["email"], donnees["motDePasse"], donnees["role"])
+            except (TokenExpireException, ErreurAuthentification) as e:
+                # Jeton expiré ou droits refusés, inutile de poursuivre : toutes les lignes suivantes échoueraient
+                self.annuler()
+                return ResultatImport(numero, donnees, "echec", message=str(e))
+            except ServeurIndisponible as e:
+                # Disjoncteur ouvert : la requête n'est pas partie, la reprendre ne peut pas créer de doublon.
+                # Les autres erreurs réseau sont déjà reprises par la politique quand c'est sans risque.
+                if tentative == self.tentatives or self._annulation.is_set():
+                    return ResultatImport(numero, donnees, "echec", message=str(e))
+                time.sleep(self.delaiReprise * (2 ** (tentative - 1)) * random.uniform(0.5, 1.5))
+                continue
+            except Exception as e:
+                return ResultatImport(numero, donnees, "echec", message=str(e))
+            if reponse.succes:
+                return ResultatImport(numero, donnees, "ajoute", utilisateurId=reponse.utilisateurId)
+            return ResultatImport(numero, donnees, "echec", message=reponse.message or "Refusé par le serveur")
+
+
+def ecrireRapport(resultats, chemin):
+    with open(chemin, "w", encoding="utf-8", newline="") as fichier:
+        ecrivain = csv.DictWriter(fichier, fieldnames=COLONNES_RAPPORT)
+        ecrivain.writeheader()
+        for resultat in resultats:
+            ecrivain.writerow(resultat.enDict())
@@ -0,0 +1,103 @@
+"""Index en mémoire des utilisateurs chargés : recherche, filtre par rôle et clés de tri par colonne.
+
+La recherche ne fait aucun appel réseau. Une sous-chaîne de pseudo ou d'email est cherchée sans
+distinction de casse ; quand la saisie prolonge la précédente, seuls les résultats précédents sont
+réexaminés, ce qui garde chaque frappe bien en dessous de la durée d'une image à 100 000 utilisateurs.
+"""
+
+COLONNES_TRI = ("id", "pseudo", "email", "roles")
+
+
+def normaliser(texte):
+    return (texte or "").casefold()
+
+
+class IndexUtilisateurs:
+    def __init__(self, utilisateurs=()):
+        self._textes = {}     # identifiant -> "pseudo\0email" normalisé
+        self._roles = {}      # rôle -> identifiants (index inversé)
+        self._rolesDe = {}    # identifiant -> rôles indexés
+        self._cles = {colonne: {} for colonne in COLONNES_TRI}
+        self._derniere = None  # (texte, rôle, identifiants trouvés) de la dernière recherche
+        for utilisateur in utilisateurs:
+            self._indexer(utilisateur)
+
+    def __len__(self):
+        return len(self._textes)
+
+    def __contains__(self, identifiant):
+        return identifiant in self._textes
+
+    # --- Maintenance incrémentale ---
+
+    def _indexer(self, u):
+        self._textes[u.id] = f"{normaliser(u.pseudo)}\0{normaliser(u.email)}"
+        for role in u.roles:
+            self._roles.setdefault(role, set()).add(u.id)
+        self._rolesDe[u.id] = u.roles
+        self._cles["id"][u.id] = u.id
+        self._cles["pseudo"][u.id] = normaliser(u.pseudo)
+        self._cles["email"][u.id] = normaliser(u.email)
+        self._cles["roles"][u.id] = ", ".join(u.roles)
+
+    def mettreAJour(self, utilisateur):
+        self.supprimer(utilisateur.id)
+        self._indexer(utilisateur)
+        self._derniere = None
+
+    def supprimer(self, identifiant):
+        if self._textes.pop(identifiant, None) is None:
+            return
+        for role in self._rolesDe.pop(identifiant, ()):
+            porteurs = self._roles.get(role)
+            if porteurs is not None:
+                porteurs.discard(identifiant)
+                if not porteurs:
+                    del self._roles[role]
+        for cles in self._cles.values():
+            cles.pop(identifiant, None)
+        self._derniere = None
+
+    # --- Consultation ---
+
+    def roles(self):
+        return sorted(self._roles)
+
+    def porteurs(self, role):
+        """Identifiants des utilisateurs ayant ce rôle"""
+        return self._roles.get(role, set())
+
+    def rechercher(self, texte="", role=None):
+        """Identifiants dont le pseudo ou l'email contient texte et, si donné, ayant ce rôle.
+
+        Retourne None lorsque tous les utilisateurs conviennent, notamment sans critère.
+        """
+        texte = normaliser(texte.strip())
+        if not texte and not role:
+            self._derniere = None
+            return None
+
+        derniere = self._derniere
+        textes = self._textes
+        if derniere is not None and derniere[1] == role and derniere[0] in texte and derniere[2] is not None:
+            # La saisie prolonge la précédente : ses résultats contiennent tous les nouveaux
+            trouves = derniere[2]
+            if texte != derniere[0]:
+                trouves = {i for i in trouves if texte in textes[i]}
+        elif role:
+            porteurs = self._roles.get(role, set())
+            trouves = {i for i in porteurs if texte in textes[i]} if texte else set(porteurs)
+        else:
+            trouves = {i for i, t in textes.items() if texte in t}
+
+        if len(trouves) == len(textes):
+            # Tout correspond : pas de filtre à appliquer
+            trouves = None
+        self._derniere = (texte, role, trouves)
+        return trouves
+
+    def cle(self, colonne):
+        """Fonction identifiant -> clé de tri de la colonne (pseudo et email sans casse)"""
+        cles = self._cles[colonne]
+        defaut = 0 if colonne == "id" else ""
+        return lambda identifiant: cles.get(identifiant, defaut)
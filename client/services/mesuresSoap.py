@@ -0,0 +1,133 @@
+"""Mesures par opération SOAP : durées par phase, tailles échangées et erreurs.
+
+ServiceSoap découpe chaque appel en phases (serialisation, http, deserialisation, total ;
+wsdl et compilation pour connecter) et les enregistre ici lorsque la mesure est active.
+Inactive, elle ne coûte qu'un test d'attribut par appel.
+"""
+import csv
+import json
+import threading
+from collections import deque
+from time import perf_counter
+
+PERCENTILES = (50, 95, 99)
+COLONNES_CSV = ("operation", "phase", "mesures", "p50_ms", "p95_ms", "p99_ms", "max_ms",
+                "appels", "erreurs", "octetsEmis", "octetsRecus")
+
+
+def chronometrer(iterable, phases, phase):
+    """Itère en cumulant dans phases[phase] le seul temps passé à produire les éléments"""
+    iterateur = iter(iterable)
+    phases.setdefault(phase, 0.0)
+    while True:
+        debut = perf_counter()
+        try:
+            element = next(iterateur)
+        except StopIteration:
+            return
+        finally:
+            phases[phase] += perf_counter() - debut
+        yield element
+
+
+class HistogrammeGlissant:
+    """Dernières durées d'une phase (en secondes) ; les percentiles portent sur cette fenêtre"""
+
+    def __init__(self, capacite=1024):
+        self._valeurs = deque(maxlen=capacite)
+
+    def ajouter(self, duree):
+        self._valeurs.append(duree)
+
+    def __len__(self):
+        return len(self._valeurs)
+
+    def percentile(self, p):
+        """Percentile p (en secondes) de la fenêtre courante, None si elle est vide"""
+        valeurs = sorted(self._valeurs)
+        return valeurs[max(0, -(-p * len(valeurs) // 100) - 1)] if valeurs else None
+
+    def resume(self):
+        """{"mesures", "p50_ms", "p95_ms", "p99_ms", "max_ms"} sur la fenêtre courante"""
+        valeurs = sorted(self._valeurs)
+        resume = {"mesures": len(valeurs)}
+        for p in PERCENTILES:
+            # Percentile au rang le plus proche
+            rang = max(0, -(-p * len(valeurs) // 100) - 1)
+            resume[f"p{p}_ms"] = round(valeurs[rang] * 1000, 3) if valeurs else None
+        resume["max_ms"] = round(valeurs[-1] * 1000, 3) if valeurs else None
+        return resume
+
+
+class StatistiquesOperation:
+    def __init__(self, capacite):
+        self.capacite = capacite
+        self.appels = 0
+        self.erreurs = 0
+        self.octetsEmis = 0
+        self.octetsRecus = 0
+        self.phases = {}
+
+    def enregistrer(self, phases, octetsEmis, octetsRecus, erreur):
+        self.appels += 1
+        self.erreurs += bool(erreur)
+        self.octetsEmis += octetsEmis
+        self.octetsRecus += octetsRecus
+        for phase, duree in phases.items():
+            histogramme = self.phases.get(phase)
+            if histogramme is None:
+                histogramme = self.phases[phase] = HistogrammeGlissant(self.capacite)
+            histogramme.ajouter(duree)
+
+
+class MesuresSoap:
+    """Collecte partagée entre les threads de l'exécuteur ; consultée par le panneau de mesures"""
+
+    def __init__(self, actif=False, capacite=1024):
+        self.actif = actif
+        self.capacite = capacite
+        self._operations = {}
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, operation, phases, octetsEmis=0, octetsRecus=0, erreur=False):
+        with self._verrou:
+            statistiques = self._operations.get(operation)
+            if statistiques is None:
+                statistiques = self._operations[operation] = StatistiquesOperation(self.capacite)
+            statistiques.enregistrer(phases, octetsEmis, octetsRecus, erreur)
+
+    def reinitialiser(self):
+        with self._verrou:
+            self._operations.clear()
+
+    def instantane(self):
+        """{operation: {"appels", "erreurs", "octetsEmis", "octetsRecus", "phases": {phase: resume}}}"""
+        with self._verrou:
+            return {
+                operation: {
+                    "appels": s.appels,
+                    "erreurs": s.erreurs,
+                    "octetsEmis": s.octetsEmis,
+                    "octetsRecus": s.octetsRecus,
+                    "phases": {phase: h.resume() for phase, h in s.phases.items()},
+                }
+                for operation, s in sorted(self._operations.items())
+            }
+
+    def lignes(self):
+        """Une ligne par (opération, phase), dans l'ordre de COLONNES_CSV"""
+        for operation, s in self.instantane().items():
+            for phase, resume in s["phases"].items():
+                yield {"operation": operation, "phase": phase, **resume,
+                       "appels": s["appels"], "erreurs": s["erreurs"],
+                       "octetsEmis": s["octetsEmis"], "octetsRecus": s["octetsRecus"]}
+
+    def exporterJson(self, chemin):
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            json.dump(self.instantane(), fichier, ensure_ascii=False, indent=2)
+
+    def exporterCsv(self, chemin):
+        with open(chemin, "w", newline="", encoding="utf-8") as fichier:
+            ecrivain = csv.DictWriter(fichier, fieldnames=COLONNES_CSV)
+            ecrivain.writeheader()
+            ecrivain.writerows(self.lignes())
@@ -0,0 +1,273 @@
+"""Politique de résilience des appels SOAP : classement des erreurs, reprises, relance et disjoncteur.
+
+Les erreurs sont classées d'après leur type et le code ou le texte exact des Fault du backend, et
+non plus en cherchant « expiré » dans n'importe quel message :
+- une erreur transitoire (connexion refusée ou coupée, délai dépassé, 502/503/504) est reprise
+  pour les lectures, avec un délai exponentiel tiré au hasard ;
+- une requête qui n'a jamais quitté le client (connexion impossible) est reprise même en écriture ;
+- une lecture courte qui tarde au-delà du p95 observé est relancée en parallèle, la première
+  réponse l'emporte ;
+- après plusieurs erreurs transitoires consécutives, le disjoncteur s'ouvre : les appels échouent
+  immédiatement au lieu d'attendre chacun leur délai, puis un appel d'essai est laissé passer.
+Un Fault n'est jamais repris : le serveur a répondu.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from urllib3.exceptions import (NewConnectionError, ConnectTimeoutError, ProtocolError, ReadTimeoutError,
+                                IncompleteRead)
+from zeep.exceptions import Fault, TransportError
+
+from services.mesuresSoap import HistogrammeGlissant
+from utilitaires.exceptions import ServeurIndisponible
+
+JETON = "jeton"                # jeton absent, invalide ou expiré
+AUTORISATION = "autorisation"  # jeton valide mais droits insuffisants
+FAUTE = "faute"                # autre Fault : le serveur a répondu
+NON_ENVOYE = "non_envoye"      # la requête n'a pas quitté le client
+TRANSITOIRE = "transitoire"    # réponse perdue ou serveur momentanément indisponible
+INDISPONIBLE = "indisponible"  # refus du disjoncteur
+AUTRE = "autre"
+
+# Codes dédiés si le backend en expose ; ServicesSoap.php lève aujourd'hui SoapFault('Server', message)
+CODES_JETON = frozenset({"JetonExpire", "JetonInvalide", "TokenExpire"})
+CODES_AUTORISATION = frozenset({"NonAutorise"})
+MESSAGES_JETON = frozenset({"jeton invalide ou expiré", "token expiré"})
+MESSAGES_AUTORISATION = frozenset({"non autorisé"})
+STATUTS_TRANSITOIRES = frozenset({429, 502, 503, 504})
+
+OPERATIONS_IDEMPOTENTES = frozenset({"connecter", "listerRoles", "listerUtilisateurs", "listerUtilisateursPage",
+                                     "etatUtilisateurs", "listerUtilisateursSeaux"})
+# Lectures courtes seulement : relancer listerUtilisateurs doublerait la plus lourde requête du serveur
+OPERATIONS_RELANCEES = frozenset({"listerRoles", "listerUtilisateursPage"})
+
+
+def _nomLocal(code):
+    return (code or "").rpartition(":")[2].rpartition("}")[2]
+
+
+def classerMessage(message):
+    """JETON ou AUTORISATION d'après le texte exact d'un message du backend, sinon None.
+
+    Les écritures du backend ne lèvent pas de Fault : elles renvoient succes = false avec ce message.
+    """
+    message = (message or "").strip().casefold()
+    if message in MESSAGES_JETON:
+        return JETON
+    if message in MESSAGES_AUTORISATION:
+        return AUTORISATION
+    return None
+
+
+def classerErreur(erreur):
+    """Nature d'une erreur levée par un appel (une des constantes du module)"""
+    if isinstance(erreur, ServeurIndisponible):
+        return INDISPONIBLE
+    if isinstance(erreur, Fault):
+        code = _nomLocal(erreur.code)
+        nature = classerMessage(erreur.message)
+        if code in CODES_JETON or nature == JETON:
+            return JETON
+        if code in CODES_AUTORISATION or nature == AUTORISATION:
+            return AUTORISATION
+        return FAUTE
+    if isinstance(erreur, requests.exceptions.ConnectTimeout):
+        return NON_ENVOYE
+    if isinstance(erreur, requests.exceptions.ConnectionError):
+        raison = getattr(erreur.args[0], "reason", None) if erreur.args else None
+        if isinstance(raison, (NewConnectionError, ConnectTimeoutError)):
+            return NON_ENVOYE
+        return TRANSITOIRE
+    if isinstance(erreur, (requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError,
+                           ProtocolError, ReadTimeoutError, IncompleteRead, ConnectionError, TimeoutError)):
+        return TRANSITOIRE
+    if isinstance(erreur, TransportError) and erreur.status_code in STATUTS_TRANSITOIRES:
+        return TRANSITOIRE
+    return AUTRE
+
+
+class Disjoncteur:
+    """Fermé : tout passe. Ouvert après `seuil` erreurs transitoires consécutives : tout est refusé
+    pendant `delaiOuverture` secondes. Puis semi-ouvert : un seul appel d'essai, qui referme ou rouvre."""
+
+    def __init__(self, seuil=5, delaiOuverture=10.0, horloge=time.monotonic):
+        self.seuil = seuil
+        self.delaiOuverture = delaiOuverture
+        self.horloge = horloge
+        self._echecs = 0
+        self._ouvertureA = None
+        self._essaiEnCours = False
+        self._verrou = threading.Lock()
+
+    @property
+    def ouvert(self):
+        return self._ouvertureA is not None
+
+    def autoriser(self):
+        with self._verrou:
+            if self._ouvertureA is None:
+                return
+            restant = self._ouvertureA + self.delaiOuverture - self.horloge()
+            if restant <= 0 and not self._essaiEnCours:
+                self._essaiEnCours = True
+                return
+        raise ServeurIndisponible(f"Serveur indisponible, nouvel essai dans {max(restant, 0):.0f} s")
+
+    def succes(self):
+        with self._verrou:
+            self._echecs = 0
+            self._ouvertureA = None
+            self._essaiEnCours = False
+
+    def abandonner(self):
+        """L'essai autorisé s'est interrompu sans issue (KeyboardInterrupt…) : un autre pourra être tenté"""
+        with self._verrou:
+            self._essaiEnCours = False
+
+    def echec(self):
+        with self._verrou:
+            self._echecs += 1
+            if self._essaiEnCours or self._echecs >= self.seuil:
+                self._ouvertureA = self.horloge()
+                self._essaiEnCours = False
+
+
+class PolitiqueSoap:
+    def __init__(self, tentatives=3, delaiBase=0.1, delaiMax=2.0, relance=True, seuilRelance=1.0,
+                 seuilRelanceMin=0.05, disjoncteur=None, attendre=time.sleep):
+        self.tentatives = tentatives
+        self.delaiBase = delaiBase
+        self.delaiMax = delaiMax
+        self.relance = relance
+        # Avant d'avoir assez de mesures, une lecture est relancée après seuilRelance secondes
+        self.seuilRelance = seuilRelance
+        self.seuilRelanceMin = seuilRelanceMin
+        self.disjoncteur = disjoncteur or Disjoncteur()
+        self.attendre = attendre
+        self._durees = {}
+        self._verrou = threading.Lock()
+        # Créé à la première lecture relancée, arrêté par arreter()
+        self._pool = None
+
+    def delai(self, tentative):
+        """Attente avant la reprise n° tentative : tirée entre 0 et le plafond exponentiel"""
+        return random.uniform(0, min(self.delaiMax, self.delaiBase * 2 ** (tentative - 1)))
+
+    def seuil(self, operation):
+        """Durée au-delà de laquelle une lecture est relancée : p95 des dernières réponses"""
+        with self._verrou:
+            durees = self._durees.get(operation)
+            if durees is None or len(durees) < 20:
+                return self.seuilRelance
+            return max(self.seuilRelanceMin, durees.percentile(95))
+
+    def executer(self, operation, fonction):
+        """fonction() sous la politique : reprises, relance et disjoncteur selon l'opération"""
+        tentative = 0
+        while True:
+            tentative += 1
+            self.disjoncteur.autoriser()
+            try:
+                if self.relance and operation in OPERATIONS_RELANCEES:
+                    resultat = self._executerAvecRelance(operation, fonction)
+                else:
+                    resultat = fonction()
+            except Exception as e:
+                if not self._reprendre(operation, e, tentative):
+                    raise
+                continue
+            except BaseException:
+                self.disjoncteur.abandonner()
+                raise
+            self.disjoncteur.succes()
+            return resultat
+
+    def iterer(self, operation, fabrique):
+        """Comme executer pour un flux : reprise possible tant qu'aucun élément n'a été rendu"""
+        tentative = 0
+        while True:
+            tentative += 1
+            self.disjoncteur.autoriser()
+            iterateur = iter(fabrique())
+            try:
+                premier = next(iterateur)
+            except StopIteration:
+                self.disjoncteur.succes()
+                return
+            except Exception as e:
+                if not self._reprendre(operation, e, tentative):
+                    raise
+                continue
+            except BaseException:
+                self.disjoncteur.abandonner()
+                raise
+            # Le serveur répond : l'appelant peut cesser de lire sans laisser le disjoncteur en essai
+            self.disjoncteur.succes()
+            break
+
+        yield premier
+        try:
+            yield from iterateur
+        except Exception as e:
+            self._noterEchec(e)
+            raise
+
+    def _noterEchec(self, erreur):
+        nature = classerErreur(erreur)
+        if nature in (TRANSITOIRE, NON_ENVOYE):
+            self.disjoncteur.echec()
+        elif nature != INDISPONIBLE:
+            # Le serveur a répondu, ou l'erreur est locale
+            self.disjoncteur.succes()
+        return nature
+
+    def _reprendre(self, operation, erreur, tentative):
+        """Note l'échec ; attend puis retourne True si l'appel doit être refait"""
+        nature = self._noterEchec(erreur)
+        reprenable = nature == NON_ENVOYE or (nature == TRANSITOIRE and operation in OPERATIONS_IDEMPOTENTES)
+        if not reprenable or tentative >= self.tentatives or self.disjoncteur.ouvert:
+            return False
+        self.attendre(self.delai(tentative))
+        return True
+
+    def arreter(self):
+        """Arrête les threads de relance ; une requête bloquée ne retient plus le processus à la sortie"""
+        with self._verrou:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _obtenirPool(self):
+        with self._verrou:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="relance")
+            return self._pool
+
+    def _executerAvecRelance(self, operation, fonction):
+        debut = time.perf_counter()
+        pool = self._obtenirPool()
+        premier = pool.submit(fonction)
+        wait([premier], timeout=self.seuil(operation))
+        enCours = {premier}
+        if not premier.done():
+            # Le premier appel n'est pas interrompu : sa réponse éventuelle sera ignorée
+            enCours.add(pool.submit(fonction))
+        erreur = None
+        while enCours:
+            termines, enCours = wait(enCours, return_when=FIRST_COMPLETED)
+            for future in termines:
+                if future.exception() is None:
+                    self._noterDuree(operation, time.perf_counter() - debut)
+                    return future.result()
+                erreur = future.exception()
+        raise erreur
+
+    def _noterDuree(self, operation, duree):
+        with self._verrou:
+            durees = self._durees.get(operation)
+            if durees is None:
+                durees = self._durees[operation] = HistogrammeGlissant(256)
+            durees.ajouter(duree)
@@ -0,0 +1,174 @@
+"""Répartition des appels SOAP entre plusieurs répliques du backend.
+
+Chaque point d'accès est l'URL du WSDL d'une réplique ; ses requêtes sont postées à cette même URL
+sans la requête (soap.php?wsdl -> soap.php), car le WSDL du backend annonce toujours localhost.
+Avec un seul point d'accès, l'adresse annoncée par le WSDL est conservée.
+
+Un appel va au point disponible de plus faible coût : latence récente (moyenne glissante des appels
+et des sondes) multipliée par le nombre d'appels déjà en cours sur ce point. Un appel isolé part donc
+vers la réplique la plus rapide, tandis que les appels simultanés d'un lot se répartissent. Une erreur
+réseau retire le point jusqu'à ce qu'une sonde (HEAD du WSDL, toutes les `intervalle` secondes) le
+trouve de nouveau disponible ; la reprise de la politique part alors vers un autre point. Les jetons
+étant valables sur toutes les répliques, ce basculement est transparent.
+"""
+import os
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+URL_WSDL_DEFAUT = "http://localhost/luXew/backend/public/soap.php?wsdl"
+FICHIER_POINTS_ACCES = os.path.join(os.path.expanduser("~"), ".config", "luxew", "points_acces")
+
+
+def lirePointsAcces(environ=None):
+    """URL des WSDL : LUXEW_POINTS_ACCES (séparées par des virgules ou des espaces), sinon le fichier
+    LUXEW_FICHIER_POINTS_ACCES ou ~/.config/luxew/points_acces (une par ligne, # pour commenter),
+    sinon URL_WSDL_DEFAUT"""
+    environ = os.environ if environ is None else environ
+    valeur = environ.get("LUXEW_POINTS_ACCES", "")
+    urls = [url for url in valeur.replace(",", " ").split() if url]
+    if urls:
+        return urls
+    chemin = environ.get("LUXEW_FICHIER_POINTS_ACCES", FICHIER_POINTS_ACCES)
+    try:
+        with open(chemin, encoding="utf-8") as fichier:
+            urls = [ligne.split("#", 1)[0].strip() for ligne in fichier]
+    except FileNotFoundError:
+        urls = []
+    return [url for url in urls if url] or [URL_WSDL_DEFAUT]
+
+
+def adresseDepuisUrl(url):
+    """URL du WSDL -> adresse du service (soap.php?wsdl -> soap.php)"""
+    morceaux = urlsplit(url)
+    return urlunsplit((morceaux.scheme, morceaux.netloc, morceaux.path, "", ""))
+
+
+class PointAcces:
+    def __init__(self, url, adresse=None):
+        self.url = url
+        self.adresse = adresse
+        self.latence = None      # moyenne glissante, en secondes
+        self.disponible = True
+        self.enCours = 0
+        self.echecs = 0
+        self.dernierEchec = 0.0
+
+    def __repr__(self):
+        return f"PointAcces({self.url!r}, disponible={self.disponible}, latence={self.latence})"
+
+
+class RepartiteurSoap:
+    def __init__(self, urls, transport, intervalle=5.0, lissage=0.3):
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls:
+            raise ValueError("Aucun point d'accès SOAP")
+        plusieurs = len(urls) > 1
+        self.points = [PointAcces(url, adresseDepuisUrl(url) if plusieurs else None) for url in urls]
+        self.transport = transport
+        self.intervalle = intervalle
+        self.lissage = lissage
+        self._verrou = threading.Lock()
+        self._arret = None
+        self._sondeur = None
+
+    def __len__(self):
+        return len(self.points)
+
+    def lier(self, adresse):
+        """Adresse annoncée par le WSDL, pour les points qui n'en ont pas (point d'accès unique)"""
+        for point in self.points:
+            if point.adresse is None:
+                point.adresse = adresse
+
+    # --- Choix du point ---
+
+    def _cout(self, point):
+        return (point.latence or 0.001) * (1 + point.enCours)
+
+    def ordre(self):
+        """Points du plus au moins favorable (les indisponibles en dernier, le plus ancien échec d'abord)"""
+        with self._verrou:
+            disponibles = sorted((p for p in self.points if p.disponible), key=self._cout)
+            retires = sorted((p for p in self.points if not p.disponible), key=lambda p: p.dernierEchec)
+            return disponibles + retires
+
+    def choisir(self):
+        """Point pour un appel ; terminer() doit suivre. Si aucun n'est disponible, le plus ancien échec est retenté"""
+        with self._verrou:
+            disponibles = [p for p in self.points if p.disponible]
+            if disponibles:
+                point = min(disponibles, key=self._cout)
+            else:
+                point = min(self.points, key=lambda p: p.dernierEchec)
+            point.enCours += 1
+            return point
+
+    def terminer(self, point, duree=None, erreur=False):
+        """erreur : échec réseau (le point est retiré) ; un Fault n'en est pas un"""
+        with self._verrou:
+            point.enCours -= 1
+            if erreur:
+                self._retirer(point)
+            else:
+                self._noterSucces(point, duree)
+
+    def signalerEchec(self, point):
+        with self._verrou:
+            self._retirer(point)
+
+    def _retirer(self, point):
+        point.disponible = False
+        point.echecs += 1
+        point.dernierEchec = time.monotonic()
+
+    def _noterSucces(self, point, duree=None):
+        point.disponible = True
+        point.echecs = 0
+        if duree is not None:
+            point.latence = duree if point.latence is None else point.latence + self.lissage * (duree - point.latence)
+
+    # --- Sondes ---
+
+    def sonder(self):
+        """Sonde chaque point une fois (HEAD du WSDL) ; ouvre au passage une connexion vers chacun"""
+        for point in self.points:
+            debut = time.perf_counter()
+            try:
+                disponible = self.transport.sonder(point.url)
+            except requests.exceptions.RequestException:
+                disponible = False
+            duree = time.perf_counter() - debut
+            with self._verrou:
+                if disponible:
+                    self._noterSucces(point, duree)
+                elif point.disponible:
+                    self._retirer(point)
+
+    def demarrer(self):
+        """Sondes périodiques en arrière-plan, seulement s'il y a plusieurs points"""
+        if len(self.points) < 2 or self._sondeur is not None:
+            return
+        # Un événement par thread : un sondeur arrêté ne peut pas être réveillé par le suivant
+        self._arret = threading.Event()
+        self._sondeur = threading.Thread(target=self._sonderEnBoucle, args=(self._arret,), name="sondes-soap",
+                                         daemon=True)
+        self._sondeur.start()
+
+    def arreter(self):
+        if self._arret is not None:
+            self._arret.set()
+        self._sondeur = None
+
+    def _sonderEnBoucle(self, arret):
+        while not arret.wait(self.intervalle):
+            self.sonder()
+
+    def etat(self):
+        """[(url, disponible, latence en ms, appels en cours)] pour le diagnostic"""
+        with self._verrou:
+            return [(p.url, p.disponible, None if p.latence is None else round(p.latence * 1000, 1), p.enCours)
+                    for p in self.points]
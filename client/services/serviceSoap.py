@@ -1,37 +1,239 @@
+import io
+import threading
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
 import zeep
 import requests
 from zeep import Client, Settings
-from zeep.transports import Transport
+from zeep.exceptions import TransportError
+from zeep.wsdl.utils import etree_to_string
+from zeep.wsdl import Document
+from services.cacheWsdl import CacheWsdl
+from services.transportSoap import TransportSoap
+from services.enveloppesSoap import ModeleEnveloppe
+from services.mesuresSoap import MesuresSoap, chronometrer
+from services.politiqueSoap import (PolitiqueSoap, classerErreur, classerMessage, JETON, AUTORISATION, TRANSITOIRE,
+                                    NON_ENVOYE, STATUTS_TRANSITOIRES)
+from services.repartiteurSoap import RepartiteurSoap
+from services.decodeurSoap import (decoderRoles, decoderUtilisateurs, decoderPage, decoderEtat,
+                                  decoderReponseOperation, decoderUtilisateursFlux, decoderPageFlux)
 from utilitaires.exceptions import ErreurConnexion, TokenExpireException, ErreurAuthentification
 
+# Documents WSDL déjà analysés, indexés par (url, empreinte) : survivent à deconnecter()
+_documentsCompiles = {}
+_verrouDocuments = threading.Lock()
+
 class ServiceSoap:
-    def __init__(self, url):
-        self.service_url = url
+    def __init__(self, url, cacheWsdl=None, timeout=10, taillePool=10, lectureFlux=True, enveloppesPrecompilees=True,
+                 mesures=None, politique=None):
+        """url : URL du WSDL, ou liste des URL des répliques du backend (voir RepartiteurSoap)"""
+        urls = [url] if isinstance(url, str) else list(url)
+        self.service_url = urls[0]
         self.client = None
         self.token = None
+        # listerUtilisateurs et listerUtilisateursPage lisent la réponse avec lxml plutôt que via l'arbre
+        # et les objets zeep
+        self.lectureFlux = lectureFlux
+        # Les requêtes sont produites à partir d'enveloppes sérialisées une fois à la connexion
+        self.enveloppesPrecompilees = enveloppesPrecompilees
+        self._operations = frozenset()
+        self._modeles = {}
+        self.cacheWsdl = cacheWsdl or CacheWsdl()
+        # Transport unique pour tous les appels : les connexions restent ouvertes entre les sessions
+        self.transport = TransportSoap(timeout=timeout, taillePool=taillePool, cache=self.cacheWsdl)
+        # Choix de la réplique pour chaque appel, sondes de disponibilité en arrière-plan
+        self.repartiteur = RepartiteurSoap(urls, self.transport)
+        self._verrouConnexion = threading.Lock()
+        # Durées par phase des appels, relevées seulement quand la mesure est active
+        self.mesures = mesures or MesuresSoap()
+        # Reprises, relance des lectures lentes et disjoncteur, partagés par tous les appels
+        self.politique = politique or PolitiqueSoap()
     
     def tester_endpoint(self):
         try:
-            response = requests.get(self.service_url, timeout=5)
-            return response.status_code == 200
+            return self.transport.sonder(self.service_url)
         except requests.exceptions.RequestException as e:
             raise ErreurConnexion(f"Erreur de connexion: {str(e)}")
     
     def connecter(self):
         settings = Settings(strict=False, xml_huge_tree=True)
-        transport = Transport(timeout=10)
+        transport = self.transport
+        
+        debut = perf_counter()
+        try:
+            # Le chargement (conditionnel) du WSDL sert aussi de test de disponibilité
+            url, contenu, empreinte = self._chargerWsdl()
+        except Exception:
+            if self.mesures.actif:
+                self.mesures.enregistrer("connecter", {"wsdl": perf_counter() - debut}, erreur=True)
+            raise
+        chargement = perf_counter()
+        
+        cle = (url, empreinte)
+        with _verrouDocuments:
+            document = _documentsCompiles.get(cle)
+            if document is None:
+                document = Document(io.BytesIO(contenu), transport, base=url, settings=settings)
+                for ancienne in [c for c in _documentsCompiles if c[0] == url]:
+                    del _documentsCompiles[ancienne]
+                _documentsCompiles[cle] = document
         
-        if not self.tester_endpoint():
-            raise ErreurConnexion(f"Le service SOAP n'est pas accessible à l'adresse {self.service_url}")
+        client = Client(wsdl=document, transport=transport, settings=settings)
         
-        self.client = Client(wsdl=self.service_url, transport=transport, settings=settings)
+        # Opérations déclarées par le WSDL et modèles d'enveloppe préparés une fois pour toutes les requêtes
+        service = client.service
+        noms = list(service._binding.all())
+        self._operations = frozenset(noms)
+        self._modeles = {nom: ModeleEnveloppe(client, nom) for nom in noms} if self.enveloppesPrecompilees else {}
+        self.repartiteur.lier(service._binding_options["address"])
+        self.client = client
+        self.repartiteur.demarrer()
+        
+        if self.mesures.actif:
+            fin = perf_counter()
+            self.mesures.enregistrer("connecter", {"wsdl": chargement - debut, "compilation": fin - chargement,
+                                                   "total": fin - debut}, octetsRecus=len(contenu))
+    
+    def _chargerWsdl(self):
+        """(url, contenu, empreinte) du WSDL du premier point d'accès qui répond (mêmes WSDL sur toutes les répliques)"""
+        erreur = None
+        for point in self.repartiteur.ordre():
+            try:
+                contenu, empreinte = self.cacheWsdl.charger(point.url, self.transport.session,
+                                                            timeout=self.transport.load_timeout)
+                return point.url, contenu, empreinte
+            except (requests.exceptions.RequestException, TransportError) as e:
+                self.repartiteur.signalerEchec(point)
+                erreur = e
+        raise erreur
+    
+    def _poster(self, message, entetes, flux=False):
+        """POST sur le point d'accès choisi par le répartiteur, qui note sa latence ou son échec"""
+        point = self.repartiteur.choisir()
+        debut = perf_counter()
+        try:
+            if flux:
+                reponse = self.transport.posterFlux(point.adresse, message, entetes)
+            else:
+                reponse = self.transport.post(point.adresse, message, entetes)
+        except Exception as e:
+            self.repartiteur.terminer(point, erreur=classerErreur(e) in (TRANSITOIRE, NON_ENVOYE))
+            raise
+        # La latence d'un flux (listerUtilisateurs) dépend surtout du volume : seule sa réussite est notée
+        duree = None if flux else perf_counter() - debut
+        self.repartiteur.terminer(point, duree, erreur=reponse.status_code in STATUTS_TRANSITOIRES)
+        return reponse
+    
+    def _appeler(self, operation, *args, decodeur=None, **kwargs):
+        """Appelle une opération du WSDL sous la politique de reprise (self.politique).
+
+        decodeur : lit le corps de la réponse à la place de zeep (décodeurs ...Flux de decodeurSoap)
+        """
+        return self.politique.executer(operation, lambda: self._appelerUneFois(operation, args, kwargs, decodeur))
+    
+    def _appelerUneFois(self, operation, args, kwargs, decodeur=None):
+        """Un appel : enveloppe précompilée si disponible, sinon sérialisée par zeep"""
+        if self.mesures.actif:
+            return self._appelerMesure(operation, args, kwargs, decodeur)
+        binding = self.client.service._binding
+        modele = self._modeles.get(operation)
+        if modele is None:
+            enveloppe, entetes = binding._create(operation, args, kwargs, client=self.client)
+            reponse = self._poster(etree_to_string(enveloppe), entetes)
+            operationObj = binding.get(operation)
+        else:
+            reponse = self._poster(modele.remplir(*args, **kwargs), modele.entetes)
+            operationObj = modele.operation
+        if decodeur is not None:
+            self._verifierStatut(reponse)
+            return decodeur(io.BytesIO(reponse.content))
+        return binding.process_reply(self.client, operationObj, reponse)
+    
+    def _verifierStatut(self, reponse):
+        # Un Fault arrive avec un statut 500 mais un corps XML : seul un corps non XML est une erreur de transport
+        if reponse.status_code != 200 and "xml" not in reponse.headers.get("Content-Type", ""):
+            raise TransportError(f"Statut HTTP {reponse.status_code}", status_code=reponse.status_code, content=reponse.content)
+    
+    def _appelerMesure(self, operation, args, kwargs, decodeur=None):
+        """_appeler découpé en phases sérialisation / HTTP / désérialisation pour self.mesures"""
+        binding = self.client.service._binding
+        phases = {}
+        octetsEmis = octetsRecus = 0
+        erreur = False
+        debut = perf_counter()
+        try:
+            modele = self._modeles.get(operation)
+            if modele is not None:
+                message, entetes, operationObj = modele.remplir(*args, **kwargs), modele.entetes, modele.operation
+            else:
+                enveloppe, entetes = binding._create(operation, args, kwargs, client=self.client)
+                message, operationObj = etree_to_string(enveloppe), binding.get(operation)
+            octetsEmis = len(message)
+            envoi = perf_counter()
+            phases["serialisation"] = envoi - debut
+            
+            reponse = self._poster(message, entetes)
+            octetsRecus = len(reponse.content)
+            reception = perf_counter()
+            phases["http"] = reception - envoi
+            
+            if decodeur is not None:
+                self._verifierStatut(reponse)
+                resultat = decodeur(io.BytesIO(reponse.content))
+            else:
+                resultat = binding.process_reply(self.client, operationObj, reponse)
+            phases["deserialisation"] = perf_counter() - reception
+            return resultat
+        except Exception:
+            erreur = True
+            raise
+        finally:
+            phases["total"] = perf_counter() - debut
+            self.mesures.enregistrer(operation, phases, octetsEmis, octetsRecus, erreur)
+    
+    def prechauffer(self):
+        """Connexion anticipée : WSDL chargé et compilé, connexion keep-alive ouverte vers chaque point d'accès"""
+        self._assurerConnexion()
+        # Un point qui ne répond pas est écarté ; le premier appel réel signalera l'erreur éventuelle
+        self.repartiteur.sonder()
+
+    def _assurerConnexion(self):
+        # Les appels peuvent arriver en parallèle depuis l'exécuteur : une seule connexion est établie
+        if self.client:
+            return
+        with self._verrouConnexion:
+            if not self.client:
+                try:
+                    self.politique.executer("connecter", self.connecter)
+                except Exception as e:
+                    raise self._traduireErreur(e, "Erreur de connexion")
+    
+    def _traduireErreur(self, erreur, contexte):
+        """Exception de l'application correspondant à la nature de l'erreur (voir classerErreur)"""
+        nature = classerErreur(erreur)
+        if nature == JETON:
+            return TokenExpireException("Token expiré")
+        if nature == AUTORISATION:
+            return ErreurAuthentification(erreur.message)
+        if isinstance(erreur, (ErreurConnexion, ErreurAuthentification, TokenExpireException)):
+            return erreur
+        return ErreurConnexion(f"{contexte}: {str(erreur)}")
+    
+    def _verifierEcriture(self, reponse):
+        """ReponseOperation d'une écriture ; un refus pour jeton expiré ou droits insuffisants devient une exception"""
+        if not reponse.succes:
+            nature = classerMessage(reponse.message)
+            if nature == JETON:
+                raise TokenExpireException("Token expiré")
+            if nature == AUTORISATION:
+                raise ErreurAuthentification(reponse.message)
+        return reponse
     
     def authentifier(self, pseudo, motDePasse):
-        if not self.client:
-            self.connecter()
+        self._assurerConnexion()
         
         try:
-            reponse = self.client.service.authentifierUtilisateur(pseudo=pseudo, motDePasse=motDePasse)
+            reponse = self._appeler("authentifierUtilisateur", pseudo=pseudo, motDePasse=motDePasse)
             if reponse.succes:
                 self.token = reponse.jeton
                 return self.token
@@ -40,133 +242,194 @@ class ServiceSoap:
         except ErreurAuthentification:
             raise
         except Exception as e:
-            if 'token expiré' in str(e).lower():
-                raise TokenExpireException("Token expiré")
-            raise ErreurConnexion(f"Erreur lors de l'authentification: {str(e)}")
+            raise self._traduireErreur(e, "Erreur lors de l'authentification")
     
     def listerRoles(self, jeton=None):
         """Lister tous les rôles disponibles"""
-        if not self.client:
-            self.connecter()
+        self._assurerConnexion()
         
         token_to_use = jeton or self.token
         if not token_to_use:
             raise ErreurAuthentification("Non authentifié - token manquant")
         
         try:
-            response = self.client.service.listerRoles(jeton=token_to_use)
-            
-            # Gestion flexible de la structure de réponse
-            if hasattr(response, 'roles'):
-                if hasattr(response.roles, 'item'):
-                    # Structure attendue: response.roles.item
-                    return response.roles.item if response.roles.item else []
-                elif isinstance(response.roles, list):
-                    # Si roles est directement une liste
-                    return response.roles
-                else:
-                    # Si roles contient un seul élément
-                    return [response.roles] if response.roles else []
-            elif hasattr(response, 'item'):
-                # Si response a directement un attribut item
-                return response.item if response.item else []
-            elif isinstance(response, list):
-                # Si response est directement une liste
-                return response
-            else:
-                # Dernière tentative - convertir en liste
-                return [response] if response else []
-                
+            return decoderRoles(self._appeler("listerRoles", jeton=token_to_use))
         except Exception as e:
-            if 'token expiré' in str(e).lower() or 'expired' in str(e).lower():
-                raise TokenExpireException("Token expiré")
-            raise ErreurConnexion(f"Erreur lors de la récupération des rôles: {str(e)}")
+            raise self._traduireErreur(e, "Erreur lors de la récupération des rôles")
     
     def listerUtilisateurs(self, jeton=None):
         """Lister tous les utilisateurs"""
-        if not self.client:
-            self.connecter()
+        self._assurerConnexion()
         
         token_to_use = jeton or self.token
         if not token_to_use:
             raise ErreurAuthentification("Non authentifié - token manquant")
         
+        if self.lectureFlux:
+            return list(self.iterUtilisateursFlux(token_to_use))
+        
         try:
-            response = self.client.service.listerUtilisateurs(token_to_use)
-            
-            # Vérification du type de réponse
-            if isinstance(response, str):
-                raise ErreurConnexion(f"Réponse SOAP inattendue : {response}")
-            
-            # Gestion flexible de la structure de réponse
-            if hasattr(response, 'utilisateurs'):
-                if hasattr(response.utilisateurs, 'item'):
-                    # Structure attendue: response.utilisateurs.item
-                    return response.utilisateurs.item if response.utilisateurs.item else []
-                elif isinstance(response.utilisateurs, list):
-                    # Si utilisateurs est directement une liste
-                    return response.utilisateurs
-                else:
-                    # Si utilisateurs contient un seul élément
-                    return [response.utilisateurs] if response.utilisateurs else []
-            elif hasattr(response, 'item'):
-                # Si response a directement un attribut item
-                return response.item if response.item else []
-            elif isinstance(response, list):
-                # Si response est directement une liste
-                return response
+            return decoderUtilisateurs(self._appeler("listerUtilisateurs", token_to_use))
+        except Exception as e:
+            raise self._traduireErreur(e, "Erreur lors de la récupération des utilisateurs")
+    
+    def iterUtilisateursFlux(self, jeton=None):
+        """listerUtilisateurs lu en flux : chaque utilisateur est rendu dès qu'il est reçu"""
+        self._assurerConnexion()
+        
+        token_to_use = jeton or self.token
+        if not token_to_use:
+            raise ErreurAuthentification("Non authentifié - token manquant")
+        
+        try:
+            yield from self.politique.iterer("listerUtilisateurs", lambda: self._lireFlux(token_to_use))
+        except Exception as e:
+            raise self._traduireErreur(e, "Erreur lors de la récupération des utilisateurs")
+    
+    def _lireFlux(self, token_to_use):
+        """Une lecture en flux de listerUtilisateurs, erreurs brutes (classées par la politique)"""
+        reponse = None
+        mesurer = self.mesures.actif
+        # La désérialisation inclut la lecture du corps, entrelacée avec l'analyse ; le temps
+        # passé par l'appelant entre deux utilisateurs n'est pas compté
+        phases = {}
+        message = b""
+        erreur = False
+        debut = perf_counter()
+        try:
+            modele = self._modeles.get("listerUtilisateurs")
+            if modele is not None:
+                message, entetes = modele.remplir(token_to_use), modele.entetes
             else:
-                # Aucune structure reconnue
-                print(f"Warning: Structure de réponse non reconnue: {type(response)}")
-                return []
-                
+                enveloppe, entetes = self.client.service._binding._create("listerUtilisateurs", (token_to_use,), {}, client=self.client)
+                message = etree_to_string(enveloppe)
+            envoi = perf_counter()
+            phases["serialisation"] = envoi - debut
+            reponse = self._poster(message, entetes, flux=True)
+            phases["http"] = perf_counter() - envoi
+            self._verifierStatut(reponse)
+            utilisateurs = decoderUtilisateursFlux(reponse.raw)
+            if mesurer:
+                utilisateurs = chronometrer(utilisateurs, phases, "deserialisation")
+            yield from utilisateurs
+        except Exception:
+            erreur = True
+            raise
+        finally:
+            if mesurer:
+                phases["total"] = sum(phases.values())
+                octetsRecus = reponse.raw.tell() if reponse is not None else 0
+                self.mesures.enregistrer("listerUtilisateurs", phases, len(message), octetsRecus, erreur)
+            if reponse is not None:
+                reponse.close()
+    
+    def listerUtilisateursPage(self, jeton=None, curseur=0, limite=500):
+        """Une page d'utilisateurs d'identifiant > curseur ; retourne (utilisateurs, curseurSuivant)"""
+        self._assurerConnexion()
+        
+        token_to_use = jeton or self.token
+        if not token_to_use:
+            raise ErreurAuthentification("Non authentifié - token manquant")
+        
+        try:
+            if self.lectureFlux:
+                return self._appeler("listerUtilisateursPage", token_to_use, curseur, limite, decodeur=decoderPageFlux)
+            return decoderPage(self._appeler("listerUtilisateursPage", token_to_use, curseur, limite))
         except Exception as e:
-            if 'token expiré' in str(e).lower() or 'expired' in str(e).lower():
-                raise TokenExpireException("Token expiré")
-            raise ErreurConnexion(f"Erreur lors de la récupération des utilisateurs: {str(e)}")
+            raise self._traduireErreur(e, "Erreur lors de la récupération des utilisateurs")
+    
+    def iterUtilisateurs(self, jeton=None, taillePage=500, prechargement=True):
+        """Parcourt les utilisateurs page par page ; la page suivante est chargée en arrière-plan"""
+        self._assurerConnexion()
+        
+        if "listerUtilisateursPage" not in self._operations:
+            # Backend sans pagination : repli sur la liste complète
+            if self.lectureFlux:
+                yield from self.iterUtilisateursFlux(jeton)
+            else:
+                yield from self.listerUtilisateurs(jeton)
+            return
+        
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page") if prechargement else None
+        try:
+            page, curseur = self.listerUtilisateursPage(jeton, 0, taillePage)
+            while True:
+                suivante = None
+                if curseur and pool:
+                    suivante = pool.submit(self.listerUtilisateursPage, jeton, curseur, taillePage)
+                yield from page
+                if not curseur:
+                    return
+                page, curseur = suivante.result() if suivante else self.listerUtilisateursPage(jeton, curseur, taillePage)
+        finally:
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+    
+    def prendEnCharge(self, operation):
+        """True si le WSDL du backend déclare cette opération"""
+        self._assurerConnexion()
+        return operation in self._operations
+    
+    def etatUtilisateurs(self, jeton, version, nbSeaux):
+        """(version, empreintes) de la liste ; empreintes vaut "" si version est encore à jour"""
+        self._assurerConnexion()
+        
+        if not jeton:
+            raise ErreurAuthentification("Non authentifié - token manquant")
+        
+        try:
+            return decoderEtat(self._appeler("etatUtilisateurs", jeton, version, nbSeaux))
+        except Exception as e:
+            raise self._traduireErreur(e, "Erreur lors de la synchronisation des utilisateurs")
+    
+    def listerUtilisateursSeaux(self, jeton, nbSeaux, seaux):
+        """Utilisateurs dont l'identifiant modulo nbSeaux est dans seaux"""
+        self._assurerConnexion()
+        
+        if not jeton:
+            raise ErreurAuthentification("Non authentifié - token manquant")
+        
+        try:
+            reponse = self._appeler("listerUtilisateursSeaux", jeton, nbSeaux, ",".join(str(seau) for seau in seaux))
+            return decoderUtilisateurs(reponse)
+        except Exception as e:
+            raise self._traduireErreur(e, "Erreur lors de la synchronisation des utilisateurs")
     
     def ajouterUtilisateur(self, jeton, pseudo, email, motDePasse, role='visiteur'):
-        if not self.client:
-            self.connecter()
+        self._assurerConnexion()
         
         if not jeton:
             raise ErreurAuthentification("Non authentifié - token manquant")
         
         try:
-            return self.client.service.ajouterUtilisateur(jeton, pseudo, email, motDePasse, role)
+            return self._verifierEcriture(decoderReponseOperation(self._appeler("ajouterUtilisateur", jeton, pseudo, email, motDePasse, role)))
         except Exception as e:
-            if 'token expiré' in str(e).lower() or 'expired' in str(e).lower():
-                raise TokenExpireException("Token expiré")
-            raise ErreurConnexion(f"Erreur lors de l'ajout de l'utilisateur: {str(e)}")
+            raise self._traduireErreur(e, "Erreur lors de l'ajout de l'utilisateur")
     
     def modifierUtilisateur(self, jeton, idUtilisateur, nouveauPseudo, nouvelEmail, role=''):
-        if not self.client:
-            self.connecter()
+        self._assurerConnexion()
         
         if not jeton:
             raise ErreurAuthentification("Non authentifié - token manquant")
         
         try:
-            return self.client.service.modifierUtilisateur(jeton, idUtilisateur, nouveauPseudo, nouvelEmail, role)
+            return self._verifierEcriture(decoderReponseOperation(self._appeler("modifierUtilisateur", jeton, idUtilisateur, nouveauPseudo, nouvelEmail, role)))
         except Exception as e:
-            if 'token expiré' in str(e).lower() or 'expired' in str(e).lower():
-                raise TokenExpireException("Token expiré")
-            raise ErreurConnexion(f"Erreur lors de la modification de l'utilisateur: {str(e)}")
+            raise self._traduireErreur(e, "Erreur lors de la modification de l'utilisateur")
     
     def supprimerUtilisateur(self, jeton, idUtilisateur):
-        if not self.client:
-            self.connecter()
+        self._assurerConnexion()
         
         if not jeton:
             raise ErreurAuthentification("Non authentifié - token manquant")
         
         try:
-            return self.client.service.supprimerUtilisateur(jeton, idUtilisateur)
+            return self._verifierEcriture(decoderReponseOperation(self._appeler("supprimerUtilisateur", jeton, idUtilisateur)))
         except Exception as e:
-            if 'token expiré' in str(e).lower() or 'expired' in str(e).lower():
-                raise TokenExpireException("Token expiré")
-            raise ErreurConnexion(f"Erreur lors de la suppression de l'utilisateur: {str(e)}")
+            raise self._traduireErreur(e, "Erreur lors de la suppression de l'utilisateur")
     
     def deconnecter(self):
         self.token = None
-        self.client = None
\ No newline at end of file
+        self.client = None
+        self.repartiteur.arreter()
+        self.politique.arreter()
\ No newline at end of file
@@ -0,0 +1,42 @@
+import requests
+from requests.adapters import HTTPAdapter
+from zeep.transports import Transport
+
+
+class TransportSoap(Transport):
+    """Transport zeep partagé : session requests poolée, keep-alive et compression gzip/deflate"""
+
+    def __init__(self, timeout=10, taillePool=10, cache=None, delaiConnexion=3.05):
+        self.taillePool = taillePool
+
+        session = requests.Session()
+        adaptateur = HTTPAdapter(pool_connections=taillePool, pool_maxsize=taillePool)
+        session.mount("http://", adaptateur)
+        session.mount("https://", adaptateur)
+        session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+        # Délai court pour établir la connexion : un serveur arrêté est détecté en quelques secondes,
+        # sans attendre le délai de lecture complet
+        delais = (min(delaiConnexion, timeout), timeout)
+        super().__init__(cache=cache, timeout=delais, operation_timeout=delais, session=session)
+
+    def sonder(self, url):
+        """Test de disponibilité léger : HEAD sur une connexion du pool (GET sans corps en repli)"""
+        reponse = self.session.head(url, timeout=self.load_timeout, allow_redirects=True)
+        if reponse.status_code in (405, 501):
+            reponse = self.session.get(url, timeout=self.load_timeout, stream=True)
+            reponse.close()
+        return reponse.status_code == 200
+
+    def posterFlux(self, adresse, message, entetes):
+        """POST d'une enveloppe dont la réponse sera lue en flux (corps non chargé, décompression à la lecture)"""
+        reponse = self.session.post(adresse, data=message, headers=entetes,
+                                    timeout=self.operation_timeout, stream=True)
+        reponse.raw.decode_content = True
+        return reponse
+
+    def fermer(self):
+        self.session.close()
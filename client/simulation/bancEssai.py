@@ -0,0 +1,382 @@
+"""Banc d'essai hors ligne : client SOAP et affichage de la liste face au serveur simulé.
+
+Pour chaque volume d'utilisateurs, un ServeurSimule est démarré puis les scénarios sont mesurés :
+connexion (WSDL froid et chaud), authentification, listes, mutations et remplissage du Treeview
+de EcranGestionUtilisateurs. Le résultat est un dictionnaire JSON de forme stable (clés triées,
+durées en millisecondes arrondies) que comparer() confronte à une exécution de référence.
+"""
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+import lxml
+import zeep
+
+from services import serviceSoap as moduleServiceSoap
+from services.cacheWsdl import CacheWsdl
+from services.depotUtilisateurs import DepotUtilisateurs
+from services.serviceSoap import ServiceSoap
+from simulation.serveurSimule import ServeurSimule, PSEUDO_ADMIN, MOT_DE_PASSE_ADMIN
+
+VERSION_FORMAT = 1
+COLONNES_TREEVIEW = ("id", "pseudo", "email", "roles")
+# Au-delà, le décodage zeep de la liste complète prend plusieurs secondes par répétition
+TAILLE_MAX_ZEEP = 10000
+
+
+def resumer(durees):
+    """Durées en secondes -> {"repetitions", "min_ms", "mediane_ms", "p95_ms", "max_ms"}"""
+    valeurs = sorted(durees)
+    n = len(valeurs)
+
+    def ms(valeur):
+        return round(valeur * 1000, 3)
+
+    return {
+        "repetitions": n,
+        "min_ms": ms(valeurs[0]),
+        "mediane_ms": ms(valeurs[n // 2] if n % 2 else (valeurs[n // 2 - 1] + valeurs[n // 2]) / 2),
+        "p95_ms": ms(valeurs[max(0, -(-95 * n // 100) - 1)]),
+        "max_ms": ms(valeurs[-1]),
+    }
+
+
+def chronometrer(fonction, repetitions, preparation=None):
+    """Durée de fonction(*preparation()) à chaque répétition ; la préparation n'est pas comptée"""
+    durees = []
+    for _ in range(repetitions):
+        arguments = preparation() if preparation else ()
+        debut = time.perf_counter()
+        fonction(*arguments)
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+
+# --- Treeview sans affichage ---
+
+class _TclSimule:
+    """Interpréteur minimal : ttk.Style(...).lookup renvoie une valeur vide"""
+
+    def call(self, *args):
+        return ""
+
+
+class TreeviewSimule:
+    """Sous-ensemble de ttk.Treeview utilisé par RendeurTreeview, sans Tk.
+
+    Les rappels after() sont mis en file et exécutés par vider_file(), comme le ferait la boucle Tk.
+    """
+
+    def __init__(self, hauteur=20):
+        self.tk = _TclSimule()
+        self.hauteur = hauteur
+        self.lignes = {}
+        self.ordre = []
+        self.selectionnes = ()
+        self.appels = 0
+        self._file = {}
+        self._prochain = 0
+
+    # Boucle d'événements
+    def after(self, delai, fonction=None, *args):
+        self._prochain += 1
+        self._file[self._prochain] = (fonction, args)
+        return self._prochain
+
+    def after_idle(self, fonction, *args):
+        return self.after(0, fonction, *args)
+
+    def after_cancel(self, identifiant):
+        self._file.pop(identifiant, None)
+
+    def vider_file(self):
+        while self._file:
+            fonction, args = self._file.pop(next(iter(self._file)))
+            fonction(*args)
+
+    # Géométrie et événements
+    def bind(self, *args, **kwargs):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    def winfo_height(self):
+        return 1
+
+    def cget(self, option):
+        return self.hauteur
+
+    def identify_row(self, y):
+        return ""
+
+    # Lignes
+    def insert(self, parent, index, iid, values):
+        self.appels += 1
+        self.lignes[iid] = values
+        self.ordre.insert(index, iid)
+        return iid
+
+    def delete(self, *iids):
+        self.appels += 1
+        for iid in iids:
+            del self.lignes[iid]
+            self.ordre.remove(iid)
+
+    def item(self, iid, values):
+        self.appels += 1
+        self.lignes[iid] = values
+
+    def index(self, iid):
+        return self.ordre.index(iid)
+
+    def move(self, iid, parent, index):
+        self.appels += 1
+        self.ordre.remove(iid)
+        self.ordre.insert(index, iid)
+
+    def selection(self):
+        return self.selectionnes
+
+    def selection_set(self, iids):
+        self.selectionnes = tuple(iids)
+
+
+class ScrollbarSimulee:
+    def configure(self, **kwargs):
+        pass
+
+    def set(self, debut, fin):
+        pass
+
+
+class TreeviewBanc:
+    """Treeview de la liste des utilisateurs : simulé par défaut, fenêtre Tk masquée si avecTk"""
+
+    def __init__(self, avecTk=False):
+        from vues.rendeurTreeview import RendeurTreeview
+        from vues.ecranGestionUtilisateurs import EcranGestionUtilisateurs
+
+        self.racine = None
+        if avecTk:
+            import tkinter as tk
+            from tkinter import ttk
+            self.racine = tk.Tk()
+            self.racine.withdraw()
+            self.tree = ttk.Treeview(self.racine, columns=COLONNES_TREEVIEW, show="headings", height=20)
+            scrollbar = ttk.Scrollbar(self.racine, orient="vertical")
+        else:
+            self.tree = TreeviewSimule()
+            scrollbar = ScrollbarSimulee()
+        self.rendeur = RendeurTreeview(self.tree, scrollbar, cle=lambda u: u.id,
+                                       valeurs=EcranGestionUtilisateurs.valeursLigne)
+
+    def attendre(self, action):
+        """Exécute action(termine) puis laisse tourner la boucle jusqu'à l'appel de termine"""
+        fini = []
+        action(lambda: fini.append(True))
+        if self.racine is None:
+            self.tree.vider_file()
+        else:
+            while not fini:
+                self.racine.update()
+
+    def synchroniser(self, utilisateurs):
+        self.attendre(lambda termine: self.rendeur.synchroniser(utilisateurs, termine=termine))
+
+    def defiler(self, pages):
+        for _ in range(pages):
+            self.rendeur.defiler("scroll", 1, "pages")
+        self.attendre(lambda termine: termine())
+
+    def detruire(self):
+        if self.racine is not None:
+            self.racine.destroy()
+
+
+# --- Scénarios ---
+
+def bancConnexion(url, repetitions):
+    repertoires = []
+
+    def froid():
+        # Cache disque vide et aucun document compilé en mémoire
+        repertoire = tempfile.mkdtemp(prefix="luxew-banc-")
+        repertoires.append(repertoire)
+        with moduleServiceSoap._verrouDocuments:
+            moduleServiceSoap._documentsCompiles.clear()
+        return (ServiceSoap(url, cacheWsdl=CacheWsdl(repertoire)),)
+
+    cacheChaud = CacheWsdl(tempfile.mkdtemp(prefix="luxew-banc-"))
+    repertoires.append(cacheChaud.repertoire)
+    ServiceSoap(url, cacheWsdl=cacheChaud).connecter()
+
+    try:
+        return {
+            "connecter_froid": resumer(chronometrer(lambda s: s.connecter(), repetitions, froid)),
+            "connecter_chaud": resumer(chronometrer(lambda s: s.connecter(), repetitions,
+                                                    lambda: (ServiceSoap(url, cacheWsdl=cacheChaud),))),
+        }
+    finally:
+        for repertoire in repertoires:
+            shutil.rmtree(repertoire, ignore_errors=True)
+
+
+def bancAppels(url, repetitions, nbMutations, taille):
+    repertoire = tempfile.mkdtemp(prefix="luxew-banc-")
+    service = ServiceSoap(url, cacheWsdl=CacheWsdl(repertoire))
+    serviceZeep = ServiceSoap(url, cacheWsdl=service.cacheWsdl, lectureFlux=False, enveloppesPrecompilees=False)
+    try:
+        resultats = {"authentifier": resumer(chronometrer(
+            lambda: service.authentifier(PSEUDO_ADMIN, MOT_DE_PASSE_ADMIN), repetitions))}
+        jeton = service.token
+        serviceZeep.token = jeton
+
+        resultats["listerRoles"] = resumer(chronometrer(lambda: service.listerRoles(jeton), repetitions))
+        resultats["listerUtilisateurs"] = resumer(chronometrer(lambda: service.listerUtilisateurs(jeton), repetitions))
+        resultats["iterUtilisateurs"] = resumer(chronometrer(
+            lambda: sum(1 for _ in service.iterUtilisateurs(jeton)), repetitions))
+        # Chargement complet de l'écran de gestion : pages, cache et empreintes de la synchronisation
+        depot = DepotUtilisateurs(service)
+        resultats["depotUtilisateurs"] = resumer(chronometrer(
+            lambda: depot.utilisateurs(jeton, forcer=True), repetitions))
+        if taille <= TAILLE_MAX_ZEEP:
+            resultats["listerUtilisateurs_zeep"] = resumer(chronometrer(
+                lambda: serviceZeep.listerUtilisateurs(jeton), repetitions))
+
+        identifiants = []
+        compteur = iter(range(nbMutations))
+
+        def ajouter():
+            i = next(compteur)
+            reponse = service.ajouterUtilisateur(jeton, f"banc{i}", f"banc{i}@exemple.com", "motdepasse", "visiteur")
+            identifiants.append(reponse.utilisateurId)
+
+        resultats["ajouterUtilisateur"] = resumer(chronometrer(ajouter, nbMutations))
+        cibles = iter(identifiants)
+        resultats["modifierUtilisateur"] = resumer(chronometrer(
+            lambda i: service.modifierUtilisateur(jeton, i, f"banc{i}m", f"banc{i}m@exemple.com", "editeur"),
+            nbMutations, lambda: (next(cibles),)))
+        cibles = iter(identifiants)
+        resultats["supprimerUtilisateur"] = resumer(chronometrer(
+            lambda i: service.supprimerUtilisateur(jeton, i), nbMutations, lambda: (next(cibles),)))
+        return resultats
+    finally:
+        service.transport.fermer()
+        serviceZeep.transport.fermer()
+        shutil.rmtree(repertoire, ignore_errors=True)
+
+
+def bancTreeview(utilisateurs, repetitions, avecTk=False):
+    from services.enregistrements import Utilisateur
+    from services.indexUtilisateurs import IndexUtilisateurs
+
+    # Un utilisateur sur cent modifié : cas d'un « Actualiser la liste » après quelques changements
+    modifies = [Utilisateur(u.id, u.pseudo + "*", u.email, u.roles) if u.id % 100 == 0 else u for u in utilisateurs]
+
+    def nouveau():
+        return (TreeviewBanc(avecTk),)
+
+    def rempli():
+        treeview = TreeviewBanc(avecTk)
+        treeview.synchroniser(utilisateurs)
+        return (treeview,)
+
+    bancs = []
+
+    def garder(preparation):
+        def preparer():
+            arguments = preparation()
+            bancs.append(arguments[0])
+            return arguments
+        return preparer
+
+    try:
+        return {
+            "treeview_remplissage": resumer(chronometrer(
+                lambda t: t.synchroniser(utilisateurs), repetitions, garder(nouveau))),
+            "treeview_resynchronisation": resumer(chronometrer(
+                lambda t: t.synchroniser(utilisateurs), repetitions, garder(rempli))),
+            "treeview_mise_a_jour": resumer(chronometrer(
+                lambda t: t.synchroniser(modifies), repetitions, garder(rempli))),
+            "treeview_defilement_100_pages": resumer(chronometrer(
+                lambda t: t.defiler(100), repetitions, garder(rempli))),
+            "index_construction": resumer(chronometrer(lambda: IndexUtilisateurs(utilisateurs), repetitions)),
+            "recherche_frappe": resumer(bancRecherche(utilisateurs, repetitions, garder(rempli))),
+        }
+    finally:
+        for treeview in bancs:
+            treeview.detruire()
+
+
+def bancRecherche(utilisateurs, repetitions, preparation):
+    """Durée de chaque frappe (recherche dans l'index, filtre et redessin) en saisissant un pseudo"""
+    from services.indexUtilisateurs import IndexUtilisateurs
+
+    index = IndexUtilisateurs(utilisateurs)
+    cible = utilisateurs[len(utilisateurs) // 2].pseudo if utilisateurs else ""
+    durees = []
+    for _ in range(repetitions):
+        treeview, = preparation()
+        for longueur in range(1, len(cible) + 1):
+            debut = time.perf_counter()
+            treeview.rendeur.filtrer(index.rechercher(cible[:longueur]))
+            durees.append(time.perf_counter() - debut)
+        index.rechercher("")
+    return durees
+
+
+def executer(tailles=(1000, 10000, 100000), latence=0.0, repetitions=5, nbMutations=50, avecTk=False,
+             progression=None):
+    """Exécute tous les scénarios pour chaque volume ; latence en secondes"""
+    resultat = {
+        "format": VERSION_FORMAT,
+        "parametres": {
+            "tailles": list(tailles),
+            "latence_ms": round(latence * 1000, 3),
+            "repetitions": repetitions,
+            "mutations": nbMutations,
+            "treeview": "tk" if avecTk else "simule",
+        },
+        "environnement": {
+            "python": platform.python_version(),
+            "plateforme": platform.platform(terse=True),
+            "processeurs": os.cpu_count(),
+            "zeep": zeep.__version__,
+            "lxml": lxml.__version__,
+        },
+        "resultats": {},
+    }
+    for taille in tailles:
+        with ServeurSimule(taille, latence) as serveur:
+            if progression:
+                progression(f"{taille} utilisateurs : connexion")
+            scenarios = bancConnexion(serveur.url, repetitions)
+            if progression:
+                progression(f"{taille} utilisateurs : appels SOAP")
+            scenarios.update(bancAppels(serveur.url, repetitions, nbMutations, taille))
+            if progression:
+                progression(f"{taille} utilisateurs : Treeview")
+            service = ServiceSoap(serveur.url, cacheWsdl=CacheWsdl(tempfile.mkdtemp(prefix="luxew-banc-")))
+            try:
+                jeton = service.authentifier(PSEUDO_ADMIN, MOT_DE_PASSE_ADMIN)
+                utilisateurs = service.listerUtilisateurs(jeton)
+            finally:
+                service.transport.fermer()
+                shutil.rmtree(service.cacheWsdl.repertoire, ignore_errors=True)
+            scenarios.update(bancTreeview(utilisateurs, repetitions, avecTk))
+        resultat["resultats"][str(taille)] = scenarios
+    return resultat
+
+
+def comparer(resultat, reference, seuil=1.25):
+    """Scénarios dont la médiane dépasse seuil × celle de la référence : [(taille, scénario, avant, après)]"""
+    regressions = []
+    for taille, scenarios in sorted(resultat["resultats"].items()):
+        for nom, mesure in sorted(scenarios.items()):
+            ancienne = reference.get("resultats", {}).get(taille, {}).get(nom)
+            if ancienne and ancienne["mediane_ms"] > 0 and mesure["mediane_ms"] > seuil * ancienne["mediane_ms"]:
+                regressions.append((taille, nom, ancienne["mediane_ms"], mesure["mediane_ms"]))
+    return regressions
@@ -0,0 +1,330 @@
+"""Générateur de charge : sessions d'administrateurs virtuels sur les chemins d'appel de ServiceSoap.
+
+Chaque processus exécute des threads, chaque thread est une session avec son propre ServiceSoap
+(connexions, politique de reprise, répartition entre répliques) : elle s'authentifie puis enchaîne
+des opérations tirées selon le mélange, séparées d'un temps de réflexion de loi exponentielle.
+Les processus envoient à chaque intervalle les durées relevées au parent, qui en tire le débit,
+les percentiles de latence et le taux d'erreurs, par intervalle et sur toute la durée.
+"""
+import multiprocessing
+import queue
+import random
+import threading
+import time
+from time import perf_counter
+
+from services.mesuresSoap import HistogrammeGlissant
+from utilitaires.exceptions import TokenExpireException
+
+OPERATIONS = ("authentifier", "listerRoles", "listerUtilisateurs", "ajouterUtilisateur", "modifierUtilisateur",
+              "supprimerUtilisateur")
+MELANGE_DEFAUT = {"authentifier": 1, "listerRoles": 4, "listerUtilisateurs": 1, "ajouterUtilisateur": 2,
+                  "modifierUtilisateur": 2, "supprimerUtilisateur": 1}
+
+
+def analyserMelange(texte):
+    """"listerRoles=4,listerUtilisateurs=1,…" -> {opération: poids} ; les opérations absentes ont un poids nul"""
+    melange = {}
+    for morceau in texte.split(","):
+        if not morceau.strip():
+            continue
+        operation, _, poids = morceau.partition("=")
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            raise ValueError(f"Opération inconnue : {operation} ({', '.join(OPERATIONS)})")
+        melange[operation] = float(poids or 1)
+    if not any(poids > 0 for poids in melange.values()):
+        raise ValueError("Le mélange ne contient aucune opération de poids positif")
+    return melange
+
+
+def resumerLatences(durees):
+    """Durées en secondes -> {"mesures", "p50_ms", "p95_ms", "p99_ms", "max_ms"}"""
+    histogramme = HistogrammeGlissant(max(1, len(durees)))
+    for duree in durees:
+        histogramme.ajouter(duree)
+    return histogramme.resume()
+
+
+class Collecteur:
+    """Durées et erreurs par intervalle et par opération, partagé par les sessions d'un processus"""
+
+    def __init__(self, debut, intervalle):
+        self.debut = debut
+        self.intervalle = intervalle
+        self._verrou = threading.Lock()
+        self._intervalles = {}
+
+    def enregistrer(self, operation, duree, erreur=None):
+        numero = int((time.time() - self.debut) // self.intervalle)
+        with self._verrou:
+            operations = self._intervalles.setdefault(numero, {})
+            releve = operations.get(operation)
+            if releve is None:
+                releve = operations[operation] = {"durees": [], "erreurs": {}}
+            if erreur is None:
+                releve["durees"].append(duree)
+            else:
+                releve["erreurs"][erreur] = releve["erreurs"].get(erreur, 0) + 1
+
+    def vider(self):
+        with self._verrou:
+            intervalles, self._intervalles = self._intervalles, {}
+        return intervalles
+
+
+class RefusServeur(Exception):
+    """Réponse d'écriture avec succes = false"""
+
+
+class SessionVirtuelle:
+    """Un administrateur : authentification puis opérations tirées au hasard jusqu'à l'arrêt"""
+
+    MOT_DE_PASSE = "chargeMotDePasse1"
+
+    def __init__(self, urls, pseudo, motDePasse, melange, reflexion, prefixe, brut=False, graine=None):
+        self.urls = urls
+        self.pseudo = pseudo
+        self.motDePasse = motDePasse
+        self.operations = [operation for operation in OPERATIONS if melange.get(operation, 0) > 0]
+        self.poids = [melange[operation] for operation in self.operations]
+        self.reflexion = reflexion
+        self.prefixe = prefixe
+        self.brut = brut
+        self.aleatoire = random.Random(graine)
+        self.crees = []
+        self.compteur = 0
+        self.jeton = None
+        self.serviceSoap = None
+
+    def _creerService(self):
+        from services.serviceSoap import ServiceSoap
+        from services.politiqueSoap import PolitiqueSoap, Disjoncteur
+
+        politique = None
+        if self.brut:
+            # Chaque appel compte une fois : ni reprise, ni relance, ni disjoncteur
+            politique = PolitiqueSoap(tentatives=1, relance=False, disjoncteur=Disjoncteur(seuil=float("inf")))
+        return ServiceSoap(self.urls, taillePool=2, politique=politique)
+
+    def executer(self, arret, collecteur):
+        self.serviceSoap = self._creerService()
+        operation = "authentifier"
+        while not arret.is_set():
+            debut = perf_counter()
+            try:
+                self._appeler(operation)
+                collecteur.enregistrer(operation, perf_counter() - debut)
+            except Exception as e:
+                collecteur.enregistrer(operation, perf_counter() - debut, type(e).__name__)
+                if isinstance(e, TokenExpireException):
+                    self.jeton = None
+            if self.reflexion:
+                arret.wait(self.aleatoire.expovariate(1 / self.reflexion))
+            operation = self._tirer()
+
+    def _tirer(self):
+        # Sans jeton valide, la session se réauthentifie d'abord
+        if self.jeton is None:
+            return "authentifier"
+        operation = self.aleatoire.choices(self.operations, self.poids)[0]
+        if operation in ("modifierUtilisateur", "supprimerUtilisateur") and not self.crees:
+            # Modifier et supprimer portent sur les utilisateurs créés par la session : la mesure est
+            # enregistrée sous l'ajout effectivement envoyé
+            return "ajouterUtilisateur"
+        return operation
+
+    def _appeler(self, operation):
+        service = self.serviceSoap
+        if operation == "authentifier":
+            self.jeton = service.authentifier(self.pseudo, self.motDePasse)
+        elif operation == "listerRoles":
+            service.listerRoles(self.jeton)
+        elif operation == "listerUtilisateurs":
+            service.listerUtilisateurs(self.jeton)
+        elif operation == "ajouterUtilisateur":
+            self.compteur += 1
+            pseudo = f"{self.prefixe}{self.compteur}"
+            reponse = self._verifier(service.ajouterUtilisateur(self.jeton, pseudo, f"{pseudo}@charge.test",
+                                                                self.MOT_DE_PASSE, "visiteur"))
+            self.crees.append((reponse.utilisateurId, pseudo))
+        elif operation == "modifierUtilisateur":
+            identifiant, pseudo = self.aleatoire.choice(self.crees)
+            self._verifier(service.modifierUtilisateur(self.jeton, identifiant, pseudo, f"{pseudo}@charge.test", ""))
+        else:
+            identifiant, _ = self.crees.pop(self.aleatoire.randrange(len(self.crees)))
+            self._verifier(service.supprimerUtilisateur(self.jeton, identifiant))
+
+    def _verifier(self, reponse):
+        if not reponse.succes:
+            raise RefusServeur(reponse.message or "Refusé par le serveur")
+        return reponse
+
+
+def executerProcessus(numero, parametres, debut, arret, file):
+    """Corps d'un processus de charge : ses sessions démarrent au fil de la montée en charge"""
+    collecteur = Collecteur(debut, parametres["intervalle"])
+    nbThreads = parametres["threads"]
+    total = parametres["processus"] * nbThreads
+    sessions = []
+    for indice in range(nbThreads):
+        rang = indice * parametres["processus"] + numero
+        session = SessionVirtuelle(parametres["urls"], parametres["pseudo"], parametres["motDePasse"],
+                                   parametres["melange"], parametres["reflexion"], f"charge{numero}x{indice}x",
+                                   parametres["brut"], graine=f"{parametres['graine']}-{rang}")
+        # Sessions réparties uniformément sur la durée de montée, tous processus confondus
+        demarrage = debut + parametres["montee"] * rang / total
+        thread = threading.Thread(target=_demarrerSession, args=(session, demarrage, arret, collecteur),
+                                  name=f"session-{rang}", daemon=True)
+        thread.start()
+        sessions.append(thread)
+
+    while not arret.wait(parametres["intervalle"]):
+        file.put((numero, collecteur.vider()))
+    for thread in sessions:
+        thread.join(timeout=parametres["delaiArret"])
+    file.put((numero, collecteur.vider()))
+    file.put((numero, None))
+
+
+def _demarrerSession(session, demarrage, arret, collecteur):
+    if arret.wait(max(0.0, demarrage - time.time())):
+        return
+    session.executer(arret, collecteur)
+
+
+class RapportCharge:
+    """Fusion des relevés des processus ; résumés par intervalle et au total"""
+
+    def __init__(self, intervalle):
+        self.intervalle = intervalle
+        self.intervalles = {}
+
+    def fusionner(self, releves):
+        for numero, operations in releves.items():
+            cible = self.intervalles.setdefault(numero, {})
+            for operation, releve in operations.items():
+                existant = cible.get(operation)
+                if existant is None:
+                    cible[operation] = {"durees": list(releve["durees"]), "erreurs": dict(releve["erreurs"])}
+                    continue
+                existant["durees"].extend(releve["durees"])
+                for erreur, nombre in releve["erreurs"].items():
+                    existant["erreurs"][erreur] = existant["erreurs"].get(erreur, 0) + nombre
+
+    def _resumer(self, operations, duree):
+        resume = {}
+        toutes = []
+        appels = erreurs = 0
+        for operation in OPERATIONS:
+            releve = operations.get(operation)
+            if releve is None:
+                continue
+            nbErreurs = sum(releve["erreurs"].values())
+            nbAppels = len(releve["durees"]) + nbErreurs
+            resume[operation] = {"appels": nbAppels, "debit_s": round(nbAppels / duree, 2),
+                                 "taux_erreurs": round(nbErreurs / nbAppels, 4), "erreurs": releve["erreurs"],
+                                 **resumerLatences(releve["durees"])}
+            toutes.extend(releve["durees"])
+            appels += nbAppels
+            erreurs += nbErreurs
+        resume["toutes"] = {"appels": appels, "debit_s": round(appels / duree, 2),
+                            "taux_erreurs": round(erreurs / appels, 4) if appels else 0.0, **resumerLatences(toutes)}
+        return resume
+
+    def resumeIntervalle(self, numero):
+        return self._resumer(self.intervalles.get(numero, {}), self.intervalle)
+
+    def total(self, duree):
+        operations = {}
+        for releves in self.intervalles.values():
+            for operation, releve in releves.items():
+                cumul = operations.setdefault(operation, {"durees": [], "erreurs": {}})
+                cumul["durees"].extend(releve["durees"])
+                for erreur, nombre in releve["erreurs"].items():
+                    cumul["erreurs"][erreur] = cumul["erreurs"].get(erreur, 0) + nombre
+        return self._resumer(operations, duree)
+
+
+def formaterIntervalle(numero, intervalle, resume, sessions):
+    toutes = resume["toutes"]
+    latences = " ".join(f"{p} {'-' if toutes[p + '_ms'] is None else format(toutes[p + '_ms'], '.1f')}"
+                        for p in ("p50", "p95", "p99"))
+    return (f"t={numero * intervalle + intervalle:6.1f} s  {sessions:4d} sessions  {toutes['debit_s']:8.1f} appels/s  "
+            f"{latences} ms  erreurs {toutes['taux_erreurs'] * 100:.1f} %")
+
+
+def _sessionsDemarrees(numero, intervalle, montee, total):
+    """Sessions démarrées à la fin de l'intervalle n° numero"""
+    if montee <= 0:
+        return total
+    return min(total, int(total * (numero + 1) * intervalle / montee) + 1)
+
+
+def executerCharge(urls, pseudo, motDePasse, processus=2, threads=8, duree=30.0, montee=5.0, melange=None,
+                   reflexion=0.5, intervalle=1.0, brut=False, graine=0, afficher=print):
+    """Lance la charge et retourne le rapport JSON : paramètres, résumé par intervalle et total.
+
+    reflexion, duree, montee et intervalle sont en secondes ; afficher reçoit une ligne par intervalle.
+    """
+    parametres = {"urls": list(urls), "pseudo": pseudo, "motDePasse": motDePasse, "processus": processus,
+                  "threads": threads, "montee": montee, "melange": dict(melange or MELANGE_DEFAUT),
+                  "reflexion": reflexion, "intervalle": intervalle, "brut": brut, "graine": graine,
+                  "delaiArret": 15.0}
+    # spawn : les processus ne partagent rien du parent (serveur simulé, threads, connexions)
+    contexte = multiprocessing.get_context("spawn")
+    arret = contexte.Event()
+    file = contexte.Queue()
+    rapport = RapportCharge(intervalle)
+    total = processus * threads
+
+    debut = time.time()
+    enfants = [contexte.Process(target=executerProcessus, args=(numero, parametres, debut, arret, file),
+                                name=f"charge-{numero}", daemon=True)
+               for numero in range(processus)]
+    for enfant in enfants:
+        enfant.start()
+
+    affiches = 0
+    actifs = set(range(processus))
+    fin = debut + duree
+    try:
+        while actifs:
+            maintenant = time.time()
+            if maintenant >= fin and not arret.is_set():
+                arret.set()
+            try:
+                numero, releves = file.get(timeout=0.2)
+            except queue.Empty:
+                numero, releves = None, {}
+            if releves is None:
+                actifs.discard(numero)
+            elif numero is None:
+                # Un processus mort sans marque de fin (exception, signal) n'est plus attendu
+                actifs -= {n for n in actifs if not enfants[n].is_alive()}
+            else:
+                rapport.fusionner(releves)
+            # Un intervalle est affiché une demi-période après sa fin, le temps que tous les processus l'envoient
+            while (affiches + 1.5) * intervalle <= time.time() - debut and affiches * intervalle < duree:
+                afficher(formaterIntervalle(affiches, intervalle, rapport.resumeIntervalle(affiches),
+                                            _sessionsDemarrees(affiches, intervalle, montee, total)))
+                affiches += 1
+            if arret.is_set() and time.time() > fin + parametres["delaiArret"] + 5:
+                break
+    finally:
+        arret.set()
+        for enfant in enfants:
+            enfant.join(timeout=5)
+            if enfant.is_alive():
+                enfant.terminate()
+
+    nbIntervalles = int(-(-duree // intervalle))
+    for numero in range(affiches, nbIntervalles):
+        afficher(formaterIntervalle(numero, intervalle, rapport.resumeIntervalle(numero),
+                                    _sessionsDemarrees(numero, intervalle, montee, total)))
+    return {
+        "parametres": {cle: valeur for cle, valeur in parametres.items() if cle != "motDePasse"},
+        "intervalles": [{"debut_s": round(numero * intervalle, 3), **rapport.resumeIntervalle(numero)}
+                        for numero in range(nbIntervalles)],
+        "total": rapport.total(duree),
+    }
@@ -0,0 +1,375 @@
+"""Serveur SOAP local remplaçant le backend PHP/MySQL pour les bancs d'essai et les tests de charge.
+
+Il sert backend/public/wsdl/ServicesSoap.wsdl et implémente ses opérations sur des utilisateurs
+synthétiques en mémoire, avec les mêmes règles de validation et les mêmes messages que
+backend/services/ServicesSoap.php. Une latence fixe peut être ajoutée à chaque requête.
+
+Lancement autonome :
+    python -m simulation.serveurSimule --port 8080 --utilisateurs 10000 --latence 5
+"""
+import argparse
+import bisect
+import gzip
+import os
+import re
+import secrets
+import socket
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+CHEMIN_WSDL = os.path.join(os.path.dirname(__file__), "..", "..", "backend", "public", "wsdl", "ServicesSoap.wsdl")
+NS_SERVICE = "http://localhost/luXew/backend/public/soap"
+NS_ENVELOPPE = "http://schemas.xmlsoap.org/soap/envelope/"
+ROLES = ("admin", "editeur", "visiteur")
+PSEUDO_ADMIN = "admin"
+MOT_DE_PASSE_ADMIN = "passer123"
+# Même contrôle que FILTER_VALIDATE_EMAIL pour les adresses synthétiques et importées
+MOTIF_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+class FauteSimulee(Exception):
+    """Équivalent d'un SoapFault('Server', message) côté PHP.
+
+    Comme en PHP, les lectures la transmettent telle quelle au client alors que les écritures
+    la convertissent en réponse succes=false portant le même message.
+    """
+
+
+class DonneesSimulees:
+    """Utilisateurs en mémoire : identifiant -> [pseudo, email, rôles]"""
+
+    def __init__(self, nbUtilisateurs):
+        self._verrou = threading.Lock()
+        self.utilisateurs = {1: [PSEUDO_ADMIN, "admin@luxew.com", ["admin"]]}
+        for identifiant in range(2, nbUtilisateurs + 1):
+            self.utilisateurs[identifiant] = [f"utilisateur{identifiant}", f"utilisateur{identifiant}@exemple.com",
+                                              [ROLES[1 + identifiant % 2]]]
+        self.prochainId = nbUtilisateurs + 1
+        self.jetons = set()
+        # Liste complète sérialisée, recalculée seulement après une écriture
+        self._version = 0
+        self._listeSerialisee = (-1, None)
+        self._identifiantsTries = (-1, None)
+        self._empreintes = (-1, None, None)
+
+    def authentifier(self, pseudo, motDePasse):
+        with self._verrou:
+            if pseudo != PSEUDO_ADMIN or motDePasse != MOT_DE_PASSE_ADMIN:
+                return None
+            jeton = secrets.token_hex(32)
+            self.jetons.add(jeton)
+            return jeton
+
+    def verifierAdmin(self, jeton):
+        if jeton not in self.jetons:
+            raise FauteSimulee("Jeton invalide ou expiré")
+
+    def listeSerialisee(self):
+        with self._verrou:
+            version, contenu = self._listeSerialisee
+            if version != self._version:
+                contenu = "".join(_item(i, u) for i, u in self.utilisateurs.items())
+                self._listeSerialisee = (self._version, contenu)
+            return contenu
+
+    def page(self, curseur, limite):
+        with self._verrou:
+            version, identifiants = self._identifiantsTries
+            if version != self._version:
+                # Les identifiants sont attribués en ordre croissant : l'ordre d'insertion est déjà trié
+                identifiants = list(self.utilisateurs)
+                self._identifiantsTries = (self._version, identifiants)
+            debut = bisect.bisect_right(identifiants, curseur)
+            return [(i, self.utilisateurs[i]) for i in identifiants[debut:debut + limite]]
+
+    def empreintes(self, nbSeaux):
+        """(nombre, empreintes par seau) comme ModeleUtilisateur::obtenirEmpreintesSeaux, recalculées après une écriture"""
+        with self._verrou:
+            version, taille, resultat = self._empreintes
+            if version != self._version or taille != nbSeaux:
+                seaux = [0] * nbSeaux
+                for identifiant, (pseudo, email, roles) in self.utilisateurs.items():
+                    texte = "\x1f".join((str(identifiant), pseudo, email, ",".join(sorted(roles))))
+                    seaux[identifiant % nbSeaux] ^= zlib.crc32(texte.encode("utf-8"))
+                resultat = (len(self.utilisateurs), seaux)
+                self._empreintes = (self._version, nbSeaux, resultat)
+            return resultat
+
+    def seaux(self, nbSeaux, seaux):
+        with self._verrou:
+            return [(i, u) for i, u in self.utilisateurs.items() if i % nbSeaux in seaux]
+
+    def ajouter(self, pseudo, email, motDePasse, role):
+        _validerUtilisateur(pseudo, email)
+        if len(motDePasse.encode("utf-8")) < 8:
+            raise ValueError("Mot de passe trop court (minimum 8 caractères)")
+        if role not in ROLES:
+            raise ValueError("Rôle invalide")
+        with self._verrou:
+            identifiant = self.prochainId
+            self.prochainId += 1
+            self.utilisateurs[identifiant] = [pseudo, email, [role]]
+            self._version += 1
+            return identifiant
+
+    def modifier(self, identifiant, pseudo, email, role):
+        with self._verrou:
+            if identifiant not in self.utilisateurs:
+                raise ValueError("Utilisateur non trouvé")
+        _validerUtilisateur(pseudo, email)
+        if role and role not in ROLES:
+            raise ValueError("Rôle invalide")
+        with self._verrou:
+            utilisateur = self.utilisateurs.get(identifiant)
+            if utilisateur is None:
+                raise ValueError("Utilisateur non trouvé")
+            utilisateur[0], utilisateur[1] = pseudo, email
+            if role:
+                utilisateur[2] = [role]
+            self._version += 1
+
+    def supprimer(self, identifiant):
+        with self._verrou:
+            if self.utilisateurs.pop(identifiant, None) is None:
+                raise ValueError("Utilisateur non trouvé")
+            self._version += 1
+
+
+def _validerUtilisateur(pseudo, email):
+    if not MOTIF_EMAIL.match(email):
+        raise ValueError("Email invalide")
+    if len(pseudo.encode("utf-8")) < 3:
+        raise ValueError("Pseudo trop court")
+
+
+def _item(identifiant, utilisateur):
+    pseudo, email, roles = utilisateur
+    return (f"<item><id>{identifiant}</id><pseudo>{escape(pseudo)}</pseudo><email>{escape(email)}</email>"
+            f"<roles>{''.join(f'<item>{escape(r)}</item>' for r in roles)}</roles></item>")
+
+
+def _reponseStandard(operation, succes, message=None, utilisateurId=None):
+    contenu = f"<succes>{'true' if succes else 'false'}</succes>"
+    if message is not None:
+        contenu += f"<message>{escape(message)}</message>"
+    if utilisateurId is not None:
+        contenu += f"<utilisateurId>{utilisateurId}</utilisateurId>"
+    return f"<ns1:{operation}Response>{contenu}</ns1:{operation}Response>"
+
+
+class ServicesSimules:
+    """Opérations du WSDL : paramètres lus dans le corps de la requête, fragment XML de réponse en retour"""
+
+    def __init__(self, donnees):
+        self.donnees = donnees
+
+    def traiter(self, operation, p):
+        methode = getattr(self, operation, None)
+        if methode is None:
+            raise FauteSimulee(f"Fonction '{operation}' inexistante")
+        return methode(p)
+
+    def authentifierUtilisateur(self, p):
+        jeton = self.donnees.authentifier(p.get("pseudo", ""), p.get("motDePasse", ""))
+        if jeton is None:
+            return ("<ns1:authentifierUtilisateurResponse><succes>false</succes>"
+                    "<message>Identifiants invalides</message></ns1:authentifierUtilisateurResponse>")
+        return (f"<ns1:authentifierUtilisateurResponse><succes>true</succes><jeton>{jeton}</jeton>"
+                "</ns1:authentifierUtilisateurResponse>")
+
+    def listerRoles(self, p):
+        self.donnees.verifierAdmin(p.get("jeton", ""))
+        roles = "".join(f"<item>{r}</item>" for r in ROLES)
+        return f"<ns1:listerRolesResponse><roles>{roles}</roles></ns1:listerRolesResponse>"
+
+    def listerUtilisateurs(self, p):
+        self.donnees.verifierAdmin(p.get("jeton", ""))
+        return (f"<ns1:listerUtilisateursResponse><utilisateurs>{self.donnees.listeSerialisee()}"
+                "</utilisateurs></ns1:listerUtilisateursResponse>")
+
+    def listerUtilisateursPage(self, p):
+        self.donnees.verifierAdmin(p.get("jeton", ""))
+        curseur = max(0, int(p.get("curseur") or 0))
+        limite = min(1000, max(1, int(p.get("limite") or 500)))
+        page = self.donnees.page(curseur, limite)
+        suivant = page[-1][0] if len(page) == limite else 0
+        return (f"<ns1:listerUtilisateursPageResponse><utilisateurs>{''.join(_item(i, u) for i, u in page)}"
+                f"</utilisateurs><curseurSuivant>{suivant}</curseurSuivant></ns1:listerUtilisateursPageResponse>")
+
+    def etatUtilisateurs(self, p):
+        self.donnees.verifierAdmin(p.get("jeton", ""))
+        nbSeaux = min(4096, max(1, int(p.get("nbSeaux") or 256)))
+        nombre, seaux = self.donnees.empreintes(nbSeaux)
+        globale = 0
+        for empreinte in seaux:
+            globale ^= empreinte
+        version = f"{nombre}-{globale:08x}"
+        empreintes = "" if version == p.get("version", "") else "".join(f"{e:08x}" for e in seaux)
+        return (f"<ns1:etatUtilisateursResponse><version>{version}</version><empreintes>{empreintes}</empreintes>"
+                "</ns1:etatUtilisateursResponse>")
+
+    def listerUtilisateursSeaux(self, p):
+        self.donnees.verifierAdmin(p.get("jeton", ""))
+        nbSeaux = min(4096, max(1, int(p.get("nbSeaux") or 256)))
+        seaux = {int(s) for s in p.get("seaux", "").split(",") if s.strip() and 0 <= int(s) < nbSeaux}
+        utilisateurs = "".join(_item(i, u) for i, u in self.donnees.seaux(nbSeaux, seaux))
+        return (f"<ns1:listerUtilisateursSeauxResponse><utilisateurs>{utilisateurs}</utilisateurs>"
+                "</ns1:listerUtilisateursSeauxResponse>")
+
+    def ajouterUtilisateur(self, p):
+        try:
+            self.donnees.verifierAdmin(p.get("jeton", ""))
+            identifiant = self.donnees.ajouter(p.get("pseudo", ""), p.get("email", ""), p.get("motDePasse", ""),
+                                               p.get("role") or "visiteur")
+        except (FauteSimulee, ValueError) as e:
+            return _reponseStandard("ajouterUtilisateur", False, str(e))
+        return _reponseStandard("ajouterUtilisateur", True, utilisateurId=identifiant)
+
+    def modifierUtilisateur(self, p):
+        try:
+            self.donnees.verifierAdmin(p.get("jeton", ""))
+            self.donnees.modifier(int(p.get("id") or 0), p.get("pseudo", ""), p.get("email", ""), p.get("role", ""))
+        except (FauteSimulee, ValueError) as e:
+            return _reponseStandard("modifierUtilisateur", False, str(e))
+        return _reponseStandard("modifierUtilisateur", True)
+
+    def supprimerUtilisateur(self, p):
+        try:
+            self.donnees.verifierAdmin(p.get("jeton", ""))
+            self.donnees.supprimer(int(p.get("id") or 0))
+        except (FauteSimulee, ValueError) as e:
+            return _reponseStandard("supprimerUtilisateur", False, str(e))
+        return _reponseStandard("supprimerUtilisateur", True)
+
+
+def _enveloppe(corps):
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n<SOAP-ENV:Envelope xmlns:SOAP-ENV="{NS_ENVELOPPE}" '
+            f'xmlns:ns1="{NS_SERVICE}"><SOAP-ENV:Body>{corps}</SOAP-ENV:Body></SOAP-ENV:Envelope>\n').encode("utf-8")
+
+
+def _faute(message):
+    return _enveloppe(f"<SOAP-ENV:Fault><faultcode>SOAP-ENV:Server</faultcode>"
+                      f"<faultstring>{escape(message)}</faultstring></SOAP-ENV:Fault>")
+
+
+class GestionnaireSoap(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Réponse écrite en un seul envoi : pas d'attente d'accusé de réception retardé
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.verrouConnexions:
+            self.server.connexions.add(self.connection)
+
+    def finish(self):
+        with self.server.verrouConnexions:
+            self.server.connexions.discard(self.connection)
+        super().finish()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _envoyer(self, statut, contenu, typeContenu="text/xml; charset=utf-8", corps=True):
+        entetes = [f"HTTP/1.1 {statut} {self.responses.get(statut, ('',))[0]}", f"Content-Type: {typeContenu}"]
+        if corps and self.server.compression and "gzip" in self.headers.get("Accept-Encoding", ""):
+            contenu = gzip.compress(contenu, compresslevel=6)
+            entetes.append("Content-Encoding: gzip")
+        entetes.append(f"Content-Length: {len(contenu)}")
+        self.wfile.write(("\r\n".join(entetes) + "\r\n\r\n").encode("latin-1") + (contenu if corps else b""))
+
+    def do_HEAD(self):
+        self._envoyer(200, self.server.wsdl, corps=False)
+
+    def do_GET(self):
+        if self.server.latence:
+            time.sleep(self.server.latence)
+        self._envoyer(200, self.server.wsdl)
+
+    def do_POST(self):
+        requete = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.server.latence:
+            time.sleep(self.server.latence)
+        try:
+            corps = etree.fromstring(requete).find(f"{{{NS_ENVELOPPE}}}Body")[0]
+            operation = etree.QName(corps).localname
+            parametres = {etree.QName(e).localname: e.text or "" for e in corps}
+            self._envoyer(200, _enveloppe(self.server.services.traiter(operation, parametres)))
+        except FauteSimulee as e:
+            self._envoyer(500, _faute(str(e)))
+        except Exception as e:
+            self._envoyer(500, _faute(f"Requête invalide : {e}"))
+
+
+class ServeurSimule(ThreadingHTTPServer):
+    """Serveur HTTP du service simulé ; url est l'adresse du WSDL à passer à ServiceSoap.
+
+    Plusieurs instances partageant les mêmes `donnees` simulent des répliques du backend
+    (jetons valables sur toutes).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, nbUtilisateurs=1000, latence=0.0, port=0, hote="127.0.0.1", compression=True, donnees=None):
+        super().__init__((hote, port), GestionnaireSoap)
+        self.latence = latence
+        self.compression = compression
+        self.connexions = set()
+        self.verrouConnexions = threading.Lock()
+        self.donnees = donnees or DonneesSimulees(nbUtilisateurs)
+        self.services = ServicesSimules(self.donnees)
+        adresse = f"http://{hote}:{self.server_address[1]}/soap.php"
+        with open(CHEMIN_WSDL, "rb") as fichier:
+            self.wsdl = re.sub(rb'(<soap:address location=")[^"]*', rb"\g<1>" + adresse.encode(), fichier.read())
+        self.url = adresse + "?wsdl"
+        self._thread = None
+
+    def demarrer(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="serveur-simule", daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        self.shutdown()
+        self.server_close()
+        # Comme un serveur arrêté : les connexions keep-alive ouvertes sont coupées
+        with self.verrouConnexions:
+            for connexion in self.connexions:
+                try:
+                    connexion.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def __enter__(self):
+        return self.demarrer()
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+
+def main(arguments=None):
+    parseur = argparse.ArgumentParser(description="Serveur SOAP luXew simulé (sans PHP ni MySQL)")
+    parseur.add_argument("--port", type=int, default=8080)
+    parseur.add_argument("--hote", default="127.0.0.1")
+    parseur.add_argument("--utilisateurs", type=int, default=1000, help="nombre d'utilisateurs synthétiques")
+    parseur.add_argument("--latence", type=float, default=0.0, help="latence ajoutée par requête, en millisecondes")
+    parseur.add_argument("--sans-compression", action="store_true", help="ne pas compresser les réponses en gzip")
+    args = parseur.parse_args(arguments)
+
+    serveur = ServeurSimule(args.utilisateurs, args.latence / 1000, args.port, args.hote, not args.sans_compression)
+    print(f"WSDL : {serveur.url} (admin : {PSEUDO_ADMIN} / {MOT_DE_PASSE_ADMIN})")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,3 +6,6 @@ class ErreurAuthentification(Exception):
 
 class ErreurConnexion(Exception):
     pass
+
+class ServeurIndisponible(ErreurConnexion):
+    pass
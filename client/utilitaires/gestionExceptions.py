@@ -4,7 +4,12 @@ from utilitaires.exceptions import ErreurConnexion, TokenExpireException, Erreur
 def gerer_exception(exception, app):
     if isinstance(exception, TokenExpireException):
         messagebox.showerror("Erreur", "Votre session a expiré. Veuillez vous reconnecter.")
+        # Les écrans passent leur conteneur : l'application est la fenêtre principale
+        if not hasattr(app, 'afficher_ecran') and hasattr(app, 'winfo_toplevel'):
+            app = app.winfo_toplevel()
         if hasattr(app, 'afficher_ecran'):
+            # Import local : ecranConnexion importe ce module
+            from vues.ecranConnexion import EcranConnexion
             app.afficher_ecran(EcranConnexion)
     elif isinstance(exception, ErreurAuthentification):
         messagebox.showerror("Erreur d'authentification", str(exception))
@@ -0,0 +1,101 @@
+from tkinter import ttk
+
+INTERVALLE_SONDAGE = 30  # ms
+
+
+def suivreFuture(widget, future, succes=None, echec=None, fin=None):
+    """Attend un future sans bloquer la boucle Tk puis rappelle succes/echec sur le thread Tk"""
+    racine = widget.winfo_toplevel()
+
+    def verifier():
+        try:
+            if not widget.winfo_exists():
+                return
+        except Exception:
+            return
+        if not future.done():
+            racine.after(INTERVALLE_SONDAGE, verifier)
+            return
+        if fin:
+            fin(future)
+        if future.cancelled():
+            return
+        erreur = future.exception()
+        if erreur is not None:
+            if echec:
+                echec(erreur)
+        elif succes:
+            succes(future.result())
+
+    racine.after(INTERVALLE_SONDAGE, verifier)
+
+
+class IndicateurActivite(ttk.Frame):
+    """Indicateur d'occupation : barre indéterminée, nombre de requêtes en cours et bouton d'annulation"""
+
+    def __init__(self, parent, executeur):
+        super().__init__(parent)
+        self.executeur = executeur
+        self._enCours = {}
+
+        self.barre = ttk.Progressbar(self, mode="indeterminate", length=120)
+        self.libelle = ttk.Label(self, text="")
+        self.boutonAnnuler = ttk.Button(self, text="Annuler", command=self.annuler)
+
+        self.barre.pack(side="left", padx=5)
+        self.libelle.pack(side="left", padx=5)
+        self.boutonAnnuler.pack(side="left", padx=5)
+        self._rafraichir()
+
+        self.bind("<Destroy>", lambda e: self.annuler(notifier=False) if e.widget is self else None)
+
+    def lancer(self, methode, *args, succes=None, echec=None, **kwargs):
+        """Soumet un appel à l'exécuteur ; les rappels sont ignorés si l'appel est annulé"""
+        future = self.executeur.soumettre(methode, *args, **kwargs)
+        self.suivre(future, succes, echec)
+        return future
+
+    def suivre(self, future, succes=None, echec=None, annulation=None):
+        """annulation : rappel exécuté sur le thread Tk si l'utilisateur annule l'appel"""
+        etat = {"abandonne": False, "annulation": annulation}
+        self._enCours[future] = etat
+        self._rafraichir()
+
+        def terminer(f):
+            self._enCours.pop(f, None)
+            if self.winfo_exists():
+                self._rafraichir()
+
+        def siActif(rappel):
+            if rappel is None:
+                return None
+            return lambda valeur: None if etat["abandonne"] else rappel(valeur)
+
+        suivreFuture(self, future, siActif(succes), siActif(echec), fin=terminer)
+
+    def occupe(self):
+        return bool(self._enCours)
+
+    def annuler(self, notifier=True):
+        # Un appel déjà parti sur le réseau ne peut pas être interrompu : son résultat est ignoré
+        for future, etat in list(self._enCours.items()):
+            future.cancel()
+            etat["abandonne"] = True
+            if notifier and etat["annulation"]:
+                etat["annulation"]()
+        self._enCours.clear()
+        try:
+            self._rafraichir()
+        except Exception:
+            pass
+
+    def _rafraichir(self):
+        nombre = len(self._enCours)
+        if nombre:
+            self.barre.start(15)
+            self.libelle.configure(text=f"{nombre} requête(s) en cours…")
+            self.boutonAnnuler.state(["!disabled"])
+        else:
+            self.barre.stop()
+            self.libelle.configure(text="")
+            self.boutonAnnuler.state(["disabled"])
@@ -0,0 +1,20 @@
+import re
+
+# Approximation de FILTER_VALIDATE_EMAIL utilisé par le backend
+MOTIF_EMAIL = re.compile(r"^[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+@[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)+$")
+
+
+def validerUtilisateur(pseudo, email, motDePasse, role, rolesDisponibles=None):
+    """Mêmes règles que ServicesSoap::ajouterUtilisateur ; retourne la liste des erreurs"""
+    erreurs = []
+    # strlen() côté PHP compte des octets
+    longueur = lambda texte: len((texte or "").encode("utf-8"))
+    if not MOTIF_EMAIL.match(email or "") or ".." in (email or ""):
+        erreurs.append("Email invalide")
+    if not pseudo or longueur(pseudo) < 3:
+        erreurs.append("Pseudo trop court")
+    if longueur(motDePasse) < 8:
+        erreurs.append("Mot de passe trop court (minimum 8 caractères)")
+    if rolesDisponibles is not None and role not in rolesDisponibles:
+        erreurs.append("Rôle invalide")
+    return erreurs
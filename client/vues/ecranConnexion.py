@@ -3,12 +3,12 @@ from tkinter import ttk
 from utilitaires.gestionExceptions import gerer_exception
 from utilitaires.utilitairesTkinter import afficherErreur
 from utilitaires.exceptions import TokenExpireException
+from utilitaires.tachesTkinter import IndicateurActivite
 
 class EcranConnexion(ttk.Frame):
     def __init__(self, parent, app):
         super().__init__(parent)
         self.app = app
-        self.serviceSoap = app.serviceSoap
         self.pack(fill='both', expand=True)
         self.creer_widgets()
     
@@ -29,6 +29,9 @@ class EcranConnexion(ttk.Frame):
         self.entryMotDePasse.pack(ipady=5)
 
         ttk.Button(container, text="Se connecter", command=self.se_connecter).pack(pady=20)
+
+        self.indicateur = IndicateurActivite(container, self.app.executeur)
+        self.indicateur.pack()
     
     def se_connecter(self):
         pseudo = self.entryPseudo.get().strip()
@@ -38,9 +41,16 @@ class EcranConnexion(ttk.Frame):
             afficherErreur("Erreur", "Veuillez remplir tous les champs")
             return
         
-        try:
-            token = self.serviceSoap.authentifier(pseudo, mdp)
-            if token:
-                self.app.naviguer_vers_gestion_utilisateur(token)
-        except Exception as e:
-            gerer_exception(e, self.app)
\ No newline at end of file
+        if self.indicateur.occupe():
+            return
+        
+        # Passe par l'application : le ServiceSoap peut être encore en préchauffage
+        self.indicateur.lancer(self.app.authentifier, pseudo, mdp,
+                               succes=self._connexion_reussie, echec=self._connexion_echouee)
+    
+    def _connexion_reussie(self, token):
+        if token:
+            self.app.naviguer_vers_gestion_utilisateur(token)
+    
+    def _connexion_echouee(self, erreur):
+        gerer_exception(erreur, self.app)
\ No newline at end of file
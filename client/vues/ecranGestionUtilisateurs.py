@@ -1,30 +1,72 @@
+import time
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 from utilitaires.utilitairesTkinter import afficherErreur, afficherInfo, demanderConfirmation
 from utilitaires.gestionExceptions import gerer_exception
+from utilitaires.exceptions import TokenExpireException
+from utilitaires.tachesTkinter import IndicateurActivite, suivreFuture
+from services.executeurSoap import ExecuteurSoap
+from services.depotUtilisateurs import DepotUtilisateurs
+from services.indexUtilisateurs import IndexUtilisateurs
 from vues.ecranConnexion import EcranConnexion
+from vues.rendeurTreeview import RendeurTreeview
+from vues.fenetreImport import FenetreImport
+
+TOUS_LES_ROLES = "Tous les rôles"
+# Synchronisation en arrière-plan : période normale, et plafond de l'attente après des échecs (ms)
+INTERVALLE_SYNCHRONISATION = 3000
+INTERVALLE_SYNCHRONISATION_MAX = 60000
+
 
 class EcranGestionUtilisateurs(ttk.Frame):
-    def __init__(self, master, token, serviceSoap):
+    def __init__(self, master, token, serviceSoap, executeur=None, depot=None):
         super().__init__(master)
         self.master = master
         self.token = token
         self.serviceSoap = serviceSoap
+        self.executeur = executeur or ExecuteurSoap(serviceSoap)
+        self.depot = depot or DepotUtilisateurs(serviceSoap)
         self.roles = []
+        self.chargementListe = None
+        self.index = IndexUtilisateurs()
+        self.tri = None  # (colonne, décroissant)
+        self._recherchePrevue = None
+        self.intervalleSynchronisation = INTERVALLE_SYNCHRONISATION
+        self._synchronisationPrevue = None
         self.pack(fill='both', expand=True, padx=20, pady=20)
         self.creerInterface()
         self.chargerRoles()
-        self.listerUtilisateurs()
+        self.listerUtilisateurs(forcer=False)
+        self.planifierSynchronisation()
+        self.bind("<Destroy>", lambda e: self.arreterSynchronisation() if e.widget is self else None)
 
     def creerInterface(self):
         # Titre principal
         ttk.Label(self, text="Gestion des Utilisateurs", style='Header.TLabel').pack(pady=10)
 
-        # Treeview pour la liste des utilisateurs
-        colonnes = ("id", "pseudo", "email", "roles")
-        self.treeUtilisateurs = ttk.Treeview(self, columns=colonnes, show="headings", height=10)
-        for col in colonnes:
-            self.treeUtilisateurs.heading(col, text=col.capitalize())
+        # Indicateur des requêtes SOAP en cours (exécutées hors du thread Tk)
+        self.indicateur = IndicateurActivite(self, self.executeur)
+        self.indicateur.pack(pady=5)
+
+        # Recherche locale sur pseudo et email, filtre par rôle : aucun appel réseau
+        cadreRecherche = ttk.Frame(self)
+        cadreRecherche.pack(fill="x", padx=10)
+        ttk.Label(cadreRecherche, text="Rechercher :").pack(side="left")
+        self.texteRecherche = tk.StringVar()
+        self.texteRecherche.trace_add("write", lambda *args: self.planifierRecherche())
+        ttk.Entry(cadreRecherche, textvariable=self.texteRecherche, width=30).pack(side="left", padx=5)
+        self.comboRoleFiltre = ttk.Combobox(cadreRecherche, values=[TOUS_LES_ROLES], state="readonly", width=18)
+        self.comboRoleFiltre.set(TOUS_LES_ROLES)
+        self.comboRoleFiltre.bind("<<ComboboxSelected>>", lambda e: self.planifierRecherche())
+        self.comboRoleFiltre.pack(side="left", padx=5)
+        self.libelleResultats = ttk.Label(cadreRecherche, text="")
+        self.libelleResultats.pack(side="left", padx=5)
+
+        # Treeview pour la liste des utilisateurs (clic sur un en-tête : tri par colonne)
+        self.colonnes = ("id", "pseudo", "email", "roles")
+        self.treeUtilisateurs = ttk.Treeview(self, columns=self.colonnes, show="headings", height=10)
+        for col in self.colonnes:
+            self.treeUtilisateurs.heading(col, text=col.capitalize(), command=lambda c=col: self.trierPar(c))
             self.treeUtilisateurs.column(col, width=150)
         
         # Scrollbar pour le Treeview
@@ -37,9 +79,34 @@ class EcranGestionUtilisateurs(ttk.Frame):
         
         self.treeUtilisateurs.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
+
+        # Seules les lignes visibles sont présentes dans le Treeview, mises à jour par différence
+        self.rendeur = RendeurTreeview(self.treeUtilisateurs, scrollbar,
+                                       cle=lambda u: u.id, valeurs=self.valeursLigne,
+                                       surSelection=self.selectionModifiee)
         
-        # Bouton actualiser
-        ttk.Button(self, text="Actualiser la liste", command=self.listerUtilisateurs).pack(pady=5)
+        # Bouton actualiser (relecture complète) et synchronisation des changements faits par d'autres sessions
+        cadreActualiser = ttk.Frame(self)
+        cadreActualiser.pack(pady=5)
+        ttk.Button(cadreActualiser, text="Actualiser la liste", command=self.listerUtilisateurs).pack(side="left", padx=5)
+        self.synchronisationAuto = tk.BooleanVar(value=True)
+        ttk.Checkbutton(cadreActualiser, text="Synchronisation automatique",
+                        variable=self.synchronisationAuto).pack(side="left", padx=5)
+        self.libelleSynchronisation = ttk.Label(cadreActualiser, text="")
+        self.libelleSynchronisation.pack(side="left", padx=5)
+        ttk.Button(self, text="Importer un fichier…", command=self.importerFichier).pack(pady=5)
+
+        # Cadre actions groupées sur les lignes sélectionnées (Ctrl/Maj + clic, Ctrl+A)
+        cadreLot = ttk.LabelFrame(self, text="Actions sur la sélection", padding=10)
+        cadreLot.pack(fill="x", padx=10, pady=10)
+
+        self.libelleSelection = ttk.Label(cadreLot, text="Aucun utilisateur sélectionné")
+        self.libelleSelection.grid(row=0, column=0, columnspan=3, sticky="w", padx=5, pady=2)
+
+        ttk.Button(cadreLot, text="Supprimer la sélection", command=self.supprimerSelection).grid(row=1, column=0, padx=5, pady=2)
+        self.comboRoleLot = ttk.Combobox(cadreLot, values=self.roles, state="readonly", width=20)
+        self.comboRoleLot.grid(row=1, column=1, padx=5, pady=2)
+        ttk.Button(cadreLot, text="Attribuer le rôle", command=self.attribuerRoleSelection).grid(row=1, column=2, padx=5, pady=2)
 
         # Cadre ajout utilisateur
         cadreAjout = ttk.LabelFrame(self, text="Ajouter un Utilisateur", padding=10)
@@ -100,32 +167,129 @@ class EcranGestionUtilisateurs(ttk.Frame):
         ttk.Button(self, text="Déconnexion", command=self.deconnecter).pack(pady=10)
 
     def chargerRoles(self):
-        try:
-            self.roles = self.serviceSoap.listerRoles(self.token)
-            self.comboRoleAjout['values'] = self.roles
-            self.comboRoleModif['values'] = self.roles
-            if self.roles:
-                self.comboRoleAjout.set(self.roles[0] if 'visiteur' not in self.roles else 'visiteur')
-        except Exception as e:
-            gerer_exception(e, self.master)
-            self.roles = ['visiteur']  
+        self.indicateur.lancer(self.depot.roles, self.token,
+                               succes=self.afficherRoles, echec=self.echecChargementRoles)
 
-    def listerUtilisateurs(self):
-        try:
-            utilisateurs = self.serviceSoap.listerUtilisateurs(self.token)
-            for item in self.treeUtilisateurs.get_children():
-                self.treeUtilisateurs.delete(item)
-            
-            for u in utilisateurs:
-                roles = ", ".join(u.roles.item) if hasattr(u.roles, 'item') and u.roles.item else "Aucun"
-                self.treeUtilisateurs.insert("", "end", values=(
-                    getattr(u, "id", "N/A"),
-                    getattr(u, "pseudo", "N/A"),
-                    getattr(u, "email", "N/A"),
-                    roles
-                ))
-        except Exception as e:
-            gerer_exception(e, self.master)
+    def afficherRoles(self, roles):
+        self.roles = roles
+        self.comboRoleAjout['values'] = self.roles
+        self.comboRoleModif['values'] = self.roles
+        self.comboRoleLot['values'] = self.roles
+        self.comboRoleFiltre['values'] = [TOUS_LES_ROLES] + list(self.roles)
+        if self.roles:
+            self.comboRoleAjout.set(self.roles[0] if 'visiteur' not in self.roles else 'visiteur')
+
+    def echecChargementRoles(self, erreur):
+        gerer_exception(erreur, self.master)
+        self.roles = ['visiteur']
+
+    def listerUtilisateurs(self, forcer=True):
+        # Une seule actualisation à la fois : les clics répétés sont ignorés
+        if self.chargementListe and not self.chargementListe.done():
+            return
+        self.chargementListe = self.indicateur.lancer(self.chargerUtilisateurs, self.token, forcer,
+                                                      succes=self.afficherUtilisateurs,
+                                                      echec=lambda e: gerer_exception(e, self.master))
+
+    def chargerUtilisateurs(self, jeton, forcer):
+        """Exécuté hors du thread Tk : la liste et son index de recherche sont construits ensemble"""
+        utilisateurs = self.depot.utilisateurs(jeton, forcer)
+        return utilisateurs, IndexUtilisateurs(utilisateurs)
+
+    def afficherUtilisateurs(self, resultat):
+        utilisateurs, self.index = resultat
+        if self.tri:
+            # Les clés de tri viennent du nouvel index
+            colonne, decroissant = self.tri
+            self.rendeur.trier(self.index.cle(colonne), decroissant)
+        self.rendeur.synchroniser(utilisateurs, termine=self.appliquerRecherche)
+
+    def planifierSynchronisation(self):
+        self._synchronisationPrevue = self.after(self.intervalleSynchronisation, self.synchroniser)
+
+    def arreterSynchronisation(self):
+        if self._synchronisationPrevue is not None:
+            self.after_cancel(self._synchronisationPrevue)
+            self._synchronisationPrevue = None
+
+    def synchroniser(self):
+        """Compare les empreintes du dépôt à celles du serveur, hors du thread Tk et sans l'indicateur d'activité"""
+        self._synchronisationPrevue = None
+        # Pas pendant une relecture complète ni pendant son affichage par lots
+        chargement = self.chargementListe and not self.chargementListe.done()
+        if not self.synchronisationAuto.get() or chargement or self.rendeur.occupe():
+            self.planifierSynchronisation()
+            return
+        future = self.executeur.soumettre(self.depot.synchroniser, self.token)
+        suivreFuture(self, future, succes=self.synchronisationTerminee, echec=self.echecSynchronisation)
+
+    def synchronisationTerminee(self, changements):
+        self.intervalleSynchronisation = INTERVALLE_SYNCHRONISATION
+        self.planifierSynchronisation()
+        if changements is None:
+            # Liste pas encore chargée, ou backend sans etatUtilisateurs
+            return
+        if changements.complet:
+            # Le dépôt vient d'être relu : liste et index reconstruits depuis le cache
+            self.listerUtilisateurs(forcer=False)
+        for utilisateur in changements.modifies:
+            self.afficherLigne(utilisateur)
+        for identifiant in changements.supprimes:
+            self.retirerLigne(identifiant)
+        nombre = len(changements.modifies) + len(changements.supprimes)
+        texte = f"Synchronisé à {time.strftime('%H:%M:%S')}"
+        if nombre:
+            texte += f" ({nombre} changement(s))"
+        self.libelleSynchronisation.configure(text=texte)
+
+    def echecSynchronisation(self, erreur):
+        if isinstance(erreur, TokenExpireException):
+            gerer_exception(erreur, self.master)
+            return
+        # Serveur injoignable : nouvel essai de plus en plus espacé, sans boîte de dialogue
+        self.intervalleSynchronisation = min(INTERVALLE_SYNCHRONISATION_MAX, self.intervalleSynchronisation * 2)
+        self.libelleSynchronisation.configure(text=f"Synchronisation interrompue : {erreur}")
+        self.planifierSynchronisation()
+
+    def afficherLigne(self, utilisateur):
+        """Ligne ajoutée ou modifiée : liste affichée et index de recherche"""
+        self.index.mettreAJour(utilisateur)
+        self.rendeur.mettreAJour(utilisateur)
+        self.planifierRecherche()
+
+    def retirerLigne(self, identifiant):
+        self.index.supprimer(identifiant)
+        self.rendeur.supprimer(identifiant)
+        self.planifierRecherche()
+
+    def planifierRecherche(self):
+        # Plusieurs frappes ou mises à jour entre deux images ne déclenchent qu'une recherche
+        if self._recherchePrevue is None:
+            self._recherchePrevue = self.after_idle(self.appliquerRecherche)
+
+    def appliquerRecherche(self):
+        self._recherchePrevue = None
+        texte = self.texteRecherche.get()
+        role = self.comboRoleFiltre.get()
+        role = None if role == TOUS_LES_ROLES else role
+        self.rendeur.filtrer(self.index.rechercher(texte, role))
+        if not texte.strip() and not role:
+            self.libelleResultats.configure(text="")
+        else:
+            self.libelleResultats.configure(text=f"{self.rendeur.nombreAffiche()} / {len(self.rendeur)} utilisateur(s)")
+
+    def trierPar(self, colonne):
+        # Un second clic sur la même colonne inverse l'ordre
+        decroissant = self.tri == (colonne, False)
+        self.tri = (colonne, decroissant)
+        self.rendeur.trier(self.index.cle(colonne), decroissant)
+        for col in self.colonnes:
+            fleche = (" ▼" if decroissant else " ▲") if col == colonne else ""
+            self.treeUtilisateurs.heading(col, text=col.capitalize() + fleche)
+
+    @staticmethod
+    def valeursLigne(u):
+        return (u.id, u.pseudo, u.email, ", ".join(u.roles) or "Aucun")
 
     def ajouterUtilisateur(self):
         pseudo = self.champPseudoAjout.get().strip()
@@ -137,19 +301,108 @@ class EcranGestionUtilisateurs(ttk.Frame):
             afficherErreur("Erreur", "Veuillez remplir tous les champs pour l'ajout.")
             return
 
-        try:
-            reponse = self.serviceSoap.ajouterUtilisateur(self.token, pseudo, email, motDePasse, role)
-            if getattr(reponse, "succes", False):
-                afficherInfo("Succès", f"Utilisateur ajouté (ID: {getattr(reponse, 'utilisateurId', 'N/A')})")
-                self.champPseudoAjout.delete(0, "end")
-                self.champEmailAjout.delete(0, "end")
-                self.champMotDePasseAjout.delete(0, "end")
-                self.comboRoleAjout.set(self.roles[0] if 'visiteur' not in self.roles else 'visiteur')
-                self.listerUtilisateurs()
-            else:
-                afficherErreur("Erreur", getattr(reponse, "message", "Erreur lors de l'ajout."))
-        except Exception as e:
-            gerer_exception(e, self.master)
+        self.indicateur.lancer(self.depot.ajouterUtilisateur, self.token, pseudo, email, motDePasse, role,
+                               succes=self.ajoutTermine, echec=lambda e: gerer_exception(e, self.master))
+
+    def ajoutTermine(self, reponse):
+        if reponse.succes:
+            afficherInfo("Succès", f"Utilisateur ajouté (ID: {reponse.utilisateurId})")
+            self.champPseudoAjout.delete(0, "end")
+            self.champEmailAjout.delete(0, "end")
+            self.champMotDePasseAjout.delete(0, "end")
+            self.comboRoleAjout.set(self.roles[0] if 'visiteur' not in self.roles else 'visiteur')
+            nouveau = self.depot.obtenir(reponse.utilisateurId)
+            if nouveau is not None:
+                self.afficherLigne(nouveau)
+        else:
+            afficherErreur("Erreur", reponse.message or "Erreur lors de l'ajout.")
+
+    def selectionModifiee(self, identifiants):
+        nombre = len(identifiants)
+        self.libelleSelection.configure(text=f"{nombre} utilisateur(s) sélectionné(s)" if nombre else "Aucun utilisateur sélectionné")
+        if nombre == 1:
+            for champ in (self.champIdModif, self.champIdSupp):
+                champ.delete(0, "end")
+                champ.insert(0, str(identifiants[0]))
+
+    def supprimerSelection(self):
+        identifiants = self.rendeur.selection()
+        if not identifiants:
+            afficherErreur("Erreur", "Veuillez sélectionner au moins un utilisateur.")
+            return
+        if not demanderConfirmation("Confirmation", f"Supprimer {len(identifiants)} utilisateur(s) ?"):
+            return
+
+        mutations = [self.depot.preparerSuppression(identifiant) for identifiant in identifiants]
+        for identifiant in identifiants:
+            self.retirerLigne(identifiant)
+        self.lancerLot(mutations, "supprimé(s)")
+
+    def attribuerRoleSelection(self):
+        identifiants = self.rendeur.selection()
+        role = self.comboRoleLot.get().strip()
+        if not identifiants or not role:
+            afficherErreur("Erreur", "Veuillez sélectionner des utilisateurs et un rôle.")
+            return
+        if not demanderConfirmation("Confirmation", f"Attribuer le rôle « {role} » à {len(identifiants)} utilisateur(s) ?"):
+            return
+
+        mutations = [self.depot.preparerModification(identifiant, "", "", role) for identifiant in identifiants]
+        for mutation in mutations:
+            if mutation.precedent is not None:
+                self.afficherLigne(mutation.nouveau)
+        self.lancerLot(mutations, "modifié(s)")
+
+    def lancerLot(self, mutations, action):
+        """Envoie les mutations en parallèle puis applique un seul bilan à l'interface"""
+        future = self.executeur.soumettreLot(self.depot.envoyer, [(self.token, m) for m in mutations],
+                                             surAnnulation=lambda jeton, mutation: self.depot.annuler(mutation))
+        self.indicateur.suivre(future, succes=lambda resultats: self.lotTermine(resultats, action),
+                               echec=lambda e: gerer_exception(e, self.master),
+                               annulation=lambda: self.retablirTout(mutations))
+
+        def realigner(resultats):
+            # Les appels déjà partis lors de l'annulation ont pu échouer depuis et être annulés dans le dépôt
+            if future.cancelled():
+                self.retablirTout(mutations)
+
+        suivreFuture(self, future.termine, succes=realigner)
+
+    def lotTermine(self, resultats, action):
+        reussis = 0
+        erreurs = []
+        for resultat in resultats:
+            _, mutation = resultat.arguments
+            if resultat.erreur is None and resultat.resultat.succes:
+                reussis += 1
+                continue
+            self.retablir(mutation)
+            message = str(resultat.erreur) if resultat.erreur is not None else (resultat.resultat.message or "Refusé")
+            erreurs.append(f"ID {mutation.identifiant} : {message}")
+
+        expirations = [r.erreur for r in resultats if isinstance(r.erreur, TokenExpireException)]
+        if expirations:
+            gerer_exception(expirations[0], self.master)
+            return
+        if erreurs:
+            apercu = "\n".join(erreurs[:10]) + (f"\n… et {len(erreurs) - 10} autre(s)" if len(erreurs) > 10 else "")
+            afficherErreur("Résultat", f"{reussis} utilisateur(s) {action}, {len(erreurs)} échec(s) :\n{apercu}")
+        else:
+            afficherInfo("Succès", f"{reussis} utilisateur(s) {action}.")
+
+    def importerFichier(self):
+        chemin = filedialog.askopenfilename(parent=self, title="Importer des utilisateurs",
+                                            filetypes=[("CSV ou JSONL", "*.csv *.jsonl *.ndjson"), ("Tous", "*.*")])
+        if not chemin:
+            return
+        FenetreImport(self, self.executeur, self.depot, self.token, self.roles, chemin, termine=self.importTermine)
+
+    def importTermine(self, resultats):
+        for resultat in resultats:
+            if resultat.statut == "ajoute":
+                utilisateur = self.depot.obtenir(resultat.utilisateurId)
+                if utilisateur is not None:
+                    self.afficherLigne(utilisateur)
 
     def modifierUtilisateur(self):
         idUtilisateur = self.champIdModif.get().strip()
@@ -164,19 +417,28 @@ class EcranGestionUtilisateurs(ttk.Frame):
             afficherErreur("Erreur", "Veuillez remplir au moins un champ à modifier.")
             return
 
-        try:
-            reponse = self.serviceSoap.modifierUtilisateur(self.token, idUtilisateur, nouveauPseudo, nouvelEmail, nouveauRole)
-            if getattr(reponse, "succes", False):
-                afficherInfo("Succès", "Utilisateur modifié avec succès.")
-                self.champIdModif.delete(0, "end")
-                self.champPseudoModif.delete(0, "end")
-                self.champEmailModif.delete(0, "end")
-                self.comboRoleModif.set("")
-                self.listerUtilisateurs()
-            else:
-                afficherErreur("Erreur", getattr(reponse, "message", "Erreur lors de la modification."))
-        except Exception as e:
-            gerer_exception(e, self.master)
+        identifiant = self.lireIdentifiant(idUtilisateur)
+        if identifiant is None:
+            return
+
+        # Affichage immédiat de la modification, annulée si le serveur la refuse
+        mutation = self.depot.preparerModification(identifiant, nouveauPseudo, nouvelEmail, nouveauRole)
+        if mutation.precedent is not None:
+            self.afficherLigne(mutation.nouveau)
+        self.indicateur.lancer(self.depot.envoyer, self.token, mutation,
+                               succes=lambda r: self.modificationTerminee(r, mutation),
+                               echec=lambda e: self.mutationEchouee(e, mutation))
+
+    def modificationTerminee(self, reponse, mutation):
+        if reponse.succes:
+            afficherInfo("Succès", "Utilisateur modifié avec succès.")
+            self.champIdModif.delete(0, "end")
+            self.champPseudoModif.delete(0, "end")
+            self.champEmailModif.delete(0, "end")
+            self.comboRoleModif.set("")
+        else:
+            self.retablir(mutation)
+            afficherErreur("Erreur", reponse.message or "Erreur lors de la modification.")
 
     def supprimerUtilisateur(self):
         idUtilisateur = self.champIdSupp.get().strip()
@@ -187,19 +449,52 @@ class EcranGestionUtilisateurs(ttk.Frame):
         if not demanderConfirmation("Confirmation", f"Supprimer l'utilisateur ID {idUtilisateur} ?"):
             return
 
+        identifiant = self.lireIdentifiant(idUtilisateur)
+        if identifiant is None:
+            return
+
+        mutation = self.depot.preparerSuppression(identifiant)
+        self.retirerLigne(identifiant)
+        self.indicateur.lancer(self.depot.envoyer, self.token, mutation,
+                               succes=lambda r: self.suppressionTerminee(r, mutation),
+                               echec=lambda e: self.mutationEchouee(e, mutation))
+
+    def suppressionTerminee(self, reponse, mutation):
+        if reponse.succes:
+            afficherInfo("Succès", "Utilisateur supprimé avec succès.")
+            self.champIdSupp.delete(0, "end")
+        else:
+            self.retablir(mutation)
+            afficherErreur("Erreur", reponse.message or "Erreur lors de la suppression.")
+
+    def mutationEchouee(self, erreur, mutation):
+        self.retablir(mutation)
+        gerer_exception(erreur, self.master)
+
+    def retablir(self, mutation):
+        """Réaligne la ligne affichée sur le dépôt après l'annulation d'une mutation"""
+        utilisateur = self.depot.obtenir(mutation.identifiant)
+        if utilisateur is not None:
+            self.afficherLigne(utilisateur)
+        else:
+            self.retirerLigne(mutation.identifiant)
+
+    def retablirTout(self, mutations):
+        for mutation in mutations:
+            self.retablir(mutation)
+
+    def lireIdentifiant(self, texte):
         try:
-            reponse = self.serviceSoap.supprimerUtilisateur(self.token, idUtilisateur)
-            if getattr(reponse, "succes", False):
-                afficherInfo("Succès", "Utilisateur supprimé avec succès.")
-                self.champIdSupp.delete(0, "end")
-                self.listerUtilisateurs()
-            else:
-                afficherErreur("Erreur", getattr(reponse, "message", "Erreur lors de la suppression."))
-        except Exception as e:
-            gerer_exception(e, self.master)
+            return int(texte)
+        except ValueError:
+            afficherErreur("Erreur", f"ID utilisateur invalide : {texte}")
+            return None
 
     def deconnecter(self):
         try:
+            self.arreterSynchronisation()
+            self.indicateur.annuler(notifier=False)
+            self.depot.vider()
             if hasattr(self.master, 'token'):
                 self.master.token = None
             if hasattr(self.serviceSoap, 'deconnecter'):
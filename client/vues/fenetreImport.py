@@ -0,0 +1,79 @@
+import os
+import tkinter as tk
+from tkinter import ttk, filedialog
+from services.importUtilisateurs import ImportUtilisateurs, lireFichier, ecrireRapport
+from utilitaires.tachesTkinter import suivreFuture
+from utilitaires.utilitairesTkinter import afficherErreur
+
+
+class FenetreImport(tk.Toplevel):
+    """Import d'un fichier d'utilisateurs avec progression en direct et rapport ligne par ligne"""
+
+    def __init__(self, parent, executeur, depot, token, roles, chemin, termine=None):
+        super().__init__(parent)
+        self.title("Import d'utilisateurs")
+        self.resizable(False, False)
+        self.termine = termine
+        self.resultats = []
+        self.enCours = True
+
+        self.importation = ImportUtilisateurs(depot.ajouterUtilisateur, token)
+
+        cadre = ttk.Frame(self, padding=15)
+        cadre.pack(fill="both", expand=True)
+
+        ttk.Label(cadre, text=os.path.basename(chemin)).pack(anchor="w")
+        self.barre = ttk.Progressbar(cadre, mode="determinate", length=360)
+        self.barre.pack(pady=10)
+        self.libelle = ttk.Label(cadre, text="Validation du fichier…")
+        self.libelle.pack(anchor="w")
+
+        boutons = ttk.Frame(cadre)
+        boutons.pack(pady=(10, 0))
+        self.boutonAnnuler = ttk.Button(boutons, text="Annuler", command=self.importation.annuler)
+        self.boutonAnnuler.pack(side="left", padx=5)
+        self.boutonRapport = ttk.Button(boutons, text="Enregistrer le rapport", command=self.enregistrerRapport)
+        self.boutonRapport.pack(side="left", padx=5)
+        self.boutonRapport.state(["disabled"])
+        ttk.Button(boutons, text="Fermer", command=self.fermer).pack(side="left", padx=5)
+        self.protocol("WM_DELETE_WINDOW", self.fermer)
+
+        future = executeur.soumettre(self.importation.executer, lireFichier(chemin), roles or None)
+        suivreFuture(self, future, succes=self.importTermine, echec=self.importEchoue)
+        self.rafraichir()
+
+    def rafraichir(self):
+        if not self.winfo_exists():
+            return
+        importation = self.importation
+        if importation.total:
+            self.barre.configure(maximum=importation.total, value=importation.traites)
+            self.libelle.configure(text=f"{importation.traites}/{importation.total} traitées — "
+                                        f"{importation.reussis} ajoutées, {importation.echecs} en échec")
+        if self.enCours:
+            self.after(100, self.rafraichir)
+
+    def importTermine(self, resultats):
+        self.enCours = False
+        self.resultats = resultats
+        self.rafraichir()
+        self.boutonAnnuler.state(["disabled"])
+        self.boutonRapport.state(["!disabled"])
+        if self.termine:
+            self.termine(resultats)
+
+    def importEchoue(self, erreur):
+        self.enCours = False
+        self.boutonAnnuler.state(["disabled"])
+        afficherErreur("Erreur d'import", str(erreur))
+
+    def enregistrerRapport(self):
+        chemin = filedialog.asksaveasfilename(parent=self, defaultextension=".csv",
+                                              filetypes=[("CSV", "*.csv")], initialfile="rapport_import.csv")
+        if chemin:
+            ecrireRapport(self.resultats, chemin)
+
+    def fermer(self):
+        # Fermer la fenêtre arrête l'envoi des lignes restantes
+        self.importation.annuler()
+        self.destroy()
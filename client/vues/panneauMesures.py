@@ -0,0 +1,82 @@
+import tkinter as tk
+from tkinter import ttk, filedialog
+from utilitaires.utilitairesTkinter import afficherErreur
+from services.mesuresSoap import COLONNES_CSV
+
+
+class PanneauMesures(tk.Toplevel):
+    """Fenêtre de diagnostic : percentiles par opération et par phase, export JSON/CSV"""
+
+    # Mêmes colonnes que l'export CSV ; une colonne sans titre ici s'affiche sous son nom
+    COLONNES = COLONNES_CSV
+    TITRES = {"operation": "Opération", "phase": "Phase", "mesures": "Mesures", "p50_ms": "p50 (ms)",
+              "p95_ms": "p95 (ms)", "p99_ms": "p99 (ms)", "max_ms": "Max (ms)", "appels": "Appels",
+              "erreurs": "Erreurs", "octetsEmis": "Octets émis", "octetsRecus": "Octets reçus"}
+
+    def __init__(self, parent, mesures, intervalle=1000):
+        super().__init__(parent)
+        self.title("Mesures SOAP")
+        self.geometry("900x320")
+        self.mesures = mesures
+        self.intervalle = intervalle
+
+        cadre = ttk.Frame(self, padding=10)
+        cadre.pack(fill="both", expand=True)
+
+        self.actif = tk.BooleanVar(value=mesures.actif)
+        ttk.Checkbutton(cadre, text="Mesurer les appels", variable=self.actif,
+                        command=self.basculer).pack(anchor="w")
+
+        self.tree = ttk.Treeview(cadre, columns=self.COLONNES, show="headings", height=10)
+        for colonne in self.COLONNES:
+            self.tree.heading(colonne, text=self.TITRES.get(colonne, colonne))
+            self.tree.column(colonne, width=75, anchor="e")
+        self.tree.column("operation", width=160, anchor="w")
+        self.tree.column("phase", width=100, anchor="w")
+        self.tree.pack(fill="both", expand=True, pady=10)
+
+        boutons = ttk.Frame(cadre)
+        boutons.pack()
+        ttk.Button(boutons, text="Réinitialiser", command=self.reinitialiser).pack(side="left", padx=5)
+        ttk.Button(boutons, text="Exporter JSON…", command=self.exporterJson).pack(side="left", padx=5)
+        ttk.Button(boutons, text="Exporter CSV…", command=self.exporterCsv).pack(side="left", padx=5)
+        ttk.Button(boutons, text="Fermer", command=self.destroy).pack(side="left", padx=5)
+
+        self.rafraichir()
+
+    def basculer(self):
+        self.mesures.actif = self.actif.get()
+
+    def rafraichir(self):
+        if not self.winfo_exists():
+            return
+        lignes = [tuple("" if ligne[c] is None else ligne[c] for c in self.COLONNES) for ligne in self.mesures.lignes()]
+        existantes = self.tree.get_children()
+        # Le tableau est petit (une ligne par opération et phase) : remplacement complet si la forme change
+        if len(existantes) != len(lignes):
+            self.tree.delete(*existantes)
+            existantes = [self.tree.insert("", "end", values=valeurs) for valeurs in lignes]
+        else:
+            for iid, valeurs in zip(existantes, lignes):
+                self.tree.item(iid, values=valeurs)
+        self.after(self.intervalle, self.rafraichir)
+
+    def reinitialiser(self):
+        self.mesures.reinitialiser()
+        self.tree.delete(*self.tree.get_children())
+
+    def exporterJson(self):
+        self._exporter(".json", [("JSON", "*.json")], self.mesures.exporterJson)
+
+    def exporterCsv(self):
+        self._exporter(".csv", [("CSV", "*.csv")], self.mesures.exporterCsv)
+
+    def _exporter(self, extension, types, exporter):
+        chemin = filedialog.asksaveasfilename(parent=self, defaultextension=extension, filetypes=types,
+                                              initialfile=f"mesures_soap{extension}")
+        if not chemin:
+            return
+        try:
+            exporter(chemin)
+        except OSError as e:
+            afficherErreur("Export impossible", str(e))
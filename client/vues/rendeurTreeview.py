@@ -0,0 +1,268 @@
+from tkinter import ttk
+
+
+class RendeurTreeview:
+    """Affichage virtualisé et incrémental d'une liste indexée par identifiant dans un ttk.Treeview.
+
+    Le modèle (toutes les lignes) est conservé en mémoire ; le Treeview ne contient que
+    les lignes visibles, mises à jour par différence à chaque changement ou défilement.
+    """
+
+    def __init__(self, tree, scrollbar, cle, valeurs, tailleLot=2000, surSelection=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.cle = cle
+        self.valeurs = valeurs
+        self.tailleLot = tailleLot
+
+        self._lignes = {}      # identifiant -> tuple de valeurs
+        self._ordre = []       # identifiants dans l'ordre d'affichage
+        self._affiches = {}    # iid présent dans le Treeview -> valeurs affichées
+        self._identifiants = {}  # iid présent dans le Treeview -> identifiant
+        self._selection = set()  # identifiants sélectionnés, visibles ou non
+        self._filtre = None    # identifiants retenus par une recherche, None = toutes les lignes
+        self._vue = None       # _ordre restreint au filtre, recalculé à la demande
+        self._tri = None       # (clé, décroissant) appliqué à _ordre
+        self.surSelection = surSelection
+        self._ordreObsolete = False
+        self._lotEnCours = None
+        self._redessinPrevu = None
+        self.debut = 0
+
+        self.scrollbar.configure(command=self.defiler)
+        self.tree.configure(yscrollcommand=lambda *args: None)
+        self.tree.bind("<MouseWheel>", lambda e: self._defilerUnites(-1 if e.delta > 0 else 1) or "break")
+        self.tree.bind("<Button-4>", lambda e: self._defilerUnites(-1) or "break")
+        self.tree.bind("<Button-5>", lambda e: self._defilerUnites(1) or "break")
+        self.tree.bind("<Prior>", lambda e: self._defilerUnites(-self._hauteur()) or "break")
+        self.tree.bind("<Next>", lambda e: self._defilerUnites(self._hauteur()) or "break")
+        self.tree.bind("<Configure>", lambda e: self.redessiner(), add="+")
+        self.tree.bind("<<TreeviewSelect>>", self._selectionModifiee, add="+")
+        self.tree.bind("<Button-1>", self._clic, add="+")
+        self.tree.bind("<Control-a>", lambda e: self.toutSelectionner() or "break")
+
+    def __len__(self):
+        return len(self._lignes)
+
+    def __contains__(self, identifiant):
+        return identifiant in self._lignes
+
+    def occupe(self):
+        """True pendant un synchroniser() découpé en lots"""
+        return self._lotEnCours is not None
+
+    # --- Mise à jour du modèle ---
+
+    def synchroniser(self, elements, termine=None):
+        """Remplace le contenu par `elements` en ne touchant que les lignes modifiées.
+
+        Le calcul de la différence est découpé en lots traités via after() pour ne pas figer l'interface.
+        """
+        if self._lotEnCours is not None:
+            self.tree.after_cancel(self._lotEnCours)
+            self._lotEnCours = None
+
+        iterateur = iter(elements)
+        vus = set()
+        nouvelOrdre = []
+
+        def traiterLot():
+            self._lotEnCours = None
+            for _ in range(self.tailleLot):
+                try:
+                    element = next(iterateur)
+                except StopIteration:
+                    break
+                identifiant = self.cle(element)
+                if identifiant in vus:
+                    continue
+                vus.add(identifiant)
+                nouvelOrdre.append(identifiant)
+                valeurs = self.valeurs(element)
+                if self._lignes.get(identifiant) != valeurs:
+                    self._lignes[identifiant] = valeurs
+            else:
+                self._lotEnCours = self.tree.after(1, traiterLot)
+                return
+
+            for identifiant in [i for i in self._lignes if i not in vus]:
+                del self._lignes[identifiant]
+            selectionRetiree = bool(self._selection - vus)
+            self._selection &= vus
+            self._ordre = nouvelOrdre
+            self._ordreObsolete = False
+            self._appliquerTri()
+            self.redessiner()
+            if selectionRetiree:
+                self._notifierSelection()
+            if termine:
+                termine()
+
+        traiterLot()
+
+    def mettreAJour(self, element):
+        """Insère ou met à jour une ligne"""
+        identifiant = self.cle(element)
+        if identifiant not in self._lignes:
+            self._ordre.append(identifiant)
+            self._vue = None
+        self._lignes[identifiant] = self.valeurs(element)
+        if self._tri:
+            # Le tri est réappliqué au prochain redessin (quasi trié : coût linéaire)
+            self._ordreObsolete = True
+        self._planifierRedessin()
+
+    def supprimer(self, identifiant):
+        if self._lignes.pop(identifiant, None) is not None:
+            self._ordreObsolete = True
+            self._planifierRedessin()
+            if identifiant in self._selection:
+                self._selection.discard(identifiant)
+                self._notifierSelection()
+
+    def vider(self):
+        self.synchroniser([])
+
+    def filtrer(self, identifiants):
+        """N'affiche que ces identifiants (None : toutes les lignes), dans l'ordre courant"""
+        if identifiants == self._filtre:
+            return
+        self._filtre = identifiants
+        self._vue = None
+        self.debut = 0
+        self.redessiner()
+
+    def trier(self, cle, decroissant=False):
+        """Trie les lignes selon cle(identifiant) ; le tri est conservé lors des mises à jour"""
+        self._tri = (cle, decroissant)
+        self._appliquerTri()
+        self.redessiner()
+
+    def _appliquerTri(self):
+        if self._tri:
+            cle, decroissant = self._tri
+            self._ordre.sort(key=cle, reverse=decroissant)
+        self._vue = None
+
+    def _ordreAffiche(self):
+        if self._ordreObsolete:
+            self._ordre = [i for i in self._ordre if i in self._lignes]
+            self._ordreObsolete = False
+            self._appliquerTri()
+        if self._filtre is None:
+            return self._ordre
+        if self._vue is None:
+            filtre = self._filtre
+            self._vue = [i for i in self._ordre if i in filtre]
+        return self._vue
+
+    # --- Affichage de la fenêtre visible ---
+
+    def _planifierRedessin(self):
+        # Regroupe plusieurs mutations successives en un seul redessin
+        if self._redessinPrevu is None:
+            self._redessinPrevu = self.tree.after_idle(self.redessiner)
+
+    def _hauteur(self):
+        hauteurPixels = self.tree.winfo_height()
+        try:
+            hauteurLigne = int(ttk.Style(self.tree).lookup("Treeview", "rowheight") or 0)
+        except (ValueError, TypeError):
+            hauteurLigne = 0
+        if hauteurPixels > 1 and hauteurLigne:
+            # La ligne d'en-tête occupe environ une hauteur de ligne
+            return max(1, hauteurPixels // hauteurLigne - 1)
+        return max(1, int(self.tree.cget("height")))
+
+    def redessiner(self):
+        self._redessinPrevu = None
+        ordre = self._ordreAffiche()
+
+        total = len(ordre)
+        hauteur = self._hauteur()
+        self.debut = max(0, min(self.debut, total - hauteur))
+        visibles = ordre[self.debut:self.debut + hauteur]
+        iidsVisibles = [str(i) for i in visibles]
+
+        gardes = set(iidsVisibles)
+        aRetirer = [iid for iid in self._affiches if iid not in gardes]
+        if aRetirer:
+            for iid in aRetirer:
+                del self._affiches[iid]
+                del self._identifiants[iid]
+            self.tree.delete(*aRetirer)
+
+        for index, (identifiant, iid) in enumerate(zip(visibles, iidsVisibles)):
+            valeurs = self._lignes[identifiant]
+            if iid not in self._affiches:
+                self.tree.insert("", index, iid=iid, values=valeurs)
+            else:
+                if self._affiches[iid] != valeurs:
+                    self.tree.item(iid, values=valeurs)
+                if self.tree.index(iid) != index:
+                    self.tree.move(iid, "", index)
+            self._affiches[iid] = valeurs
+            self._identifiants[iid] = identifiant
+
+        # La sélection est conservée dans le modèle : la réappliquer aux lignes visibles
+        selectionnes = [iid for iid, identifiant in zip(iidsVisibles, visibles) if identifiant in self._selection]
+        if set(selectionnes) != set(self.tree.selection()):
+            self.tree.selection_set(selectionnes)
+
+        if total:
+            self.scrollbar.set(self.debut / total, min(1.0, (self.debut + hauteur) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # --- Sélection ---
+
+    def nombreAffiche(self):
+        """Lignes retenues par le filtre courant"""
+        return len(self._ordreAffiche())
+
+    def selection(self):
+        """Identifiants sélectionnés dans l'ordre d'affichage, y compris hors de la fenêtre visible.
+
+        Les lignes masquées par le filtre n'en font pas partie : une action groupée ne porte que sur ce qui est affiché.
+        """
+        return [i for i in self._ordreAffiche() if i in self._selection and i in self._lignes]
+
+    def toutSelectionner(self):
+        self._selection = set(self._ordreAffiche())
+        self.redessiner()
+        self._notifierSelection()
+
+    def effacerSelection(self):
+        self._selection.clear()
+        self.redessiner()
+        self._notifierSelection()
+
+    def _clic(self, evenement):
+        # Un clic sans Ctrl ni Maj remplace toute la sélection, y compris les lignes hors écran
+        if not evenement.state & 0x0005 and self.tree.identify_row(evenement.y):
+            self._selection.clear()
+
+    def _selectionModifiee(self, evenement=None):
+        visibles = set(self._identifiants.values())
+        choisis = {self._identifiants[iid] for iid in self.tree.selection() if iid in self._identifiants}
+        nouvelle = (self._selection - visibles) | choisis
+        if nouvelle != self._selection:
+            self._selection = nouvelle
+            self._notifierSelection()
+
+    def _notifierSelection(self):
+        if self.surSelection:
+            self.surSelection(self.selection())
+
+    def defiler(self, action, quantite, unite=None):
+        """Commande de la scrollbar : ('moveto', fraction) ou ('scroll', n, 'units'|'pages')"""
+        if action == "moveto":
+            self.debut = int(float(quantite) * len(self._ordreAffiche()))
+            self.redessiner()
+        elif action == "scroll":
+            pas = self._hauteur() if unite == "pages" else 1
+            self._defilerUnites(int(quantite) * pas)
+
+    def _defilerUnites(self, nombre):
+        self.debut += nombre
+        self.redessiner()